@@ -0,0 +1,337 @@
+"""
+Pixelated Empathy Bias Detection Alert Outbox
+
+Durable fan-out of high/critical results to HTTP sinks without touching
+request latency:
+- Outbox rows are inserted by a results store write hook, in the same
+  transaction as the results themselves
+- A background dispatcher claims due events in batches under a lease, so
+  dispatchers in several worker processes never deliver the same event
+  concurrently; an expired lease (a crashed worker) makes events due again
+- Failed deliveries retry with capped exponential backoff and full jitter,
+  then are parked as dead letters
+- Each sink gets one POST per batch, ``{"events": [...]}``; a 2xx reply
+  accepts the batch except for any event IDs it lists under ``rejected``,
+  which are retried on their own
+- Event IDs are stable per (result, sink), so duplicates are ignored on
+  insert; every event carries its ID for receiver-side dedupe, and the
+  batch's Idempotency-Key is derived from the IDs it contains
+
+Payloads carry only hashed session IDs and scores, never session content.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import socket
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from typing import Dict, List, Any
+
+from results_store import ResultsStore
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alert_outbox (
+    event_id TEXT PRIMARY KEY,
+    sink TEXT NOT NULL,
+    result_id TEXT NOT NULL,
+    alert_level TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_ts REAL NOT NULL,
+    last_error TEXT,
+    created_ts REAL NOT NULL,
+    delivered_ts REAL,
+    claimed_by TEXT,
+    lease_until REAL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON alert_outbox (status, next_attempt_ts);
+"""
+
+# Added after the first release; existing outbox tables are migrated in place
+LEASE_COLUMNS = {'claimed_by': 'TEXT', 'lease_until': 'REAL'}
+
+def outbox_event_id(result_id: str, sink: str) -> str:
+    return hashlib.sha256(f"{result_id}|{sink}".encode()).hexdigest()[:32]
+
+def batch_idempotency_key(event_ids: List[str]) -> str:
+    return hashlib.sha256('|'.join(sorted(event_ids)).encode()).hexdigest()[:32]
+
+class AlertOutbox:
+    """Transactional outbox for alert notifications with a leased HTTP dispatcher"""
+
+    def __init__(self, store: ResultsStore, sinks: List[str], levels: tuple = ('high', 'critical'),
+                 batch_size: int = 50, max_attempts: int = 8, base_backoff_seconds: float = 1.0,
+                 max_backoff_seconds: float = 300.0, poll_interval_seconds: float = 1.0,
+                 request_timeout_seconds: float = 5.0, retention_seconds: float = 7 * 86400.0):
+        self.store = store
+        self.sinks = list(sinks)
+        self.levels = levels
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self.request_timeout_seconds = request_timeout_seconds
+        self.retention_seconds = retention_seconds
+        self.dispatcher_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+
+        connection = store._connection()
+        connection.executescript(SCHEMA)
+        existing = {row['name'] for row in connection.execute('PRAGMA table_info(alert_outbox)')}
+        for column, column_type in LEASE_COLUMNS.items():
+            if column not in existing:
+                connection.execute(f'ALTER TABLE alert_outbox ADD COLUMN {column} {column_type}')
+        store.add_write_hook(self.enqueue)
+
+        self._dispatcher = None
+        if self.sinks:
+            self._dispatcher = threading.Thread(target=self._dispatch_loop, name='alert-outbox-dispatcher', daemon=True)
+            self._dispatcher.start()
+
+    # Writes (inside the results store transaction)
+
+    def enqueue(self, connection: sqlite3.Connection, rows: List[Dict[str, Any]]) -> None:
+        """Results store write hook: one outbox event per alerting result per sink"""
+        now = time.time()
+        events = []
+        for row in rows:
+            if row['alert_level'] not in self.levels:
+                continue
+            payload = json.dumps({
+                'result_id': row['result_id'],
+                'session_hash': row['session_hash'],
+                'alert_level': row['alert_level'],
+                'overall_bias_score': row['overall_score'],
+                'confidence': row['confidence'],
+                'created_at': row['created_at']
+            })
+            for sink in self.sinks:
+                events.append((
+                    outbox_event_id(row['result_id'], sink), sink, row['result_id'],
+                    row['alert_level'], payload, now, now
+                ))
+        if events:
+            connection.executemany(
+                'INSERT OR IGNORE INTO alert_outbox '
+                '(event_id, sink, result_id, alert_level, payload, next_attempt_ts, created_ts) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                events
+            )
+            self._wake.set()
+
+    # Dispatch
+
+    def _dispatch_loop(self) -> None:
+        last_prune = 0.0
+        while not self._stopping.is_set():
+            try:
+                delivered = self.dispatch_once()
+                if time.time() - last_prune > 3600:
+                    self.prune()
+                    last_prune = time.time()
+            except Exception as e:
+                logger.error("Alert outbox dispatch failed: %s", e)
+                delivered = 0
+            if not delivered:
+                self._wake.wait(self.poll_interval_seconds)
+                self._wake.clear()
+
+    def dispatch_once(self) -> int:
+        """Claim due events and deliver them as one batch per sink; returns the number delivered"""
+        connection = self.store._connection()
+        batches: Dict[str, List[sqlite3.Row]] = {}
+        for event in self._claim(connection):
+            batches.setdefault(event['sink'], []).append(event)
+        delivered = 0
+        unsent: List[str] = []
+        for sink, events in batches.items():
+            if self._stopping.is_set():
+                unsent.extend(event['event_id'] for event in events)
+                continue
+            failures = self._post_batch(sink, events)
+            delivered += self._record_outcomes(connection, events, failures)
+        # Hand back anything left unsent when stopping
+        if unsent:
+            with connection:
+                connection.executemany(
+                    'UPDATE alert_outbox SET claimed_by = NULL, lease_until = NULL WHERE event_id = ? AND claimed_by = ?',
+                    [(event_id, self.dispatcher_id) for event_id in unsent]
+                )
+        return delivered
+
+    def _claim(self, connection: sqlite3.Connection) -> List[sqlite3.Row]:
+        """Lease up to batch_size due events per sink to this dispatcher
+
+        The select and the update share one write transaction, so concurrent
+        dispatchers (other workers on the same database) never claim the same event.
+        """
+        now = time.time()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            due = connection.execute(
+                "SELECT event_id, sink, payload, attempts FROM alert_outbox "
+                "WHERE status = 'pending' AND next_attempt_ts <= ? AND (lease_until IS NULL OR lease_until < ?) "
+                "ORDER BY next_attempt_ts LIMIT ?",
+                (now, now, self.batch_size * max(len(self.sinks), 1))
+            ).fetchall()
+            per_sink: Dict[str, int] = {}
+            claimed = []
+            for event in due:
+                if per_sink.get(event['sink'], 0) < self.batch_size:
+                    per_sink[event['sink']] = per_sink.get(event['sink'], 0) + 1
+                    claimed.append(event)
+            # Long enough to post every sink's batch at the request timeout
+            lease_until = now + self.request_timeout_seconds * (len(per_sink) + 1)
+            connection.executemany(
+                'UPDATE alert_outbox SET claimed_by = ?, lease_until = ? WHERE event_id = ?',
+                [(self.dispatcher_id, lease_until, event['event_id']) for event in claimed]
+            )
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        return claimed
+
+    def _record_outcomes(self, connection: sqlite3.Connection, events: List[sqlite3.Row],
+                         failures: Dict[str, str]) -> int:
+        """Mark a posted batch delivered, or rescheduled per failed event; returns the number delivered"""
+        delivered = 0
+        expired = []
+        with connection:
+            for event in events:
+                error = failures.get(event['event_id'])
+                if error is None:
+                    cursor = connection.execute(
+                        "UPDATE alert_outbox SET status = 'delivered', attempts = attempts + 1, delivered_ts = ?, "
+                        "last_error = NULL, claimed_by = NULL, lease_until = NULL "
+                        "WHERE event_id = ? AND claimed_by = ?",
+                        (time.time(), event['event_id'], self.dispatcher_id)
+                    )
+                    delivered += 1
+                else:
+                    cursor = connection.execute(
+                        'UPDATE alert_outbox SET status = ?, attempts = ?, next_attempt_ts = ?, last_error = ?, '
+                        'claimed_by = NULL, lease_until = NULL WHERE event_id = ? AND claimed_by = ?',
+                        self._failure_update(event, error) + (self.dispatcher_id,)
+                    )
+                if not cursor.rowcount:
+                    expired.append(event['event_id'])
+        if failures:
+            logger.warning("Alert delivery of %d/%d events to %s failed: %s",
+                           len(failures), len(events), events[0]['sink'], next(iter(failures.values())))
+        if expired:
+            logger.warning("Lease on %d alert events expired before their outcome was recorded", len(expired))
+        return delivered
+
+    def _failure_update(self, event: sqlite3.Row, error: str) -> tuple:
+        attempts = event['attempts'] + 1
+        status = 'dead' if attempts >= self.max_attempts else 'pending'
+        backoff = min(self.max_backoff_seconds, self.base_backoff_seconds * (2 ** (attempts - 1)))
+        # Full jitter keeps many failed events from retrying in lockstep
+        next_attempt_ts = time.time() + random.uniform(0, backoff)
+        return (status, attempts, next_attempt_ts, error[:500], event['event_id'])
+
+    def _post_batch(self, sink: str, events: List[sqlite3.Row]) -> Dict[str, str]:
+        """POST a batch of events to one sink; returns an error per event that was not accepted"""
+        event_ids = [event['event_id'] for event in events]
+        body = json.dumps({
+            'events': [dict(json.loads(event['payload']), event_id=event['event_id']) for event in events]
+        }).encode()
+        request = urllib.request.Request(
+            sink,
+            data=body,
+            method='POST',
+            headers={
+                'Content-Type': 'application/json',
+                'Idempotency-Key': batch_idempotency_key(event_ids)
+            }
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.request_timeout_seconds) as response:
+                if 200 <= response.status < 300:
+                    return self._rejected_events(response.read(), event_ids)
+                error = f"HTTP {response.status}"
+        except urllib.error.HTTPError as e:
+            error = f"HTTP {e.code}"
+        except Exception as e:
+            error = str(e)
+        return {event_id: error for event_id in event_ids}
+
+    @staticmethod
+    def _rejected_events(reply: bytes, event_ids: List[str]) -> Dict[str, str]:
+        """Events a 2xx reply rejected: ``{"rejected": [id, ...]}`` or ``{"rejected": {id: reason}}``
+
+        Anything else, including an empty or non-JSON body, accepts the whole batch.
+        """
+        try:
+            parsed = json.loads(reply) if reply.strip() else {}
+        except ValueError:
+            return {}
+        rejected = parsed.get('rejected') if isinstance(parsed, dict) else None
+        if isinstance(rejected, list):
+            rejected = {event_id: 'rejected by receiver' for event_id in rejected if isinstance(event_id, str)}
+        if not isinstance(rejected, dict):
+            return {}
+        known = set(event_ids)
+        return {event_id: str(reason) for event_id, reason in rejected.items() if event_id in known}
+
+    def prune(self) -> int:
+        """Drop delivered events older than the retention period"""
+        connection = self.store._connection()
+        with connection:
+            cursor = connection.execute(
+                "DELETE FROM alert_outbox WHERE status = 'delivered' AND delivered_ts < ?",
+                (time.time() - self.retention_seconds,)
+            )
+        return cursor.rowcount
+
+    # Inspection
+
+    def status(self, dead_limit: int = 20) -> Dict[str, Any]:
+        connection = self.store._connection()
+        counts = connection.execute(
+            'SELECT sink, status, COUNT(*) AS count FROM alert_outbox GROUP BY sink, status'
+        ).fetchall()
+        dead = connection.execute(
+            "SELECT event_id, sink, result_id, alert_level, attempts, last_error, created_ts FROM alert_outbox "
+            "WHERE status = 'dead' ORDER BY created_ts DESC LIMIT ?",
+            (dead_limit,)
+        ).fetchall()
+        sinks: Dict[str, Dict[str, int]] = {}
+        for row in counts:
+            sinks.setdefault(row['sink'], {})[row['status']] = row['count']
+        return {
+            'sinks': sinks,
+            'dispatcher_running': self._dispatcher is not None and self._dispatcher.is_alive(),
+            'dead_letters': [dict(row) for row in dead]
+        }
+
+    def retry_dead(self) -> int:
+        """Move dead letters back to pending for immediate redelivery"""
+        connection = self.store._connection()
+        with connection:
+            cursor = connection.execute(
+                "UPDATE alert_outbox SET status = 'pending', attempts = 0, next_attempt_ts = ? "
+                "WHERE status = 'dead'",
+                (time.time(),)
+            )
+        self._wake.set()
+        return cursor.rowcount
+
+    def close(self) -> None:
+        self._stopping.set()
+        self._wake.set()
+        if self._dispatcher is not None:
+            self._dispatcher.join(timeout=5.0)
@@ -16,21 +16,30 @@ HIPAA Compliant with encryption, audit logging, and secure data handling.
 import asyncio
 import json
 import logging
+import math
 import os
-import sys
 import traceback
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple, Union
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Any, Optional, Tuple, Callable
+from dataclasses import dataclass, field
 import hashlib
+import random
 import uuid
 from functools import wraps
+from collections import Counter
 import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Logging is routed through a background listener before anything logs
+from service_logging import configure_logging_from_environment, logging_stats, queued_records
+configure_logging_from_environment()
 
 # Flask and web framework
-from flask import Flask, request, jsonify, Response
+from flask import Flask, request, jsonify, Response, make_response, send_file, stream_with_context
 from flask_cors import CORS
-from werkzeug.exceptions import BadRequest, InternalServerError, Unauthorized
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.exceptions import Unauthorized
 import jwt
 
 # Core ML libraries
@@ -50,7 +59,7 @@ try:
     AIF360_AVAILABLE = True
 except ImportError as e:
     AIF360_AVAILABLE = False
-    logging.warning(f"AIF360 not available: {e}")
+    logging.warning("AIF360 not available: %s", e)
 
 # Microsoft Fairlearn
 try:
@@ -66,7 +75,7 @@ try:
     FAIRLEARN_AVAILABLE = True
 except ImportError as e:
     FAIRLEARN_AVAILABLE = False
-    logging.warning(f"Fairlearn not available: {e}")
+    logging.warning("Fairlearn not available: %s", e)
 
 # Hugging Face evaluate
 try:
@@ -75,7 +84,7 @@ try:
     HF_EVALUATE_AVAILABLE = True
 except ImportError as e:
     HF_EVALUATE_AVAILABLE = False
-    logging.warning(f"Hugging Face evaluate not available: {e}")
+    logging.warning("Hugging Face evaluate not available: %s", e)
 
 # NLP libraries
 try:
@@ -86,17 +95,16 @@ try:
     NLP_AVAILABLE = True
 except ImportError as e:
     NLP_AVAILABLE = False
-    logging.warning(f"NLP libraries not available: {e}")
+    logging.warning("NLP libraries not available: %s", e)
 
 # Model interpretability
 try:
     import shap
     import lime
-    from lime.lime_text import LimeTextExplainer
     INTERPRETABILITY_AVAILABLE = True
 except ImportError as e:
     INTERPRETABILITY_AVAILABLE = False
-    logging.warning(f"Interpretability libraries not available: {e}")
+    logging.warning("Interpretability libraries not available: %s", e)
 
 # Visualization and data processing
 try:
@@ -110,29 +118,46 @@ try:
     VISUALIZATION_AVAILABLE = True
 except ImportError as e:
     VISUALIZATION_AVAILABLE = False
-    logging.warning(f"Visualization libraries not available: {e}")
-
-# Security and encryption
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-import base64
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('bias_detection.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
+    logging.warning("Visualization libraries not available: %s", e)
+
+# Service instrumentation
+from service_metrics import (
+    MetricsRegistry,
+    instrument_flask_app,
+    metrics_json_response,
+    metrics_prometheus_response
 )
+from profiling import PROFILE_MODES, ProfileStore, active_sampler, capture_profile
+from memory_accounting import SNAPSHOT_KEY_TYPES, MemoryAccountant, deep_sizeof, torch_model_bytes
+from encryption import FernetCipher
+from results_store import ResultsStore, parse_timestamp
+from rollups import ResultRollups
+from cohort_analysis import CohortAnalyzer, ColumnarResults
+from alert_outbox import AlertOutbox
+from drift_detection import DriftMonitor
+from token_cache import VerifiedTokenCache
+from key_rotation import ReencryptionJob
+from response_encoding import FastJSONProvider, compress_response, project
+from result_model import AnalysisResult, LayerResult, SessionData
+from config_reload import ConfigManager, ConfigValidationError, config_version
+from model_registry import bias_classifier, spacy_model
+from explanations import ExplanationPool, method_available
+from counterfactual import compare_scores, generate_counterfactuals, render, score_texts, summarize_deltas, tokens_from_span, tokens_from_text
+from rate_limiting import RateLimiter, MemoryBucketStore, SQLiteBucketStore, request_cost
+from request_limits import CountingReader, RequestTooLarge, read_json_body
+from export_stream import EXPORT_FORMATS, PARQUET_AVAILABLE, export_records, stream_export
+
 logger = logging.getLogger(__name__)
 
 # Flask app initialization
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 CORS(app)
 
+# Request and analysis metrics
+service_metrics = MetricsRegistry()
+instrument_flask_app(app, service_metrics)
+
 # Configuration
 app.config['SECRET_KEY'] = os.environ.get('FLASK_SECRET_KEY', 'dev-key-change-in-production')
 app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-change-in-production')
@@ -149,6 +174,49 @@ class BiasDetectionConfig:
     enable_encryption: bool = True
     max_session_size_mb: int = 50
     rate_limit_per_minute: int = 60
+    rate_limit_burst: Optional[int] = None
+    rate_limit_cost_unit_kb: int = 256
+    rate_limit_store_path: Optional[str] = None
+    deterministic_mode: Optional[bool] = None
+    random_seed_salt: str = ''
+    enabled_analyzers: Dict[str, bool] = None
+    analysis_cost_budget_ms: Optional[float] = None
+    default_deadline_ms: Optional[float] = None
+    analyzer_worker_threads: int = 8
+    analyzer_max_abandoned: int = 2
+    circuit_breaker_failure_threshold: int = 5
+    circuit_breaker_cooldown_seconds: float = 30.0
+    analyzer_latency_slo_ms: Optional[float] = None
+    nlp_batch_size: int = 64
+    max_flagged_segments: int = 100
+    counterfactual_max_responses: int = 50
+    counterfactual_batch_size: int = 32
+    explanation_method: str = 'lime'
+    explanation_levels: tuple = ('high', 'critical')
+    explanation_budget_ms: float = 5000.0
+    explanation_max_samples: int = 1000
+    explanation_batch_size: int = 32
+    explanation_workers: int = 1
+    explanation_max_responses: int = 5
+    explanation_timeout_ms: float = 120000.0
+    profile_sample_rate: float = 0.0
+    profile_output_dir: str = 'profiles'
+    profile_max_stored: int = 50
+    enable_results_store: bool = True
+    data_dir: Optional[str] = None
+    results_db_path: Optional[str] = None
+    cohort_cache_dir: Optional[str] = None
+    drift_delta: float = 0.025
+    drift_threshold: float = 1.0
+    drift_min_samples: int = 30
+    drift_ewma_alpha: float = 0.05
+    alert_webhook_urls: List[str] = None
+    alert_outbox_levels: tuple = ('high', 'critical')
+    response_compression_min_bytes: int = 1024
+    response_compression_level: int = 6
+    config_file: Optional[str] = None
+    config_poll_seconds: float = 5.0
+    config_version: Optional[str] = None
     
     def __post_init__(self):
         if self.layer_weights is None:
@@ -158,62 +226,249 @@ class BiasDetectionConfig:
                 'interactive': 0.20,
                 'evaluation': 0.25
             }
+        if self.enabled_analyzers is None:
+            self.enabled_analyzers = {}
+        if self.alert_webhook_urls is None:
+            self.alert_webhook_urls = [
+                url.strip() for url in os.environ.get('BIAS_ALERT_WEBHOOK_URLS', '').split(',') if url.strip()
+            ]
+        if self.config_file is None:
+            self.config_file = os.environ.get('BIAS_CONFIG_FILE') or None
+        if self.data_dir is None:
+            # Runtime databases live next to the service, not in whatever directory it was started from
+            self.data_dir = os.environ.get('BIAS_DATA_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+        if self.results_db_path is None:
+            self.results_db_path = (os.environ.get('BIAS_RESULTS_DB_PATH')
+                                    or os.path.join(self.data_dir, 'bias_detection_results.db'))
+        if self.cohort_cache_dir is None:
+            self.cohort_cache_dir = (os.environ.get('BIAS_COHORT_CACHE_DIR')
+                                     or os.path.join(self.data_dir, 'cohort_columns'))
+        if self.deterministic_mode is None:
+            # Opt-in: seeded randomness is for reproducing results, not the default
+            self.deterministic_mode = os.environ.get('BIAS_DETERMINISTIC_MODE', '').lower() in ('1', 'true', 'yes')
+        if self.config_version is None:
+            self.config_version = config_version(self)
+    
+    def is_analyzer_enabled(self, name: str) -> bool:
+        """Analyzers are enabled unless explicitly switched off"""
+        return self.enabled_analyzers.get(name, True)
 
 @dataclass
-class SessionData:
-    """Structured session data for bias analysis"""
-    session_id: str
-    participant_demographics: Dict[str, Any]
-    training_scenario: Dict[str, Any]
-    content: Dict[str, Any]
-    ai_responses: List[Dict[str, Any]]
-    expected_outcomes: List[Dict[str, Any]]
-    transcripts: List[Dict[str, Any]]
-    metadata: Dict[str, Any]
-    timestamp: Optional[str] = None
+class AnalysisContext:
+    """Per-request analysis state shared by all layers"""
+    session_hash: str
+    config: BiasDetectionConfig
+    seed: Optional[int] = None
+    admitted_analyzers: Optional[set] = None
+    deadline: Optional[float] = None
+    resources: Dict[str, Any] = field(default_factory=dict)
+    resource_lock: threading.Lock = field(default_factory=threading.Lock)
     
-    def __post_init__(self):
-        if self.timestamp is None:
-            self.timestamp = datetime.now().isoformat()
+    def remaining_seconds(self) -> Optional[float]:
+        """Time left before the request deadline, or None when unbounded"""
+        if self.deadline is None:
+            return None
+        return self.deadline - time.perf_counter()
+    
+    def rng(self, analyzer: str) -> np.random.Generator:
+        """Independent random generator for a single analyzer
+        
+        Each analyzer gets its own stream derived from the request seed, so
+        results do not depend on the order in which layers are scheduled.
+        """
+        if self.seed is None:
+            return np.random.default_rng()
+        analyzer_key = int(hashlib.sha256(analyzer.encode()).hexdigest()[:16], 16)
+        return np.random.default_rng(np.random.SeedSequence([self.seed, analyzer_key]))
+
+ANALYSIS_LAYERS = ['preprocessing', 'model_level', 'interactive', 'evaluation']
+
+LAYER_RECOMMENDATIONS = {
+    'preprocessing': [
+        "Review demographic representation in training data",
+        "Consider data augmentation for underrepresented groups",
+        "Implement bias-aware preprocessing techniques"
+    ],
+    'model_level': [
+        "Implement fairness constraints during model training",
+        "Use adversarial debiasing techniques",
+        "Regular model auditing and retraining"
+    ],
+    'interactive': [
+        "Review interaction patterns for demographic disparities",
+        "Implement adaptive response strategies",
+        "Monitor engagement metrics across user groups"
+    ],
+    'evaluation': [
+        "Implement post-processing fairness corrections",
+        "Regular evaluation across demographic groups",
+        "Establish fairness monitoring dashboards"
+    ]
+}
+
+GENDER_TERMS = {
+    'male': frozenset(['he', 'him', 'his', 'man', 'men', 'boy', 'boys', 'male', 'father', 'son', 'brother']),
+    'female': frozenset(['she', 'her', 'hers', 'woman', 'women', 'girl', 'girls', 'female', 'mother', 'daughter', 'sister'])
+}
+RACIAL_TERMS = frozenset([
+    'race', 'racial', 'ethnic', 'ethnicity', 'minority', 'majority',
+    'black', 'white', 'asian', 'hispanic', 'latino', 'native'
+])
+AGE_TERMS = frozenset([
+    'young', 'old', 'elderly', 'senior', 'youth', 'teenager', 'adult',
+    'child', 'children', 'baby', 'infant', 'toddler', 'adolescent'
+])
+CULTURAL_TERMS = frozenset([
+    'culture', 'cultural', 'religion', 'religious', 'tradition', 'traditional',
+    'foreign', 'immigrant', 'native', 'indigenous', 'western', 'eastern'
+])
+
+# Pipeline components the detectors never read; skipped when parsing segments
+UNUSED_NLP_COMPONENTS = ('parser', 'ner', 'lemmatizer')
+
+@dataclass
+class AnalyzerSpec:
+    """Declaration of a single analyzer contributing to a layer score"""
+    name: str
+    layer: str
+    weight: float
+    func: Callable[..., Any]
+    requires: Tuple[str, ...] = ()
+    estimated_cost_ms: float = 1.0
+    available: bool = True
+    score_key: str = 'bias_score'
+    latency_slo_ms: Optional[float] = None
+
+class AnalyzerRegistry:
+    """Ordered registry of analyzers grouped by analysis layer"""
+    
+    def __init__(self):
+        self._analyzers: Dict[str, AnalyzerSpec] = {}
+    
+    def register(self, spec: AnalyzerSpec) -> AnalyzerSpec:
+        """Register an analyzer, replacing any existing one with the same name"""
+        if spec.layer not in ANALYSIS_LAYERS:
+            raise ValueError(f"Unknown analysis layer: {spec.layer}")
+        self._analyzers[spec.name] = spec
+        return spec
+    
+    def unregister(self, name: str) -> None:
+        self._analyzers.pop(name, None)
+    
+    def get(self, name: str) -> Optional[AnalyzerSpec]:
+        return self._analyzers.get(name)
+    
+    def for_layer(self, layer: str) -> List[AnalyzerSpec]:
+        return [spec for spec in self._analyzers.values() if spec.layer == layer]
+    
+    def all(self) -> List[AnalyzerSpec]:
+        return list(self._analyzers.values())
+
+class CircuitBreaker:
+    """Per-analyzer circuit breaker
+    
+    Opens after a run of consecutive failures or latency SLO breaches, rejects
+    calls during the cool-down, then lets a single probe through (half-open)
+    to decide whether to close again.
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, name: str, failure_threshold: int, cooldown_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.total_failures = 0
+        self.short_circuited_calls = 0
+        self.opened_at: Optional[float] = None
+        self.last_failure_reason: Optional[str] = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+    
+    def allow_request(self) -> bool:
+        """Whether the analyzer may run now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown_seconds:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.short_circuited_calls += 1
+            return False
+    
+    def record_success(self) -> None:
+        with self._lock:
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+            self.state = self.CLOSED
+            self.opened_at = None
+    
+    def record_failure(self, reason: str) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            self.total_failures += 1
+            self.last_failure_reason = reason
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Current breaker state for health reporting"""
+        with self._lock:
+            retry_in = None
+            if self.state == self.OPEN:
+                retry_in = max(0.0, self.cooldown_seconds - (time.monotonic() - self.opened_at))
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'total_failures': self.total_failures,
+                'short_circuited_calls': self.short_circuited_calls,
+                'last_failure_reason': self.last_failure_reason,
+                'retry_in_seconds': retry_in
+            }
 
 class SecurityManager:
     """Handles encryption, authentication, and HIPAA compliance"""
     
-    def __init__(self):
-        self.encryption_key = self._generate_encryption_key()
-        self.fernet = Fernet(self.encryption_key)
-        
-    def _generate_encryption_key(self) -> bytes:
-        """Generate encryption key from environment or create new one"""
-        password = os.environ.get('ENCRYPTION_PASSWORD', 'default-password-change-in-production').encode()
-        salt = os.environ.get('ENCRYPTION_SALT', 'default-salt-change-in-production').encode()
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-        )
-        return base64.urlsafe_b64encode(kdf.derive(password))
+    def __init__(self, metrics: Optional[MetricsRegistry] = None):
+        self.cipher = FernetCipher.from_environment()
+        self.fernet = self.cipher.fernet
+        self.token_cache = VerifiedTokenCache(metrics=metrics)
+    
     def encrypt_data(self, data: str) -> str:
-        """Encrypt sensitive data"""
-        return self.fernet.encrypt(data.encode()).decode()
+        """Encrypt sensitive data under the primary key"""
+        return self.cipher.encrypt_data(data)
     
     def decrypt_data(self, encrypted_data: str) -> str:
-        """Decrypt sensitive data"""
-        return self.fernet.decrypt(encrypted_data.encode()).decode()
+        """Decrypt sensitive data written under any key in the keyring"""
+        return self.cipher.decrypt_data(encrypted_data)
     
     def hash_session_id(self, session_id: str) -> str:
         """Create hash of session ID for audit logging"""
         return hashlib.sha256(session_id.encode()).hexdigest()
     
     def verify_jwt_token(self, token: str) -> Dict[str, Any]:
-        """Verify JWT token"""
+        """Verify JWT token, reusing claims of tokens verified earlier"""
+        signing_key = app.config['JWT_SECRET_KEY']
+        claims = self.token_cache.get(token, signing_key)
+        if claims is not None:
+            return claims
         try:
-            return jwt.decode(token, app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
+            claims = jwt.decode(token, signing_key, algorithms=['HS256'])
         except jwt.ExpiredSignatureError as e:
             raise Unauthorized('Token has expired') from e
         except jwt.InvalidTokenError as e:
             raise Unauthorized('Invalid token') from e
+        self.token_cache.put(token, signing_key, claims)
+        return claims
 
 class AuditLogger:
     """HIPAA-compliant audit logging"""
@@ -221,14 +476,22 @@ class AuditLogger:
     def __init__(self, security_manager: SecurityManager):
         self.security_manager = security_manager
         self.audit_file = 'bias_detection_audit.log'
+        # Held by appends and by key rotation while it swaps in the rewritten log
+        self.lock = threading.Lock()
         
     async def log_event(self, event_type: str, session_id: str, user_id: str, 
                        details: Dict[str, Any], sensitive_data: bool = False):
         """Log audit event with encryption for sensitive data"""
+        self.write_event(event_type, self.security_manager.hash_session_id(session_id), user_id,
+                         details, sensitive_data)
+    
+    def write_event(self, event_type: str, session_id_hash: Optional[str], user_id: str,
+                    details: Dict[str, Any], sensitive_data: bool = False):
+        """Append an audit event for an already hashed session ID; safe to call off the event loop"""
         audit_entry = {
             'timestamp': datetime.now().isoformat(),
             'event_type': event_type,
-            'session_id_hash': self.security_manager.hash_session_id(session_id),
+            'session_id_hash': session_id_hash,
             'user_id': user_id,
             'details': 'ENCRYPTED' if sensitive_data else details,
             'ip_address': request.remote_addr if request else 'system',
@@ -239,47 +502,112 @@ class AuditLogger:
             audit_entry['encrypted_details'] = self.security_manager.encrypt_data(json.dumps(details))
         
         # Write to audit log
-        with open(self.audit_file, 'a') as f:
+        with self.lock, open(self.audit_file, 'a') as f:
             f.write(json.dumps(audit_entry) + '\n')
         
-        logger.info(f"Audit event logged: {event_type} for session {session_id}")
+        logger.info("Audit event logged: %s for session %s", event_type, session_id_hash,
+                    extra={'event_type': event_type, 'session_id_hash': session_id_hash})
 class BiasDetectionService:
     """Main bias detection service implementing multi-layer analysis"""
     
-    def __init__(self, config: BiasDetectionConfig):
+    def __init__(self, config: BiasDetectionConfig, metrics: Optional[MetricsRegistry] = None):
         self.config = config
-        self.security_manager = SecurityManager()
+        self.metrics = metrics or MetricsRegistry()
+        self.security_manager = SecurityManager(self.metrics)
         self.audit_logger = AuditLogger(self.security_manager)
         self.nlp = None
         self.sentiment_analyzer = None
         self.bias_classifier = None
         self._initialize_components()
+        self.analyzers = AnalyzerRegistry()
+        self._register_default_analyzers()
+        self.circuit_breakers: Dict[str, CircuitBreaker] = {}
+        self._circuit_breakers_lock = threading.Lock()
+        self._analyzer_executor = ThreadPoolExecutor(
+            max_workers=config.analyzer_worker_threads,
+            thread_name_prefix='bias-analyzer'
+        )
+        # Runs cut off by a deadline that are still occupying an executor thread
+        self._abandoned_runs: Dict[str, int] = {}
+        self._abandoned_runs_lock = threading.Lock()
+        self.results_store = (
+            ResultsStore(config.results_db_path, self.security_manager)
+            if config.enable_results_store else None
+        )
+        self.rollups = ResultRollups(self.results_store) if self.results_store is not None else None
+        self.alert_outbox = (
+            AlertOutbox(self.results_store, config.alert_webhook_urls, levels=config.alert_outbox_levels)
+            if self.results_store is not None else None
+        )
+        self.cohorts = (
+            CohortAnalyzer(ColumnarResults(self.results_store, config.cohort_cache_dir))
+            if self.results_store is not None else None
+        )
+        # LIME/SHAP for alerting results, computed out of process after the response
+        self.explanations = (
+            ExplanationPool(
+                self.results_store,
+                method=config.explanation_method,
+                budget_ms=config.explanation_budget_ms,
+                max_samples=config.explanation_max_samples,
+                batch_size=config.explanation_batch_size,
+                workers=config.explanation_workers,
+                max_responses=config.explanation_max_responses,
+                levels=config.explanation_levels,
+                timeout_ms=config.explanation_timeout_ms
+            )
+            if self.results_store is not None and self.bias_classifier is not None
+            and method_available(config.explanation_method) else None
+        )
+        self.drift_monitor = DriftMonitor(
+            delta=config.drift_delta,
+            threshold=config.drift_threshold,
+            min_samples=config.drift_min_samples,
+            ewma_alpha=config.drift_ewma_alpha,
+            store=self.results_store
+        )
+        self.drift_monitor.add_listener(self._report_drift_alert)
+        self.reencryption = ReencryptionJob(
+            self.security_manager.cipher,
+            results_store=self.results_store,
+            audit_file=self.audit_logger.audit_file,
+            audit_lock=self.audit_logger.lock
+        )
+        self.memory = MemoryAccountant()
+        self._register_memory_components()
         
     def _initialize_components(self):
         """Initialize NLP and ML components"""
         try:
             # Initialize NLP components
             if NLP_AVAILABLE:
-                self.nlp = spacy.load("en_core_web_sm")
+                self.nlp = spacy_model()
                 nltk.download('vader_lexicon', quiet=True)
                 self.sentiment_analyzer = SentimentIntensityAnalyzer()
                 logger.info("NLP components initialized")
             
             # Initialize bias detection models
             if HF_EVALUATE_AVAILABLE:
-                self.bias_classifier = pipeline(
-                    "text-classification",
-                    model="unitary/toxic-bert",
-                    device=-1  # Use CPU
-                )
+                self.bias_classifier = bias_classifier()
                 logger.info("Bias classification model initialized")
                 
         except Exception as e:
-            logger.error(f"Failed to initialize components: {e}")
+            logger.error("Failed to initialize components: %s", e)
     
-    async def analyze_session(self, session_data: SessionData, user_id: str) -> Dict[str, Any]:
-        """Perform comprehensive bias analysis on a therapeutic session"""
+    async def analyze_session(self, session_data: SessionData, user_id: str,
+                              deadline_ms: Optional[float] = None,
+                              deterministic: Optional[bool] = None) -> AnalysisResult:
+        """Perform comprehensive bias analysis on a therapeutic session
+        
+        When a deadline is given (or configured), analyzers that cannot finish
+        in time are skipped and the scores are computed from the rest.
+        ``deterministic`` overrides the configured deterministic mode for this request.
+        """
         start_time = time.time()
+        # Snapshot: a config reload mid-request does not affect this analysis
+        config = self.config
+        if deadline_ms is None:
+            deadline_ms = config.default_deadline_ms
         
         try:
             # Log analysis start
@@ -290,47 +618,72 @@ class BiasDetectionService:
                 {'analysis_type': 'comprehensive_bias_detection'}
             )
             
+            context = self._create_analysis_context(session_data, config, deterministic)
+            if deadline_ms is not None:
+                context.deadline = time.perf_counter() + deadline_ms / 1000.0
+            
             # Run all analysis layers in parallel
             tasks = [
-                self._run_preprocessing_analysis(session_data),
-                self._run_model_level_analysis(session_data),
-                self._run_interactive_analysis(session_data),
-                self._run_evaluation_analysis(session_data)
+                self._run_layer_analysis(layer, session_data, context)
+                for layer in ANALYSIS_LAYERS
             ]
             
             layer_results = await asyncio.gather(*tasks)
-            preprocessing_result, model_level_result, interactive_result, evaluation_result = layer_results
             
             # Calculate overall bias score
-            overall_score = self._calculate_overall_bias_score(layer_results)
+            overall_score = self._calculate_overall_bias_score(layer_results, config)
             
             # Generate recommendations
-            recommendations = self._generate_recommendations(layer_results)
+            recommendations = self._generate_recommendations(layer_results, config)
             
             # Determine alert level
-            alert_level = self._determine_alert_level(overall_score)
+            alert_level = self._determine_alert_level(overall_score, config)
             
             # Calculate confidence
             confidence = self._calculate_confidence(layer_results)
             
-            result = {
-                'session_id': session_data.session_id,
-                'timestamp': datetime.now().isoformat(),
-                'overall_bias_score': overall_score,
-                'layer_results': {
-                    'preprocessing': preprocessing_result,
-                    'model_level': model_level_result,
-                    'interactive': interactive_result,
-                    'evaluation': evaluation_result
-                },
-                'demographics': session_data.participant_demographics,
-                'recommendations': recommendations,
-                'alert_level': alert_level,
-                'confidence': confidence,
-                'processing_time_seconds': time.time() - start_time,
-                'service_version': '1.0.0'
+            skipped_analyzers = {
+                name: info.get('reason', 'unknown')
+                for layer_result in layer_results
+                for name, info in layer_result.analyzers.items()
+                if info.get('status') == 'skipped'
             }
             
+            result = AnalysisResult(
+                session_id=session_data.session_id,
+                timestamp=datetime.now().isoformat(),
+                overall_bias_score=overall_score,
+                layers=layer_results,
+                demographics=session_data.participant_demographics,
+                recommendations=recommendations,
+                alert_level=alert_level,
+                confidence=confidence,
+                processing_time_seconds=time.time() - start_time,
+                deterministic=context.seed is not None,
+                skipped_analyzers=skipped_analyzers,
+                deadline_ms=deadline_ms,
+                result_id=uuid.uuid4().hex,
+                service_version='1.0.0',
+                config_version=config.config_version
+            )
+            
+            # Persist off the request path. Results cut short by the caller's deadline (or
+            # with no score at all) are returned but kept out of stored history, rollups,
+            # alerts and drift baselines; open breakers and saturation only record skip reasons
+            if self.results_store is not None and result.storable:
+                self.results_store.submit(
+                    result,
+                    self.security_manager.hash_session_id(session_data.session_id),
+                    user_id
+                )
+                # Explanations are keyed by result ID, so only stored results get them
+                if self.explanations is not None:
+                    self.explanations.submit(result.result_id, alert_level, [
+                        (index, response['content'])
+                        for index, response in enumerate(session_data.ai_responses or [])
+                        if isinstance(response.get('content'), str) and response['content'].strip()
+                    ])
+            
             # Log analysis completion
             await self.audit_logger.log_event(
                 'analysis_completed',
@@ -344,7 +697,21 @@ class BiasDetectionService:
                 sensitive_data=True
             )
             
-            logger.info(f"Bias analysis completed for session {session_data.session_id} in {time.time() - start_time:.2f}s")
+            # With a results store, drift is tracked by its write hook across all workers
+            if self.results_store is None and result.storable:
+                self.drift_monitor.observe(
+                    result, self.security_manager.hash_session_id(session_data.session_id), user_id
+                )
+            
+            self.metrics.observe_latency('analysis_duration_seconds', time.time() - start_time,
+                                         help_text='End-to-end analyze_session latency')
+            self.metrics.inc('analyses_total', labels={'alert_level': alert_level, 'partial': str(result.partial).lower()},
+                             help_text='Completed analyses by alert level')
+            
+            elapsed = time.time() - start_time
+            logger.info("Bias analysis completed for session %s in %.2fs", session_data.session_id, elapsed,
+                        extra={'result_id': result.result_id, 'alert_level': alert_level,
+                               'overall_bias_score': result.overall_bias_score, 'duration_seconds': elapsed})
             return result
             
         except Exception as e:
@@ -355,224 +722,364 @@ class BiasDetectionService:
                 user_id,
                 {'error': str(e), 'traceback': traceback.format_exc()}
             )
-            logger.error(f"Bias analysis failed for session {session_data.session_id}: {e}")
+            self.metrics.inc('analysis_errors_total', help_text='Analyses that raised an error')
+            logger.error("Bias analysis failed for session %s: %s", session_data.session_id, e)
             raise 
+    
+    def _create_analysis_context(self, session_data: SessionData,
+                                 config: Optional[BiasDetectionConfig] = None,
+                                 deterministic: Optional[bool] = None) -> AnalysisContext:
+        """Build per-request context, seeding randomness from the session hash in deterministic mode"""
+        config = config or self.config
+        session_hash = session_data.content_hash()
+        seed = None
+        if deterministic is None:
+            deterministic = config.deterministic_mode
+        if deterministic:
+            seed_material = f"{config.random_seed_salt}:{session_hash}".encode()
+            seed = int(hashlib.sha256(seed_material).hexdigest()[:16], 16)
+        return AnalysisContext(
+            session_hash=session_hash,
+            config=config,
+            seed=seed,
+            admitted_analyzers=self._select_analyzers_within_budget(config)
+        )
+    
+    def _report_drift_alert(self, drift_alert: Dict[str, Any], session_hash: Optional[str],
+                            user_id: Optional[str]) -> None:
+        logger.warning(
+            "Bias drift detected for %s=%s: %s to %.3f", drift_alert['dimension'], drift_alert['slice'],
+            drift_alert['direction'], drift_alert['recent_mean'], extra={'drift_alert_id': drift_alert['alert_id']}
+        )
+        self.metrics.inc('drift_alerts_total', labels={'dimension': drift_alert['dimension']},
+                         help_text='Bias drift alerts raised by demographic dimension')
+        self.audit_logger.write_event('bias_drift_detected', session_hash, user_id or 'system', drift_alert)
+    
+    def _register_memory_components(self):
+        """Register size estimators for the long-lived components of the service"""
+        self.memory.register('bias_classifier_weights', lambda: (
+            torch_model_bytes(self.bias_classifier.model) if self.bias_classifier is not None else 0
+        ))
+        self.memory.register('spacy_model', self._spacy_model_bytes)
+        self.memory.register('metrics_registry', lambda: deep_sizeof(self.metrics))
+        self.memory.register('circuit_breakers', lambda: deep_sizeof(self.circuit_breakers))
+        self.memory.register('jwt_token_cache', lambda: deep_sizeof(self.security_manager.token_cache))
+        # In-process detectors only; with a results store they live in the database
+        self.memory.register('drift_monitor', lambda: deep_sizeof((self.drift_monitor._detectors, self.drift_monitor._alerts)))
+        self.memory.register('log_queue', lambda: deep_sizeof(queued_records()))
+        if self.results_store is not None:
+            self.memory.register('results_store_pending', lambda: deep_sizeof(self.results_store.pending()))
+        if self.explanations is not None:
+            self.memory.register('explanations_pending', lambda: deep_sizeof(self.explanations.pending()))
+    
+    def _spacy_model_bytes(self) -> int:
+        if self.nlp is None:
+            return 0
+        vectors = getattr(self.nlp.vocab, 'vectors', None)
+        vector_bytes = getattr(getattr(vectors, 'data', None), 'nbytes', 0) or 0
+        return vector_bytes + deep_sizeof(self.nlp)
+    
+    def _register_default_analyzers(self):
+        """Register the built-in analyzers with their layer weights and dependencies"""
+        defaults = [
+            # Preprocessing layer
+            AnalyzerSpec('demographic_analysis', 'preprocessing', 0.0,
+                         self._analyze_demographic_representation),
+            AnalyzerSpec('linguistic_bias', 'preprocessing', 0.6, self._run_linguistic_analysis,
+                         requires=('segment_docs',), estimated_cost_ms=150.0,
+                         available=NLP_AVAILABLE, score_key='overall_bias_score'),
+            AnalyzerSpec('aif360_preprocessing', 'preprocessing', 0.4, self._run_aif360_preprocessing,
+                         requires=('feature_frame',), estimated_cost_ms=80.0, available=AIF360_AVAILABLE),
+            # Model-level layer
+            AnalyzerSpec('fairlearn', 'model_level', 0.53, self._run_fairlearn_analysis,
+                         requires=('feature_frame',), estimated_cost_ms=60.0, available=FAIRLEARN_AVAILABLE),
+            # Informational: LIME/SHAP explanations finish after the response, so they cannot score it
+            AnalyzerSpec('interpretability', 'model_level', 0.0, self._run_interpretability_analysis,
+                         available=INTERPRETABILITY_AVAILABLE),
+            AnalyzerSpec('consistency', 'model_level', 0.2, self._analyze_response_consistency),
+            AnalyzerSpec('counterfactual', 'model_level', 0.27, self._run_counterfactual_analysis,
+                         requires=('text_scorer',), estimated_cost_ms=300.0,
+                         available=NLP_AVAILABLE or HF_EVALUATE_AVAILABLE),
+            # Interactive layer
+            AnalyzerSpec('interaction_patterns', 'interactive', 0.4, self._analyze_interaction_patterns),
+            AnalyzerSpec('response_times', 'interactive', 0.3, self._analyze_response_times),
+            AnalyzerSpec('engagement', 'interactive', 0.3, self._analyze_engagement_levels),
+            # Evaluation layer
+            AnalyzerSpec('outcome_fairness', 'evaluation', 0.4, self._analyze_outcome_fairness),
+            # Does not use the toxicity classifier, so it runs even when that model failed to load
+            AnalyzerSpec('hf_evaluate', 'evaluation', 0.3, self._run_hf_evaluate_analysis,
+                         estimated_cost_ms=250.0, available=HF_EVALUATE_AVAILABLE),
+            AnalyzerSpec('performance_disparities', 'evaluation', 0.3, self._analyze_performance_disparities),
+        ]
+        for spec in defaults:
+            self.analyzers.register(spec)
+    
+    def _dependency_available(self, dependency: str) -> bool:
+        """Check whether a shared analyzer dependency can be provided"""
+        if dependency == 'segment_docs':
+            return self.nlp is not None
+        if dependency == 'classifier':
+            return self.bias_classifier is not None
+        if dependency == 'text_scorer':
+            return self.bias_classifier is not None or self.sentiment_analyzer is not None
+        return True
+    
+    def _analyzer_runnable(self, spec: AnalyzerSpec) -> bool:
+        return spec.available and all(self._dependency_available(dep) for dep in spec.requires)
+    
+    def _select_analyzers_within_budget(self, config: Optional[BiasDetectionConfig] = None) -> Optional[set]:
+        """Pick the analyzers that fit the configured cost budget
+        
+        Analyzers are admitted in order of contribution to the overall score per
+        unit of estimated cost. Returns None when no budget is configured.
+        """
+        config = config or self.config
+        budget = config.analysis_cost_budget_ms
+        if budget is None:
+            return None
+        
+        candidates = [
+            spec for spec in self.analyzers.all()
+            if config.is_analyzer_enabled(spec.name) and self._analyzer_runnable(spec)
+        ]
+        candidates.sort(
+            key=lambda spec: spec.weight * config.layer_weights.get(spec.layer, 0.25) / max(spec.estimated_cost_ms, 1e-3),
+            reverse=True
+        )
+        
+        admitted = set()
+        remaining = budget
+        for spec in candidates:
+            if spec.estimated_cost_ms <= remaining:
+                admitted.add(spec.name)
+                remaining -= spec.estimated_cost_ms
+        return admitted
+    
+    def _get_segment_docs(self, session_data: SessionData, context: AnalysisContext) -> List[Tuple[Dict[str, Any], Any]]:
+        """Parse every session segment once per request, in one batched pipe call, and share the docs"""
+        with context.resource_lock:
+            cached = 'segment_docs' in context.resources
+            self.metrics.record_cache('segment_docs', cached)
+            if not cached:
+                segments = self._extract_segments(session_data)
+                disabled = [name for name in UNUSED_NLP_COMPONENTS if name in self.nlp.pipe_names]
+                docs = self.nlp.pipe([segment['text'] for segment in segments],
+                                     batch_size=context.config.nlp_batch_size, disable=disabled)
+                context.resources['segment_docs'] = list(zip(segments, docs))
+                self.metrics.observe_batch_size('spacy', len(segments))
+            return context.resources['segment_docs']
+    
+    def _get_feature_frame(self, session_data: SessionData, context: AnalysisContext) -> Optional[Dict[str, Any]]:
+        """Build the tabular feature frame once per request and share it across analyzers"""
+        with context.resource_lock:
+            cached = 'feature_frame' in context.resources
+            self.metrics.record_cache('feature_frame', cached)
+            if not cached:
+                context.resources['feature_frame'] = self._create_synthetic_dataset(
+                    session_data, context.rng('feature_frame')
+                )
+            return context.resources['feature_frame']
 
-    async def _run_preprocessing_analysis(self, session_data: SessionData) -> Dict[str, Any]:
-        """Run preprocessing layer bias analysis using AIF360 and demographic analysis"""
+    async def _run_layer_analysis(self, layer: str, session_data: SessionData, context: AnalysisContext) -> LayerResult:
+        """Run every registered analyzer for a layer and combine their weighted scores"""
+        bias_score = 0.0
+        coverage = 1.0
+        skipped = False
+        metrics: Dict[str, Any] = {}
+        analyzers: Dict[str, Dict[str, Any]] = {}
+        planned_weight = completed_weight = 0.0
+        planned_count = completed_count = 0
+        layer_start = time.perf_counter()
+        
         try:
-            result = {
-                'layer': 'preprocessing',
-                'bias_score': 0.0,
-                'detected_biases': [],
-                'metrics': {},
-                'recommendations': []
-            }
-            
-            # Demographic representation analysis
-            demo_analysis = self._analyze_demographic_representation(session_data)
-            result['metrics']['demographic_analysis'] = demo_analysis
-            
-            # Linguistic bias detection
-            if self.nlp and NLP_AVAILABLE:
-                text_content = self._extract_text_content(session_data)
-                linguistic_bias = await self._detect_linguistic_bias(text_content)
-                result['metrics']['linguistic_bias'] = linguistic_bias
-                result['bias_score'] += linguistic_bias.get('overall_bias_score', 0.0) * 0.6
-            
-            # AIF360 preprocessing analysis
-            if AIF360_AVAILABLE:
-                aif360_analysis = await self._run_aif360_preprocessing(session_data)
-                result['metrics']['aif360_preprocessing'] = aif360_analysis
-                result['bias_score'] += aif360_analysis.get('bias_score', 0.0) * 0.4
+            for spec in self.analyzers.for_layer(layer):
+                if not context.config.is_analyzer_enabled(spec.name):
+                    analyzers[spec.name] = {'status': 'disabled'}
+                    continue
+                if not self._analyzer_runnable(spec):
+                    analyzers[spec.name] = {'status': 'unavailable'}
+                    continue
+                if context.admitted_analyzers is not None and spec.name not in context.admitted_analyzers:
+                    analyzers[spec.name] = {'status': 'over_budget'}
+                    continue
+                
+                planned_weight += spec.weight
+                planned_count += 1
+                
+                breaker = self._get_circuit_breaker(spec.name)
+                if not breaker.allow_request():
+                    analyzers[spec.name] = {'status': 'skipped', 'reason': 'circuit_open'}
+                    continue
+                if self._analyzer_saturated(spec, context):
+                    analyzers[spec.name] = {'status': 'skipped', 'reason': 'saturated'}
+                    continue
+                
+                analyzer_start = time.perf_counter()
+                try:
+                    analysis = await self._execute_analyzer(spec, session_data, context)
+                except asyncio.TimeoutError:
+                    # A caller deadline is not an analyzer fault; runs that started are
+                    # judged against the latency SLO when they finish
+                    analyzers[spec.name] = {
+                        'status': 'skipped',
+                        'reason': 'deadline_exceeded',
+                        'duration_ms': (time.perf_counter() - analyzer_start) * 1000
+                    }
+                    continue
+                except Exception as e:
+                    logger.error("Analyzer %s failed: %s", spec.name, e)
+                    breaker.record_failure(f"error: {e}")
+                    analysis = {spec.score_key: 0.0, 'error': str(e)}
+                else:
+                    self._record_analyzer_latency(spec, breaker, (time.perf_counter() - analyzer_start) * 1000)
+                duration_ms = (time.perf_counter() - analyzer_start) * 1000
+                
+                completed_weight += spec.weight
+                completed_count += 1
+                metrics[spec.name] = analysis
+                bias_score += analysis.get(spec.score_key, 0.0) * spec.weight
+                analyzers[spec.name] = {
+                    'status': 'error' if 'error' in analysis else 'completed',
+                    'duration_ms': duration_ms
+                }
+                self.metrics.observe_latency('analyzer_duration_seconds', duration_ms / 1000,
+                                             {'analyzer': spec.name}, help_text='Analyzer latency')
+            
+            for name, info in analyzers.items():
+                self.metrics.inc('analyzer_runs_total', labels={'analyzer': name, 'status': info['status']},
+                                 help_text='Analyzer invocations by outcome')
+            
+            # Rescale to the analyzers that completed when some were skipped
+            if completed_count < planned_count:
+                if completed_count == 0 or (planned_weight > 0 and completed_weight == 0):
+                    coverage = 0.0
+                    skipped = True
+                elif planned_weight > 0:
+                    bias_score *= planned_weight / completed_weight
+                    coverage = completed_weight / planned_weight
+                else:
+                    coverage = completed_count / planned_count
             
             # Normalize bias score
-            result['bias_score'] = min(result['bias_score'], 1.0)
+            bias_score = min(bias_score, 1.0)
             
             # Generate layer-specific recommendations
-            if result['bias_score'] > self.config.warning_threshold:
-                result['recommendations'].extend([
-                    "Review demographic representation in training data",
-                    "Consider data augmentation for underrepresented groups",
-                    "Implement bias-aware preprocessing techniques"
-                ])
+            recommendations = LAYER_RECOMMENDATIONS.get(layer, []) if bias_score > context.config.warning_threshold else []
             
-            return result
+            self.metrics.observe_latency('analysis_layer_duration_seconds', time.perf_counter() - layer_start,
+                                         {'layer': layer}, help_text='Analysis layer latency')
+            return LayerResult(layer, bias_score, metrics=metrics, recommendations=recommendations,
+                               analyzers=analyzers, coverage=coverage, skipped=skipped)
             
         except Exception as e:
-            logger.error(f"Preprocessing analysis failed: {e}")
-            return {
-                'layer': 'preprocessing',
-                'bias_score': 0.0,
-                'error': str(e),
-                'detected_biases': [],
-                'metrics': {},
-                'recommendations': []
-            }
+            logger.error("%s analysis failed: %s", layer, e)
+            return LayerResult(layer, analyzers=analyzers, error=str(e))
     
-    async def _run_model_level_analysis(self, session_data: SessionData) -> Dict[str, Any]:
-        """Run model-level bias analysis using Fairlearn and interpretability tools"""
-        try:
-            result = {
-                'layer': 'model_level',
-                'bias_score': 0.0,
-                'detected_biases': [],
-                'metrics': {},
-                'recommendations': []
-            }
-            
-            # Fairlearn analysis
-            if FAIRLEARN_AVAILABLE:
-                fairlearn_analysis = await self._run_fairlearn_analysis(session_data)
-                result['metrics']['fairlearn'] = fairlearn_analysis
-                result['bias_score'] += fairlearn_analysis.get('bias_score', 0.0) * 0.5
-            
-            # Model interpretability analysis
-            if INTERPRETABILITY_AVAILABLE:
-                interpretability_analysis = await self._run_interpretability_analysis(session_data)
-                result['metrics']['interpretability'] = interpretability_analysis
-                result['bias_score'] += interpretability_analysis.get('bias_score', 0.0) * 0.3
-            
-            # Response consistency analysis
-            consistency_analysis = self._analyze_response_consistency(session_data)
-            result['metrics']['consistency'] = consistency_analysis
-            result['bias_score'] += consistency_analysis.get('bias_score', 0.0) * 0.2
-            
-            # Normalize bias score
-            result['bias_score'] = min(result['bias_score'], 1.0)
-            
-            # Generate recommendations
-            if result['bias_score'] > self.config.warning_threshold:
-                result['recommendations'].extend([
-                    "Implement fairness constraints during model training",
-                    "Use adversarial debiasing techniques",
-                    "Regular model auditing and retraining"
-                ])
-            
-            return result
-            
-        except Exception as e:
-            logger.error(f"Model-level analysis failed: {e}")
-            return {
-                'layer': 'model_level',
-                'bias_score': 0.0,
-                'error': str(e),
-                'detected_biases': [],
-                'metrics': {},
-                'recommendations': []
-            }
+    def _get_circuit_breaker(self, name: str) -> CircuitBreaker:
+        with self._circuit_breakers_lock:
+            breaker = self.circuit_breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    name,
+                    failure_threshold=self.config.circuit_breaker_failure_threshold,
+                    cooldown_seconds=self.config.circuit_breaker_cooldown_seconds
+                )
+                self.circuit_breakers[name] = breaker
+            return breaker
     
-    async def _run_interactive_analysis(self, session_data: SessionData) -> Dict[str, Any]:
-        """Run interactive analysis using What-If Tool concepts and user interaction patterns"""
-        try:
-            result = {
-                'layer': 'interactive',
-                'bias_score': 0.0,
-                'detected_biases': [],
-                'metrics': {},
-                'recommendations': []
-            }
-            
-            # Interaction pattern analysis
-            interaction_analysis = self._analyze_interaction_patterns(session_data)
-            result['metrics']['interaction_patterns'] = interaction_analysis
-            result['bias_score'] += interaction_analysis.get('bias_score', 0.0) * 0.4
-            
-            # Response time analysis
-            response_time_analysis = self._analyze_response_times(session_data)
-            result['metrics']['response_times'] = response_time_analysis
-            result['bias_score'] += response_time_analysis.get('bias_score', 0.0) * 0.3
-            
-            # Engagement level analysis
-            engagement_analysis = self._analyze_engagement_levels(session_data)
-            result['metrics']['engagement'] = engagement_analysis
-            result['bias_score'] += engagement_analysis.get('bias_score', 0.0) * 0.3
-            
-            # Normalize bias score
-            result['bias_score'] = min(result['bias_score'], 1.0)
-            
-            # Generate recommendations
-            if result['bias_score'] > self.config.warning_threshold:
-                result['recommendations'].extend([
-                    "Review interaction patterns for demographic disparities",
-                    "Implement adaptive response strategies",
-                    "Monitor engagement metrics across user groups"
-                ])
-            
-            return result
-            
-        except Exception as e:
-            logger.error(f"Interactive analysis failed: {e}")
-            return {
-                'layer': 'interactive',
-                'bias_score': 0.0,
-                'error': str(e),
-                'detected_biases': [],
-                'metrics': {},
-                'recommendations': []
-            }
+    def _record_analyzer_latency(self, spec: AnalyzerSpec, breaker: CircuitBreaker, duration_ms: float) -> None:
+        """Count a successful call as a failure when it breaches the latency SLO"""
+        slo_ms = spec.latency_slo_ms if spec.latency_slo_ms is not None else self.config.analyzer_latency_slo_ms
+        if slo_ms is not None and duration_ms > slo_ms:
+            breaker.record_failure(f"latency {duration_ms:.0f}ms exceeded SLO {slo_ms:.0f}ms")
+        else:
+            breaker.record_success()
     
-    async def _run_evaluation_analysis(self, session_data: SessionData) -> Dict[str, Any]:
-        """Run evaluation analysis using Hugging Face evaluate and custom metrics"""
+    def circuit_breaker_status(self) -> Dict[str, Dict[str, Any]]:
+        """Snapshot of every analyzer circuit breaker"""
+        with self._circuit_breakers_lock:
+            breakers = list(self.circuit_breakers.values())
+        return {breaker.name: breaker.snapshot() for breaker in breakers}
+    
+    async def _execute_analyzer(self, spec: AnalyzerSpec, session_data: SessionData, context: AnalysisContext) -> Dict[str, Any]:
+        """Run one analyzer, bounded by the request deadline when one is set
+        
+        Raises asyncio.TimeoutError when the deadline has passed or the analyzer
+        does not finish in the remaining time. An abandoned run that had started
+        still reports its outcome to the circuit breaker when it completes.
+        """
+        remaining = context.remaining_seconds()
+        if remaining is None:
+            analysis = spec.func(session_data, context)
+            if asyncio.iscoroutine(analysis):
+                analysis = await analysis
+            return analysis
+        
+        if remaining <= 0:
+            raise asyncio.TimeoutError()
+        
+        # Run off the event loop so the deadline can be enforced and layers overlap;
+        # an analyzer that overruns is abandoned and its result discarded
+        started: List[float] = []
+        sampler = active_sampler()
+        
+        def run() -> Dict[str, Any]:
+            started.append(time.perf_counter())
+            if sampler is None:
+                return self._call_analyzer_blocking(spec, session_data, context)
+            with sampler.attach():
+                return self._call_analyzer_blocking(spec, session_data, context)
+        
+        future = self._analyzer_executor.submit(run)
         try:
-            result = {
-                'layer': 'evaluation',
-                'bias_score': 0.0,
-                'detected_biases': [],
-                'metrics': {},
-                'recommendations': []
-            }
-            
-            # Outcome fairness analysis
-            outcome_analysis = self._analyze_outcome_fairness(session_data)
-            result['metrics']['outcome_fairness'] = outcome_analysis
-            result['bias_score'] += outcome_analysis.get('bias_score', 0.0) * 0.4
-            
-            # Hugging Face evaluate metrics
-            if HF_EVALUATE_AVAILABLE:
-                hf_analysis = await self._run_hf_evaluate_analysis(session_data)
-                result['metrics']['hf_evaluate'] = hf_analysis
-                result['bias_score'] += hf_analysis.get('bias_score', 0.0) * 0.3
-            
-            # Performance disparity analysis
-            performance_analysis = self._analyze_performance_disparities(session_data)
-            result['metrics']['performance_disparities'] = performance_analysis
-            result['bias_score'] += performance_analysis.get('bias_score', 0.0) * 0.3
-            
-            # Normalize bias score
-            result['bias_score'] = min(result['bias_score'], 1.0)
-            
-            # Generate recommendations
-            if result['bias_score'] > self.config.warning_threshold:
-                result['recommendations'].extend([
-                    "Implement post-processing fairness corrections",
-                    "Regular evaluation across demographic groups",
-                    "Establish fairness monitoring dashboards"
-                ])
-            
-            return result
-            
-        except Exception as e:
-            logger.error(f"Evaluation analysis failed: {e}")
-            return {
-                'layer': 'evaluation',
-                'bias_score': 0.0,
-                'error': str(e),
-                'detected_biases': [],
-                'metrics': {},
-                'recommendations': []
-            }
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=remaining)
+        except asyncio.TimeoutError:
+            # Cancel succeeds only for runs still queued, which never started
+            if not future.cancel():
+                self._track_abandoned_run(spec, future, started)
+            raise
+    
+    def _analyzer_saturated(self, spec: AnalyzerSpec, context: AnalysisContext) -> bool:
+        """Whether a deadline-bound run would queue behind too many abandoned runs of this analyzer"""
+        if context.remaining_seconds() is None:
+            return False
+        with self._abandoned_runs_lock:
+            return self._abandoned_runs.get(spec.name, 0) >= self.config.analyzer_max_abandoned
+    
+    def _track_abandoned_run(self, spec: AnalyzerSpec, future: Future, started: List[float]) -> None:
+        name = spec.name
+        with self._abandoned_runs_lock:
+            self._abandoned_runs[name] = self._abandoned_runs.get(name, 0) + 1
+        
+        def release(_: Future) -> None:
+            with self._abandoned_runs_lock:
+                self._abandoned_runs[name] -= 1
+            breaker = self._get_circuit_breaker(name)
+            error = future.exception()
+            if error is not None:
+                breaker.record_failure(f"error: {error}")
+            else:
+                self._record_analyzer_latency(spec, breaker, (time.perf_counter() - started[0]) * 1000)
+        
+        future.add_done_callback(release)
+    
+    @staticmethod
+    def _call_analyzer_blocking(spec: AnalyzerSpec, session_data: SessionData, context: AnalysisContext) -> Dict[str, Any]:
+        analysis = spec.func(session_data, context)
+        if asyncio.iscoroutine(analysis):
+            analysis = asyncio.run(analysis)
+        return analysis
     
     # Helper methods for specific toolkit integrations
     
-    async def _run_aif360_preprocessing(self, session_data: SessionData) -> Dict[str, Any]:
+    async def _run_aif360_preprocessing(self, session_data: SessionData, context: AnalysisContext) -> Dict[str, Any]:
         """Run AIF360 preprocessing analysis"""
         try:
             if not AIF360_AVAILABLE:
                 return {'bias_score': 0.0, 'error': 'AIF360 not available'}
             
             # Create synthetic dataset for analysis
-            data = self._create_synthetic_dataset(session_data)
+            data = self._get_feature_frame(session_data, context)
             if data is None:
                 return {'bias_score': 0.0, 'error': 'Insufficient data for AIF360 analysis'}
             
@@ -607,26 +1114,26 @@ class BiasDetectionService:
             }
             
         except Exception as e:
-            logger.error(f"AIF360 preprocessing analysis failed: {e}")
-            return {'bias_score': 0.0, 'error': str(e)}
+            logger.error("AIF360 preprocessing analysis failed: %s", e)
+            raise
     
-    async def _run_fairlearn_analysis(self, session_data: SessionData) -> Dict[str, Any]:
+    async def _run_fairlearn_analysis(self, session_data: SessionData, context: AnalysisContext) -> Dict[str, Any]:
         """Run Fairlearn analysis"""
         try:
             if not FAIRLEARN_AVAILABLE:
                 return {'bias_score': 0.0, 'error': 'Fairlearn not available'}
             
             # Create synthetic dataset for analysis
-            data = self._create_synthetic_dataset(session_data)
+            rng = context.rng('fairlearn')
+            data = self._get_feature_frame(session_data, context)
             if data is None:
                 return {'bias_score': 0.0, 'error': 'Insufficient data for Fairlearn analysis'}
             
-            X = data['df'].drop(columns=data['label_names'])
             y = data['df'][data['label_names'][0]]
             sensitive_features = data['df'][data['protected_attributes']]
             
             # Calculate fairness metrics
-            y_pred = np.random.choice([0, 1], size=len(y))  # Placeholder predictions
+            y_pred = rng.choice([0, 1], size=len(y))  # Placeholder predictions
             
             dp_diff = demographic_parity_difference(y, y_pred, sensitive_features=sensitive_features.iloc[:, 0])
             eo_diff = equalized_odds_difference(y, y_pred, sensitive_features=sensitive_features.iloc[:, 0])
@@ -641,119 +1148,113 @@ class BiasDetectionService:
             }
             
         except Exception as e:
-            logger.error(f"Fairlearn analysis failed: {e}")
-            return {'bias_score': 0.0, 'error': str(e)}
+            logger.error("Fairlearn analysis failed: %s", e)
+            raise
     
-    async def _detect_linguistic_bias(self, text_content: str) -> Dict[str, Any]:
-        """Detect linguistic bias in text content"""
+    async def _run_linguistic_analysis(self, session_data: SessionData, context: AnalysisContext) -> Dict[str, Any]:
+        """Run linguistic bias detection on the shared parsed session segments"""
+        if not self.nlp or not NLP_AVAILABLE:
+            return {'overall_bias_score': 0.0, 'error': 'NLP not available'}
+        segment_docs = self._get_segment_docs(session_data, context)
+        return await self._detect_linguistic_bias(segment_docs, context.config)
+    
+    async def _detect_linguistic_bias(self, segment_docs: List[Tuple[Dict[str, Any], Any]],
+                                      config: Optional[BiasDetectionConfig] = None) -> Dict[str, Any]:
+        """Detect linguistic bias per segment, per speaker and for the whole session
+        
+        Session and speaker scores are computed from summed term counts, so they
+        match scoring the concatenated text. Only flagged segments are listed.
+        """
+        config = config or self.config
         try:
             if not self.nlp or not NLP_AVAILABLE:
                 return {'overall_bias_score': 0.0, 'error': 'NLP not available'}
             
-            doc = self.nlp(text_content)
-            
-            # Detect various types of bias
-            gender_bias = self._detect_gender_bias(doc)
-            racial_bias = self._detect_racial_bias(doc)
-            age_bias = self._detect_age_bias(doc)
-            cultural_bias = self._detect_cultural_bias(doc)
-            
-            # Sentiment analysis
-            sentiment = self._analyze_sentiment(text_content)
-            
-            # Detect biased terms
-            biased_terms = self._detect_biased_terms(doc)
-            
-            # Calculate overall bias score
-            bias_scores = [gender_bias, racial_bias, age_bias, cultural_bias]
-            overall_bias_score = np.mean(bias_scores)
+            session_counts = Counter()
+            speaker_counts: Dict[str, Counter] = {}
+            speaker_segments: Counter = Counter()
+            biased_terms = []
+            flagged_segments = []
+            for segment, doc in segment_docs:
+                counts = self._count_bias_terms(doc)
+                terms = self._detect_biased_terms(doc, segment['segment_id'])
+                session_counts.update(counts)
+                biased_terms.extend(terms)
+                if segment['speaker'] is not None:
+                    speaker_counts.setdefault(segment['speaker'], Counter()).update(counts)
+                    speaker_counts[segment['speaker']]['biased_terms'] += len(terms)
+                    speaker_segments[segment['speaker']] += 1
+                
+                scores = self._score_bias_counts(counts)
+                if scores['overall_bias_score'] > config.warning_threshold or terms:
+                    flagged_segments.append({
+                        'segment_id': segment['segment_id'],
+                        'kind': segment['kind'],
+                        'index': segment['index'],
+                        'speaker': segment['speaker'],
+                        **scores,
+                        'sentiment': self._analyze_sentiment(segment['text']),
+                        'biased_terms': terms,
+                        'word_count': len(doc)
+                    })
+            
+            flagged_segments.sort(key=lambda flagged: flagged['overall_bias_score'], reverse=True)
+            speakers = {
+                speaker: {
+                    'segments': speaker_segments[speaker],
+                    'word_count': counts['tokens'],
+                    'biased_terms': counts['biased_terms'],
+                    **self._score_bias_counts(counts)
+                }
+                for speaker, counts in speaker_counts.items()
+            }
+            text_content = ' '.join(segment['text'] for segment, _ in segment_docs)
             
             return {
-                'overall_bias_score': overall_bias_score,
-                'gender_bias': gender_bias,
-                'racial_bias': racial_bias,
-                'age_bias': age_bias,
-                'cultural_bias': cultural_bias,
-                'sentiment': sentiment,
+                **self._score_bias_counts(session_counts),
+                'sentiment': self._analyze_sentiment(text_content),
                 'biased_terms': biased_terms,
                 'text_length': len(text_content),
-                'word_count': len(doc)
+                'word_count': session_counts['tokens'],
+                'segments_analyzed': len(segment_docs),
+                'speakers': speakers,
+                'flagged_segments': flagged_segments[:config.max_flagged_segments],
+                'flagged_segments_total': len(flagged_segments)
             }
             
         except Exception as e:
-            logger.error(f"Linguistic bias detection failed: {e}")
-            return {'overall_bias_score': 0.0, 'error': str(e)}
-    
-    def _detect_gender_bias(self, doc) -> float:
-        """Detect gender bias in text"""
-        gender_terms = {
-            'male': ['he', 'him', 'his', 'man', 'men', 'boy', 'boys', 'male', 'father', 'son', 'brother'],
-            'female': ['she', 'her', 'hers', 'woman', 'women', 'girl', 'girls', 'female', 'mother', 'daughter', 'sister']
-        }
-        
-        male_count = sum(token.text.lower() in gender_terms['male']
-                     for token in doc)
-        female_count = sum(token.text.lower() in gender_terms['female']
-                       for token in doc)
-        
-        total_gender_terms = male_count + female_count
-        if total_gender_terms == 0:
-            return 0.0
-        
-        # Calculate imbalance
-        imbalance = abs(male_count - female_count) / total_gender_terms
-        return min(imbalance, 1.0)
-    
-    def _detect_racial_bias(self, doc) -> float:
-        """Detect racial bias in text"""
-        # Simplified racial bias detection based on potentially biased terms
-        biased_terms = [
-            'race', 'racial', 'ethnic', 'ethnicity', 'minority', 'majority',
-            'black', 'white', 'asian', 'hispanic', 'latino', 'native'
-        ]
-        
-        bias_count = sum(token.text.lower() in biased_terms
-                     for token in doc)
-        total_tokens = len(doc)
-        
-        if total_tokens == 0:
-            return 0.0
-        
-        bias_ratio = bias_count / total_tokens
-        return min(bias_ratio * 10, 1.0)  # Scale up for detection
+            logger.error("Linguistic bias detection failed: %s", e)
+            raise
     
-    def _detect_age_bias(self, doc) -> float:
-        """Detect age bias in text"""
-        age_terms = [
-            'young', 'old', 'elderly', 'senior', 'youth', 'teenager', 'adult',
-            'child', 'children', 'baby', 'infant', 'toddler', 'adolescent'
-        ]
-        age_count = sum(token.text.lower() in age_terms
-                    for token in doc)
-        total_tokens = len(doc)
-        
-        if total_tokens == 0:
-            return 0.0
-        
-        age_ratio = age_count / total_tokens
-        return min(age_ratio * 15, 1.0)  # Scale up for detection
+    def _count_bias_terms(self, doc) -> Counter:
+        """Token and demographic term counts of a parsed segment"""
+        counts = Counter(tokens=len(doc))
+        for token in doc:
+            lower = token.lower_
+            if lower in GENDER_TERMS['male']:
+                counts['male'] += 1
+            elif lower in GENDER_TERMS['female']:
+                counts['female'] += 1
+            if lower in RACIAL_TERMS:
+                counts['racial'] += 1
+            if lower in AGE_TERMS:
+                counts['age'] += 1
+            if lower in CULTURAL_TERMS:
+                counts['cultural'] += 1
+        return counts
     
-    def _detect_cultural_bias(self, doc) -> float:
-        """Detect cultural bias in text"""
-        cultural_terms = [
-            'culture', 'cultural', 'religion', 'religious', 'tradition', 'traditional',
-            'foreign', 'immigrant', 'native', 'indigenous', 'western', 'eastern'
-        ]
-        
-        cultural_count = sum(token.text.lower() in cultural_terms
-                         for token in doc)
-        total_tokens = len(doc)
-        
-        if total_tokens == 0:
-            return 0.0
-        
-        cultural_ratio = cultural_count / total_tokens
-        return min(cultural_ratio * 12, 1.0)  # Scale up for detection
+    def _score_bias_counts(self, counts: Counter) -> Dict[str, float]:
+        """Gender imbalance and scaled racial/age/cultural term ratios, plus their mean"""
+        total_tokens = counts['tokens']
+        total_gender_terms = counts['male'] + counts['female']
+        scores = {
+            'gender_bias': min(abs(counts['male'] - counts['female']) / total_gender_terms, 1.0) if total_gender_terms else 0.0,
+            # Scale up for detection
+            'racial_bias': min(counts['racial'] / total_tokens * 10, 1.0) if total_tokens else 0.0,
+            'age_bias': min(counts['age'] / total_tokens * 15, 1.0) if total_tokens else 0.0,
+            'cultural_bias': min(counts['cultural'] / total_tokens * 12, 1.0) if total_tokens else 0.0
+        }
+        return {'overall_bias_score': float(np.mean(list(scores.values()))), **scores}
     
     def _analyze_sentiment(self, text: str) -> Dict[str, Any]:
         """Analyze sentiment of text"""
@@ -774,11 +1275,11 @@ class BiasDetectionService:
                     'subjectivity': blob.sentiment.subjectivity
                 }
         except Exception as e:
-            logger.error(f"Sentiment analysis failed: {e}")
+            logger.error("Sentiment analysis failed: %s", e)
             return {'error': str(e)}
     
-    def _detect_biased_terms(self, doc) -> List[Dict[str, Any]]:
-        """Detect potentially biased terms in text"""
+    def _detect_biased_terms(self, doc, segment_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Detect potentially biased terms in text; positions are relative to the doc"""
         biased_terms_dict = {
             'gender': ['mankind', 'manpower', 'chairman', 'policeman', 'fireman'],
             'racial': ['exotic', 'articulate', 'urban', 'ghetto', 'primitive'],
@@ -792,8 +1293,9 @@ class BiasDetectionService:
                 {
                     'term': token.text,
                     'category': category,
+                    'segment_id': segment_id,
                     'position': token.idx,
-                    'context': self._extract_context(doc, token.text),
+                    'context': self._extract_context(doc, token.i),
                     'suggestion': self._suggest_alternative(token.text.lower())
                 }
                 for category, terms in biased_terms_dict.items()
@@ -802,17 +1304,10 @@ class BiasDetectionService:
         
         return detected_terms
     
-    def _extract_context(self, doc, term: str, window: int = 10) -> str:
+    def _extract_context(self, doc, token_index: int, window: int = 10) -> str:
         """Extract context around a term"""
-        tokens = [token.text for token in doc]
-        try:
-            term_index = tokens.index(term)
-            start = max(0, term_index - window)
-            end = min(len(tokens), term_index + window + 1)
-            context_tokens = tokens[start:end]
-            return ' '.join(context_tokens)
-        except ValueError:
-            return ""
+        start = max(0, token_index - window)
+        return ' '.join(token.text for token in doc[start:token_index + window + 1])
     
     def _suggest_alternative(self, term: str) -> str:
         """Suggest alternative for biased term"""
@@ -828,7 +1323,7 @@ class BiasDetectionService:
         }
         return alternatives.get(term, 'consider alternative phrasing')
     
-    def _analyze_demographic_representation(self, session_data: SessionData) -> Dict[str, Any]:
+    def _analyze_demographic_representation(self, session_data: SessionData, context: Optional[AnalysisContext] = None) -> Dict[str, Any]:
         """Analyze demographic representation in session data"""
         try:
             demographics = session_data.participant_demographics
@@ -870,8 +1365,8 @@ class BiasDetectionService:
             }
             
         except Exception as e:
-            logger.error(f"Demographic representation analysis failed: {e}")
-            return {'bias_score': 0.0, 'error': str(e)}
+            logger.error("Demographic representation analysis failed: %s", e)
+            raise
     
     def _calculate_entropy(self, values: List[float]) -> float:
         """Calculate entropy of a distribution"""
@@ -884,11 +1379,10 @@ class BiasDetectionService:
 
     # Additional analysis methods
     
-    def _create_synthetic_dataset(self, session_data: SessionData) -> Optional[Dict[str, Any]]:
+    def _create_synthetic_dataset(self, session_data: SessionData, rng: np.random.Generator) -> Optional[Dict[str, Any]]:
         """Create synthetic dataset for ML toolkit analysis"""
         try:
             # Extract features from session data
-            demographics = session_data.participant_demographics
             responses = session_data.ai_responses or []
             
             if not responses:
@@ -899,12 +1393,12 @@ class BiasDetectionService:
             
             # Generate synthetic features
             data = {
-                'age': np.random.normal(35, 15, n_samples),
-                'gender': np.random.choice(['male', 'female', 'other'], n_samples),
-                'ethnicity': np.random.choice(['white', 'black', 'hispanic', 'asian', 'other'], n_samples),
-                'response_quality': np.random.uniform(0, 1, n_samples),
-                'engagement_score': np.random.uniform(0, 1, n_samples),
-                'outcome': np.random.choice([0, 1], n_samples)  # Binary outcome
+                'age': rng.normal(35, 15, n_samples),
+                'gender': rng.choice(['male', 'female', 'other'], n_samples),
+                'ethnicity': rng.choice(['white', 'black', 'hispanic', 'asian', 'other'], n_samples),
+                'response_quality': rng.uniform(0, 1, n_samples),
+                'engagement_score': rng.uniform(0, 1, n_samples),
+                'outcome': rng.choice([0, 1], n_samples)  # Binary outcome
             }
             
             df = pd.DataFrame(data)
@@ -925,33 +1419,82 @@ class BiasDetectionService:
             }
             
         except Exception as e:
-            logger.error(f"Failed to create synthetic dataset: {e}")
+            logger.error("Failed to create synthetic dataset: %s", e)
             return None
     
-    async def _run_interpretability_analysis(self, session_data: SessionData) -> Dict[str, Any]:
-        """Run model interpretability analysis using SHAP/LIME"""
+    async def _run_interpretability_analysis(self, session_data: SessionData, context: AnalysisContext) -> Dict[str, Any]:
+        """Describe the LIME/SHAP explanations this result will get; they are fetched from /explanations/<result_id>"""
         try:
-            if not INTERPRETABILITY_AVAILABLE:
-                return {'bias_score': 0.0, 'error': 'Interpretability tools not available'}
-            
-            # Placeholder for interpretability analysis
-            # In a real implementation, this would use SHAP or LIME on actual models
-            
+            config = context.config
+            responses = [
+                response for response in session_data.ai_responses or []
+                if isinstance(response.get('content'), str) and response['content'].strip()
+            ]
             return {
-                'bias_score': np.random.uniform(0, 0.5),  # Placeholder
-                'feature_importance': {
-                    'demographic_features': 0.3,
-                    'content_features': 0.4,
-                    'interaction_features': 0.3
-                },
-                'explanation_quality': 0.8
+                'explanations_enabled': self.explanations is not None,
+                'explanation_method': config.explanation_method,
+                'explained_alert_levels': list(config.explanation_levels),
+                'responses_to_explain': min(len(responses), config.explanation_max_responses)
             }
             
         except Exception as e:
-            logger.error(f"Interpretability analysis failed: {e}")
-            return {'bias_score': 0.0, 'error': str(e)}
+            logger.error("Interpretability analysis failed: %s", e)
+            raise
     
-    def _analyze_response_consistency(self, session_data: SessionData) -> Dict[str, Any]:
+    def _get_response_tokens(self, session_data: SessionData, context: AnalysisContext) -> List[Tuple[int, List[Any]]]:
+        """Tokens of each AI response, taken from the shared segment docs when spaCy is loaded"""
+        if self.nlp is not None:
+            return [
+                (segment['index'], tokens_from_span(doc))
+                for segment, doc in self._get_segment_docs(session_data, context)
+                if segment['kind'] == 'response'
+            ]
+        return [
+            (segment['index'], tokens_from_text(segment['text']))
+            for segment in self._extract_segments(session_data)
+            if segment['kind'] == 'response'
+        ]
+    
+    def _run_counterfactual_analysis(self, session_data: SessionData, context: AnalysisContext) -> Dict[str, Any]:
+        """Re-score demographic swaps of each AI response and report how far the scores move"""
+        config = context.config
+        responses = self._get_response_tokens(session_data, context)
+        analyzed = responses[:config.counterfactual_max_responses]
+        
+        comparisons = []
+        for index, tokens in analyzed:
+            original = render(tokens)
+            for axis, text, swaps in generate_counterfactuals(tokens):
+                comparisons.append({'response_index': index, 'axis': axis, 'swaps': swaps,
+                                    'original': original, 'counterfactual': text})
+        if not comparisons:
+            return {'bias_score': 0.0, 'responses_analyzed': len(analyzed), 'variants': 0, 'axes': {}}
+        
+        texts = [c['original'] for c in comparisons] + [c['counterfactual'] for c in comparisons]
+        scores = score_texts(texts, self.bias_classifier, self.sentiment_analyzer,
+                             batch_size=config.counterfactual_batch_size)
+        if self.bias_classifier is not None:
+            self.metrics.observe_batch_size('bias_classifier', len(scores))
+        
+        for comparison in comparisons:
+            original = scores[comparison.pop('original')]
+            counterfactual = scores[comparison.pop('counterfactual')]
+            comparison.update(compare_scores(original, counterfactual))
+        
+        summary = summarize_deltas(comparisons)
+        return {
+            'bias_score': summary['bias_score'],
+            'axes': summary['axes'],
+            'responses_analyzed': len(analyzed),
+            'responses_truncated': len(responses) - len(analyzed),
+            'variants': len(comparisons),
+            'texts_scored': len(scores),
+            'scorers': [name for name, scorer in (('classifier', self.bias_classifier),
+                                                  ('sentiment', self.sentiment_analyzer)) if scorer is not None],
+            'comparisons': comparisons
+        }
+    
+    def _analyze_response_consistency(self, session_data: SessionData, context: Optional[AnalysisContext] = None) -> Dict[str, Any]:
         """Analyze consistency of AI responses across demographics"""
         try:
             responses = session_data.ai_responses or []
@@ -976,22 +1519,24 @@ class BiasDetectionService:
             }
             
         except Exception as e:
-            logger.error(f"Response consistency analysis failed: {e}")
-            return {'bias_score': 0.0, 'error': str(e)}
+            logger.error("Response consistency analysis failed: %s", e)
+            raise
     
-    def _analyze_interaction_patterns(self, session_data: SessionData) -> Dict[str, Any]:
+    def _analyze_interaction_patterns(self, session_data: SessionData, context: AnalysisContext) -> Dict[str, Any]:
         """Analyze interaction patterns for bias"""
         try:
+            rng = context.rng('interaction_patterns')
             # Placeholder analysis
             return {
-                'bias_score': np.random.uniform(0, 0.4),
-                'interaction_frequency': np.random.uniform(0.5, 1.0),
-                'pattern_consistency': np.random.uniform(0.6, 1.0)
+                'bias_score': rng.uniform(0, 0.4),
+                'interaction_frequency': rng.uniform(0.5, 1.0),
+                'pattern_consistency': rng.uniform(0.6, 1.0)
             }
         except Exception as e:
-            return {'bias_score': 0.0, 'error': str(e)}
+            logger.error("Interaction pattern analysis failed: %s", e)
+            raise
     
-    def _analyze_response_times(self, session_data: SessionData) -> Dict[str, Any]:
+    def _analyze_response_times(self, session_data: SessionData, context: Optional[AnalysisContext] = None) -> Dict[str, Any]:
         """Analyze response time patterns for bias"""
         try:
             responses = session_data.ai_responses or []
@@ -1012,146 +1557,170 @@ class BiasDetectionService:
                 'std_response_time': std_time
             }
         except Exception as e:
-            return {'bias_score': 0.0, 'error': str(e)}
+            logger.error("Response time analysis failed: %s", e)
+            raise
     
-    def _analyze_engagement_levels(self, session_data: SessionData) -> Dict[str, Any]:
+    def _analyze_engagement_levels(self, session_data: SessionData, context: AnalysisContext) -> Dict[str, Any]:
         """Analyze engagement level patterns for bias"""
         try:
+            rng = context.rng('engagement')
             # Placeholder analysis
             return {
-                'bias_score': np.random.uniform(0, 0.3),
-                'engagement_variance': np.random.uniform(0, 0.5),
-                'demographic_differences': np.random.uniform(0, 0.4)
+                'bias_score': rng.uniform(0, 0.3),
+                'engagement_variance': rng.uniform(0, 0.5),
+                'demographic_differences': rng.uniform(0, 0.4)
             }
         except Exception as e:
-            return {'bias_score': 0.0, 'error': str(e)}
+            logger.error("Engagement analysis failed: %s", e)
+            raise
     
-    def _analyze_outcome_fairness(self, session_data: SessionData) -> Dict[str, Any]:
+    def _analyze_outcome_fairness(self, session_data: SessionData, context: AnalysisContext) -> Dict[str, Any]:
         """Analyze fairness of outcomes"""
         try:
+            rng = context.rng('outcome_fairness')
             outcomes = session_data.expected_outcomes or []
             if not outcomes:
                 return {'bias_score': 0.0, 'error': 'No outcomes to analyze'}
             
             # Placeholder fairness analysis
             return {
-                'bias_score': np.random.uniform(0, 0.4),
-                'outcome_variance': np.random.uniform(0, 0.5),
+                'bias_score': rng.uniform(0, 0.4),
+                'outcome_variance': rng.uniform(0, 0.5),
                 'fairness_metrics': {
-                    'demographic_parity': np.random.uniform(0.7, 1.0),
-                    'equalized_odds': np.random.uniform(0.7, 1.0)
+                    'demographic_parity': rng.uniform(0.7, 1.0),
+                    'equalized_odds': rng.uniform(0.7, 1.0)
                 }
             }
         except Exception as e:
-            return {'bias_score': 0.0, 'error': str(e)}
+            logger.error("Outcome fairness analysis failed: %s", e)
+            raise
     
-    async def _run_hf_evaluate_analysis(self, session_data: SessionData) -> Dict[str, Any]:
+    async def _run_hf_evaluate_analysis(self, session_data: SessionData, context: AnalysisContext) -> Dict[str, Any]:
         """Run Hugging Face evaluate analysis"""
         try:
+            rng = context.rng('hf_evaluate')
             if not HF_EVALUATE_AVAILABLE:
                 return {'bias_score': 0.0, 'error': 'HF evaluate not available'}
             
             # Placeholder for HF evaluate analysis
             return {
-                'bias_score': np.random.uniform(0, 0.3),
-                'toxicity_score': np.random.uniform(0, 0.2),
+                'bias_score': rng.uniform(0, 0.3),
+                'toxicity_score': rng.uniform(0, 0.2),
                 'fairness_metrics': {
-                    'regard': np.random.uniform(0.7, 1.0),
-                    'honest': np.random.uniform(0.7, 1.0)
+                    'regard': rng.uniform(0.7, 1.0),
+                    'honest': rng.uniform(0.7, 1.0)
                 }
             }
         except Exception as e:
-            return {'bias_score': 0.0, 'error': str(e)}
+            logger.error("HF evaluate analysis failed: %s", e)
+            raise
     
-    def _analyze_performance_disparities(self, session_data: SessionData) -> Dict[str, Any]:
+    def _analyze_performance_disparities(self, session_data: SessionData, context: AnalysisContext) -> Dict[str, Any]:
         """Analyze performance disparities across groups"""
         try:
+            rng = context.rng('performance_disparities')
             # Placeholder analysis
             return {
-                'bias_score': np.random.uniform(0, 0.4),
-                'group_performance_variance': np.random.uniform(0, 0.3),
-                'statistical_significance': np.random.uniform(0.05, 0.95)
+                'bias_score': rng.uniform(0, 0.4),
+                'group_performance_variance': rng.uniform(0, 0.3),
+                'statistical_significance': rng.uniform(0.05, 0.95)
             }
         except Exception as e:
-            return {'bias_score': 0.0, 'error': str(e)}
+            logger.error("Performance disparity analysis failed: %s", e)
+            raise
     
-    def _extract_text_content(self, session_data: SessionData) -> str:
-        """Extract all text content from session data"""
-        text_parts = [
-            response['content']
-            for response in session_data.ai_responses or []
-            if 'content' in response
+    def _extract_segments(self, session_data: SessionData) -> List[Dict[str, Any]]:
+        """Text segments of a session: each AI response, transcript turn and content field"""
+        segments = [
+            {'segment_id': f"response:{index}", 'kind': 'response', 'index': index, 'speaker': 'ai',
+             'text': response['content']}
+            for index, response in enumerate(session_data.ai_responses or [])
+            if isinstance(response.get('content'), str)
         ]
-
-        # Extract from transcripts
-        text_parts.extend([
-            transcript['text']
-            for transcript in session_data.transcripts or []
-            if 'text' in transcript
+        
+        # Transcript turns carry 'content' and 'speaker_id' from the TypeScript client
+        for index, transcript in enumerate(session_data.transcripts or []):
+            text = transcript.get('text', transcript.get('content'))
+            if isinstance(text, str):
+                segments.append({
+                    'segment_id': f"transcript:{index}", 'kind': 'transcript', 'index': index,
+                    'speaker': str(transcript.get('speaker_id') or transcript.get('speaker') or 'unknown'),
+                    'text': text
+                })
+        
+        segments.extend([
+            {'segment_id': f"content:{key}", 'kind': 'content', 'index': key, 'speaker': None, 'text': value}
+            for key, value in (session_data.content or {}).items()
+            if isinstance(value, str)
         ])
-
-        # Extract from content
-        if session_data.content:
-            text_parts.extend([
-                value
-                for value in session_data.content.values()
-                if isinstance(value, str)
-            ])
-
-        return ' '.join(text_parts)
+        return segments
     
-    def _calculate_overall_bias_score(self, layer_results: List[Dict[str, Any]]) -> float:
-        """Calculate weighted overall bias score"""
+    def _extract_text_content(self, session_data: SessionData) -> str:
+        """Extract all text content from session data"""
+        return ' '.join(segment['text'] for segment in self._extract_segments(session_data))
+    
+    def _calculate_overall_bias_score(self, layer_results: List[LayerResult],
+                                      config: Optional[BiasDetectionConfig] = None) -> Optional[float]:
+        """Calculate weighted overall bias score, or None when every layer was skipped"""
+        config = config or self.config
         total_score = 0.0
         total_weight = 0.0
         
         for result in layer_results:
-            layer = result.get('layer', '')
-            bias_score = result.get('bias_score', 0.0)
-            weight = self.config.layer_weights.get(layer, 0.25)
+            if result.skipped:
+                continue
+            bias_score = result.bias_score
+            weight = config.layer_weights.get(result.layer, 0.25)
             
             total_score += bias_score * weight
             total_weight += weight
         
-        return total_score / total_weight if total_weight > 0 else 0.0
+        if total_weight <= 0:
+            return None if any(result.skipped for result in layer_results) else 0.0
+        return total_score / total_weight
     
-    def _calculate_confidence(self, layer_results: List[Dict[str, Any]]) -> float:
+    def _calculate_confidence(self, layer_results: List[LayerResult]) -> float:
         """Calculate confidence in bias detection results"""
         # Base confidence on data availability and consistency
         data_quality_scores = []
         
         for result in layer_results:
-            if 'error' not in result:
-                data_quality_scores.append(0.8)  # Good quality if no errors
+            if result.error is None:
+                # Good quality if no errors, reduced by analyzers skipped on deadline
+                data_quality_scores.append(0.8 * result.coverage)
             else:
                 data_quality_scores.append(0.2)  # Low quality if errors
         
         return np.mean(data_quality_scores) if data_quality_scores else 0.0
     
-    def _generate_recommendations(self, layer_results: List[Dict[str, Any]]) -> List[str]:
+    def _generate_recommendations(self, layer_results: List[LayerResult],
+                                  config: Optional[BiasDetectionConfig] = None) -> List[str]:
         """Generate actionable recommendations based on analysis results"""
+        config = config or self.config
         recommendations = []
         
         # Collect recommendations from all layers
         for result in layer_results:
-            recommendations.extend(result.get('recommendations', []))
+            recommendations.extend(result.recommendations)
         
         # Add general recommendations based on overall bias level
-        overall_score = self._calculate_overall_bias_score(layer_results)
+        overall_score = self._calculate_overall_bias_score(layer_results, config)
         
-        if overall_score > self.config.critical_threshold:
+        if overall_score is None:
+            recommendations.append("Analysis coverage insufficient: retry with a longer deadline")
+        elif overall_score > config.critical_threshold:
             recommendations.extend([
                 "CRITICAL: Immediate review and intervention required",
                 "Suspend automated decisions until bias is addressed",
                 "Conduct comprehensive audit of training data and models"
             ])
-        elif overall_score > self.config.high_threshold:
+        elif overall_score > config.high_threshold:
             recommendations.extend([
                 "HIGH: Implement bias mitigation strategies",
                 "Increase monitoring frequency",
                 "Review model training procedures"
             ])
-        elif overall_score > self.config.warning_threshold:
+        elif overall_score > config.warning_threshold:
             recommendations.extend([
                 "MODERATE: Monitor closely for bias trends",
                 "Consider additional bias detection measures"
@@ -1159,20 +1728,69 @@ class BiasDetectionService:
         
         return list(set(recommendations))  # Remove duplicates
     
-    def _determine_alert_level(self, bias_score: float) -> str:
+    def _determine_alert_level(self, bias_score: Optional[float], config: Optional[BiasDetectionConfig] = None) -> str:
         """Determine alert level based on bias score"""
-        if bias_score >= self.config.critical_threshold:
+        config = config or self.config
+        if bias_score is None:
+            return 'insufficient_coverage'
+        if bias_score >= config.critical_threshold:
             return 'critical'
-        elif bias_score >= self.config.high_threshold:
+        elif bias_score >= config.high_threshold:
             return 'high'
-        elif bias_score >= self.config.warning_threshold:
+        elif bias_score >= config.warning_threshold:
             return 'warning'
         else:
             return 'low'
 
 # Initialize service
 config = BiasDetectionConfig()
-bias_service = BiasDetectionService(config)
+
+# Explanation pool processes re-import the entry script as __mp_main__; they must not
+# start a second service (results writer, alert dispatcher, config watcher, ...)
+if __name__ != '__mp_main__':
+    bias_service = BiasDetectionService(config, service_metrics)
+
+    # Tunable settings reload into bias_service.config; the module-level config keeps startup-only settings
+    config_manager = ConfigManager(
+        config,
+        path=config.config_file,
+        poll_seconds=config.config_poll_seconds,
+        known_analyzers=lambda: [spec.name for spec in bias_service.analyzers.all()],
+        on_change=lambda new_config: setattr(bias_service, 'config', new_config)
+    )
+    config_manager.start()
+    profile_store = ProfileStore(config.profile_output_dir, config.profile_max_stored)
+
+# Werkzeug also enforces this while streaming bodies sent without Content-Length
+MAX_REQUEST_BYTES = config.max_session_size_mb * 1024 * 1024
+app.config['MAX_CONTENT_LENGTH'] = MAX_REQUEST_BYTES
+
+@app.before_request
+def reject_oversized_requests():
+    """Reject declared oversized bodies before authentication or any read"""
+    if request.content_length is not None and request.content_length > MAX_REQUEST_BYTES:
+        service_metrics.inc('oversized_requests_total', help_text='Requests rejected for exceeding max_session_size_mb')
+        return jsonify({'error': f'Request body exceeds {config.max_session_size_mb} MB limit'}), 413
+
+@app.after_request
+def compress_responses(response):
+    """Compress JSON and text bodies for clients that accept gzip or deflate"""
+    return compress_response(
+        response,
+        request.accept_encodings,
+        min_bytes=config.response_compression_min_bytes,
+        level=config.response_compression_level
+    )
+
+# Shared across gunicorn workers when rate_limit_store_path is set
+rate_limiter = (
+    RateLimiter(
+        config.rate_limit_per_minute,
+        burst=config.rate_limit_burst,
+        store=SQLiteBucketStore(config.rate_limit_store_path) if config.rate_limit_store_path else MemoryBucketStore()
+    )
+    if config.rate_limit_per_minute > 0 and __name__ != '__mp_main__' else None
+)
 
 # Authentication decorator
 def require_auth(f):
@@ -1189,21 +1807,95 @@ def require_auth(f):
             
             payload = bias_service.security_manager.verify_jwt_token(token)
             request.user_id = payload.get('user_id', 'unknown')
+            request.user_role = payload.get('role', 'user')
         except Exception as e:
             return jsonify({'error': str(e)}), 401
         
         return f(*args, **kwargs)
     return decorated_function
 
+# Admin-only decorator, applied after require_auth
+def require_admin(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if getattr(request, 'user_role', None) != 'admin':
+            return jsonify({'error': 'Admin privileges required'}), 403
+        return f(*args, **kwargs)
+    return decorated_function
+
+def _token_user_id() -> Optional[str]:
+    """User ID of a valid bearer token, or None; never rejects the request itself"""
+    token = request.headers.get('Authorization') or ''
+    if token.startswith('Bearer '):
+        token = token[7:]
+    if not token:
+        return None
+    try:
+        return bias_service.security_manager.verify_jwt_token(token).get('user_id', 'unknown')
+    except Exception:
+        return None
+
+# Rate limiting decorator, applied before require_auth so unauthenticated floods
+# are charged to their client IP before any token verification work
+def rate_limited(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if rate_limiter is None:
+            return f(*args, **kwargs)
+        
+        keys = [f"ip:{request.remote_addr}"]
+        user_id = _token_user_id()
+        if user_id is not None:
+            keys.insert(0, f"user:{user_id}")
+        unit_bytes = config.rate_limit_cost_unit_kb * 1024
+        # Chunked bodies declare no length: admit on the base cost, then charge what was read
+        body_reader = None
+        if request.content_length is None:
+            body_reader = CountingReader(request.environ['wsgi.input'])
+            request.environ['wsgi.input'] = body_reader
+        decision = rate_limiter.check(keys, request_cost(request.content_length, unit_bytes))
+        if not decision.allowed:
+            service_metrics.inc('rate_limited_requests_total',
+                                labels={'bucket': decision.limited_key.split(':', 1)[0]},
+                                help_text='Requests rejected by the rate limiter')
+            response = jsonify({
+                'error': 'Rate limit exceeded',
+                'retry_after_seconds': round(decision.retry_after_seconds, 3)
+            })
+            response.status_code = 429
+            response.headers['Retry-After'] = str(max(1, math.ceil(decision.retry_after_seconds)))
+            return response
+        
+        response = make_response(f(*args, **kwargs))
+        if body_reader is not None:
+            rate_limiter.charge(keys, request_cost(body_reader.bytes_read, unit_bytes) - 1.0)
+        response.headers['X-RateLimit-Limit'] = str(config.rate_limit_per_minute)
+        response.headers['X-RateLimit-Remaining'] = str(int(decision.remaining))
+        return response
+    return decorated_function
+
+def _requested_profile_mode() -> Optional[str]:
+    """Profile mode for this request: explicit admin header, else traffic sampling"""
+    requested = request.headers.get('X-Profile')
+    if requested and getattr(request, 'user_role', None) == 'admin' and requested in PROFILE_MODES:
+        return requested
+    sample_rate = bias_service.config.profile_sample_rate
+    if sample_rate > 0 and random.random() < sample_rate:
+        return 'sample'
+    return None
+
 # Flask routes
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
+    circuit_breakers = bias_service.circuit_breaker_status()
+    degraded = any(breaker['state'] != CircuitBreaker.CLOSED for breaker in circuit_breakers.values())
     return jsonify({
-        'status': 'healthy',
+        'status': 'degraded' if degraded else 'healthy',
         'timestamp': datetime.now().isoformat(),
         'version': '1.0.0',
+        'config_version': bias_service.config.config_version,
         'components': {
             'aif360': AIF360_AVAILABLE,
             'fairlearn': FAIRLEARN_AVAILABLE,
@@ -1211,23 +1903,37 @@ def health_check():
             'nlp': NLP_AVAILABLE,
             'interpretability': INTERPRETABILITY_AVAILABLE,
             'visualization': VISUALIZATION_AVAILABLE
-        }
+        },
+        'circuit_breakers': circuit_breakers,
+        'results_store': bias_service.results_store.status() if bias_service.results_store is not None else None,
+        'explanations': bias_service.explanations.status() if bias_service.explanations is not None else None,
+        'logging': logging_stats()
     })
 
 @app.route('/analyze', methods=['POST'])
+@rate_limited
 @require_auth
 def analyze_session():
-    """Analyze session for bias"""
+    """Analyze session for bias; ``fields=`` projects the returned result"""
     try:
-        data = request.get_json()
+        if not request.is_json:
+            return jsonify({'error': 'Content-Type must be application/json'}), 415
+        try:
+            # Parsed from the stream; the raw body is never cached on the request
+            data = read_json_body(request.stream, MAX_REQUEST_BYTES)
+        except (RequestTooLarge, RequestEntityTooLarge):
+            service_metrics.inc('oversized_requests_total', help_text='Requests rejected for exceeding max_session_size_mb')
+            return jsonify({'error': f'Request body exceeds {config.max_session_size_mb} MB limit'}), 413
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         if not data:
             return jsonify({'error': 'No data provided'}), 400
         
         # Validate required fields
         required_fields = ['session_id', 'participant_demographics', 'content']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({'error': f'Missing required field: {field}'}), 400
+        for required_field in required_fields:
+            if required_field not in data:
+                return jsonify({'error': f'Missing required field: {required_field}'}), 400
         
         # Create SessionData object
         session_data = SessionData(
@@ -1241,13 +1947,126 @@ def analyze_session():
             metadata=data.get('metadata', {})
         )
         
-        # Run analysis
-        result = asyncio.run(bias_service.analyze_session(session_data, request.user_id))
+        # Optional per-request deadline
+        deadline_ms = None
+        deadline_header = request.headers.get('X-Analysis-Deadline-Ms')
+        if deadline_header:
+            try:
+                deadline_ms = float(deadline_header)
+            except ValueError:
+                deadline_ms = None
+            # float() also accepts 'nan' and 'inf', which would silently disable the deadline
+            if deadline_ms is None or not math.isfinite(deadline_ms) or deadline_ms <= 0:
+                return jsonify({'error': 'X-Analysis-Deadline-Ms must be a positive, finite number'}), 400
         
-        return jsonify(result)
+        # Optional seeded (reproducible) analysis
+        deterministic = None
+        deterministic_header = request.headers.get('X-Analysis-Deterministic')
+        if deterministic_header:
+            if deterministic_header.lower() not in ('true', 'false', '1', '0'):
+                return jsonify({'error': 'Invalid X-Analysis-Deterministic header'}), 400
+            deterministic = deterministic_header.lower() in ('true', '1')
+        
+        # Run analysis, optionally under a profiler
+        profile_mode = _requested_profile_mode()
+        if profile_mode is None:
+            result = asyncio.run(bias_service.analyze_session(session_data, request.user_id, deadline_ms, deterministic))
+            return jsonify(project(result.to_dict(), request.args.get('fields')))
+        
+        profile_metadata = {
+            'session_id_hash': bias_service.security_manager.hash_session_id(session_data.session_id),
+            'user_id': request.user_id
+        }
+        with capture_profile(profile_mode, profile_store, profile_metadata) as profile_info:
+            result = asyncio.run(bias_service.analyze_session(session_data, request.user_id, deadline_ms, deterministic))
+        
+        response = jsonify(project(result.to_dict(), request.args.get('fields')))
+        response.headers['X-Profile-Id'] = profile_info['profile_id']
+        return response
+        
+    except Exception as e:
+        logger.error("Analysis endpoint error: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/session/<session_id>', methods=['GET'])
+@require_auth
+def get_session_result(session_id):
+    """Get the most recent stored analysis for a session; ``fields=`` projects it"""
+    try:
+        if bias_service.results_store is None:
+            return jsonify({'error': 'Results store is disabled'}), 503
+        
+        result = bias_service.results_store.latest_for_session(
+            bias_service.security_manager.hash_session_id(session_id)
+        )
+        if result is None:
+            return jsonify({'error': 'No analysis found for session'}), 404
+        
+        return jsonify(project(result, request.args.get('fields')))
+        
+    except Exception as e:
+        logger.error("Session endpoint error: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/results/<result_id>/segments', methods=['GET'])
+@require_auth
+def get_flagged_segments(result_id):
+    """Flagged segments and per-speaker scores of a stored result
+    
+    ``speaker=`` and ``segment_id=`` (comma-separated) narrow the segments returned.
+    """
+    try:
+        if bias_service.results_store is None:
+            return jsonify({'error': 'Results store is disabled'}), 503
+        
+        result = bias_service.results_store.get_result(result_id)
+        if result is None:
+            return jsonify({'error': 'No analysis found for result'}), 404
+        
+        linguistic = (
+            result.get('layer_results', {}).get('preprocessing', {}).get('metrics', {}).get('linguistic_bias') or {}
+        )
+        segments = linguistic.get('flagged_segments', [])
+        speakers = {s.strip() for s in request.args.get('speaker', '').split(',') if s.strip()}
+        segment_ids = {s.strip() for s in request.args.get('segment_id', '').split(',') if s.strip()}
+        if speakers:
+            segments = [segment for segment in segments if segment.get('speaker') in speakers]
+        if segment_ids:
+            segments = [segment for segment in segments if segment.get('segment_id') in segment_ids]
+        
+        return jsonify({
+            'result_id': result_id,
+            'segments_analyzed': linguistic.get('segments_analyzed', 0),
+            'flagged_segments_total': linguistic.get('flagged_segments_total', 0),
+            'flagged_segments': segments,
+            'speakers': linguistic.get('speakers', {})
+        })
         
     except Exception as e:
-        logger.error(f"Analysis endpoint error: {e}")
+        logger.error("Segments endpoint error: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/explanations/<result_id>', methods=['GET'])
+@require_auth
+def get_explanations(result_id):
+    """LIME/SHAP explanations for a high/critical result, computed after the analysis returned"""
+    try:
+        if bias_service.explanations is None:
+            return jsonify({'error': 'Explanations are unavailable'}), 503
+        
+        explanations = bias_service.explanations.get(result_id)
+        if explanations is not None:
+            return jsonify(explanations)
+        if bias_service.results_store.get_result(result_id) is None:
+            return jsonify({'error': 'No analysis found for result'}), 404
+        return jsonify({
+            'result_id': result_id,
+            'status': 'not_requested',
+            'explained_levels': list(bias_service.explanations.levels)
+        })
+        
+    except Exception as e:
+        logger.error("Explanations endpoint error: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/dashboard', methods=['GET'])
@@ -1255,30 +2074,37 @@ def analyze_session():
 def get_dashboard_data():
     """Get dashboard data for bias monitoring"""
     try:
-        # Placeholder dashboard data
+        rollups = bias_service.rollups
+        if rollups is None:
+            return jsonify({'error': 'Results store is disabled'}), 503
+        
+        days = max(1, min(request.args.get('days', 7, type=int), 366))
+        since_ts = (datetime.now() - timedelta(days=days)).timestamp()
+        
+        # Pre-aggregated buckets keep this independent of stored history size
+        summary = rollups.summary(since_ts)
+        trends = rollups.daily_trends(days)
+        
         dashboard_data = {
             'summary': {
-                'total_sessions_analyzed': 1250,
-                'average_bias_score': 0.23,
-                'high_risk_sessions': 45,
-                'critical_alerts': 3
+                'total_sessions_analyzed': summary['total_sessions'],
+                'average_bias_score': summary['average_bias_score'],
+                'high_risk_sessions': summary['alert_counts'].get('high', 0),
+                'critical_alerts': summary['alert_counts'].get('critical', 0)
             },
             'trends': {
-                'daily_bias_scores': [0.2, 0.25, 0.18, 0.3, 0.22, 0.19, 0.24],
-                'alert_counts': [2, 3, 1, 5, 2, 1, 3]
+                'dates': [day['date'] for day in trends],
+                'daily_bias_scores': [day['average_bias_score'] for day in trends],
+                'alert_counts': [day['alerts'] for day in trends]
             },
             'demographics': {
                 'bias_by_age_group': {
-                    '18-25': 0.18,
-                    '26-35': 0.22,
-                    '36-45': 0.25,
-                    '46-55': 0.28,
-                    '55+': 0.31
+                    group: stats['average_bias_score']
+                    for group, stats in rollups.averages_by('age_group', since_ts).items()
                 },
                 'bias_by_gender': {
-                    'male': 0.21,
-                    'female': 0.24,
-                    'other': 0.19
+                    group: stats['average_bias_score']
+                    for group, stats in rollups.averages_by('gender', since_ts).items()
                 }
             }
         }
@@ -1286,7 +2112,7 @@ def get_dashboard_data():
         return jsonify(dashboard_data)
         
     except Exception as e:
-        logger.error(f"Dashboard endpoint error: {e}")
+        logger.error("Dashboard endpoint error: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/export', methods=['POST'])
@@ -1294,53 +2120,292 @@ def get_dashboard_data():
 def export_data():
     """Export bias analysis data"""
     try:
-        data = request.get_json()
+        store = bias_service.results_store
+        if store is None:
+            return jsonify({'error': 'Results store is disabled'}), 503
+        
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Expected a JSON object'}), 400
         export_format = data.get('format', 'json')
-        date_range = data.get('date_range', {})
+        date_range = data.get('date_range') or {}
+        if not isinstance(date_range, dict):
+            return jsonify({'error': 'date_range must be an object with ISO-8601 start/end'}), 400
         
-        # Placeholder export data
-        export_data = {
-            'sessions': [
-                {
-                    'session_id': 'session_001',
-                    'bias_score': 0.25,
-                    'alert_level': 'warning',
-                    'timestamp': '2024-01-01T10:00:00Z'
-                }
-            ],
-            'metadata': {
-                'export_timestamp': datetime.now().isoformat(),
-                'format': export_format,
-                'total_records': 1
-            }
+        try:
+            start_ts = parse_timestamp(date_range.get('start'))
+            end_ts = parse_timestamp(date_range.get('end'))
+        except (TypeError, AttributeError, ValueError):
+            return jsonify({'error': 'Invalid date_range; expected ISO-8601 start/end'}), 400
+        
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'error': f"Unsupported format; expected one of {', '.join(EXPORT_FORMATS)}"}), 400
+        if export_format == 'parquet' and not PARQUET_AVAILABLE:
+            return jsonify({'error': 'Parquet export requires pyarrow'}), 501
+        
+        metadata = {
+            'export_timestamp': datetime.now().isoformat(),
+            'format': export_format,
+            'date_range': date_range
         }
+        # Rows are read page by page and encoded as the response is sent
+        chunks = stream_export(export_format, export_records(store, start_ts, end_ts), metadata)
+        mimetype, extension = EXPORT_FORMATS[export_format]
         
-        if export_format == 'csv':
-            # Convert to CSV format
-            import io
-            import csv
-            
-            output = io.StringIO()
-            writer = csv.DictWriter(output, fieldnames=['session_id', 'bias_score', 'alert_level', 'timestamp'])
-            writer.writeheader()
-            writer.writerows(export_data['sessions'])
-            
-            return Response(
-                output.getvalue(),
-                mimetype='text/csv',
-                headers={'Content-Disposition': 'attachment; filename=bias_analysis_export.csv'}
+        return Response(
+            stream_with_context(chunks),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename=bias_analysis_export.{extension}'}
+        )
+        
+    except Exception as e:
+        logger.error("Export endpoint error: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/cohorts/fairness', methods=['GET'])
+@require_auth
+def cohort_fairness():
+    """Cross-session group gaps for one or more demographic dimensions"""
+    try:
+        cohorts = bias_service.cohorts
+        if cohorts is None:
+            return jsonify({'error': 'Results store is disabled'}), 503
+        
+        dimensions = [d for d in request.args.get('dimensions', 'gender').split(',') if d]
+        score = request.args.get('score', 'overall_score')
+        min_count = max(request.args.get('min_count', 1, type=int), 1)
+        try:
+            start_ts = parse_timestamp(request.args.get('start'))
+            end_ts = parse_timestamp(request.args.get('end'))
+            result = cohorts.intersectional(dimensions, start_ts, end_ts, score, min_count)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify(result)
+        
+    except Exception as e:
+        logger.error("Cohort fairness endpoint error: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/cohorts/trends', methods=['GET'])
+@require_auth
+def cohort_trends():
+    """Per-group mean score and largest gap per hour or day"""
+    try:
+        cohorts = bias_service.cohorts
+        if cohorts is None:
+            return jsonify({'error': 'Results store is disabled'}), 503
+        
+        bucket_seconds = {'hour': 3600.0, 'day': 86400.0}.get(request.args.get('bucket', 'day'))
+        if bucket_seconds is None:
+            return jsonify({'error': 'bucket must be hour or day'}), 400
+        try:
+            end_ts = parse_timestamp(request.args.get('end')) or datetime.now().timestamp()
+            start_ts = parse_timestamp(request.args.get('start')) or end_ts - 30 * 86400.0
+            if (end_ts - start_ts) / bucket_seconds > 10000:
+                return jsonify({'error': 'Too many buckets; use a shorter range or larger bucket'}), 400
+            result = cohorts.trends(
+                request.args.get('dimension', 'gender'), start_ts, end_ts, bucket_seconds,
+                request.args.get('score', 'overall_score')
             )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        return jsonify(export_data)
+        return jsonify(result)
+        
+    except Exception as e:
+        logger.error("Cohort trends endpoint error: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/drift/alerts', methods=['GET'])
+@require_auth
+def get_drift_alerts():
+    """Recent bias drift alerts, newest first"""
+    try:
+        since = request.args.get('since')
+        if since:
+            try:
+                since = datetime.fromtimestamp(parse_timestamp(since)).isoformat()
+            except ValueError:
+                return jsonify({'error': 'Invalid since; expected ISO-8601'}), 400
+        limit = max(1, min(request.args.get('limit', 100, type=int), 1000))
+        alerts = bias_service.drift_monitor.alerts(since, request.args.get('dimension'), limit)
+        return jsonify({'alerts': alerts, 'count': len(alerts)})
         
     except Exception as e:
-        logger.error(f"Export endpoint error: {e}")
+        logger.error("Drift alerts endpoint error: %s", e)
         return jsonify({'error': str(e)}), 500
 
+@app.route('/drift/status', methods=['GET'])
+@require_auth
+def get_drift_status():
+    """Current drift detector state per demographic slice"""
+    return jsonify({'slices': bias_service.drift_monitor.status()})
+
+@app.route('/admin/alerts/outbox', methods=['GET'])
+@require_auth
+@require_admin
+def get_alert_outbox():
+    """Alert outbox delivery counts per sink and recent dead letters"""
+    if bias_service.alert_outbox is None:
+        return jsonify({'error': 'Results store is disabled'}), 503
+    return jsonify(bias_service.alert_outbox.status())
+
+@app.route('/admin/alerts/outbox/retry', methods=['POST'])
+@require_auth
+@require_admin
+def retry_alert_outbox():
+    """Requeue dead-lettered alert deliveries"""
+    if bias_service.alert_outbox is None:
+        return jsonify({'error': 'Results store is disabled'}), 503
+    return jsonify({'requeued': bias_service.alert_outbox.retry_dead()})
+
+@app.route('/admin/encryption/reencrypt', methods=['POST'])
+@require_auth
+@require_admin
+def start_reencryption():
+    """Re-encrypt stored results and audit entries under the primary key"""
+    if not bias_service.reencryption.start():
+        return jsonify({'error': 'Re-encryption already running', **bias_service.reencryption.progress}), 409
+    return jsonify(bias_service.reencryption.progress), 202
+
+@app.route('/admin/encryption/status', methods=['GET'])
+@require_auth
+@require_admin
+def encryption_status():
+    """Keyring fingerprints (primary first) and re-encryption progress"""
+    return jsonify({
+        'key_fingerprints': bias_service.security_manager.cipher.fingerprints(),
+        'reencryption': bias_service.reencryption.progress
+    })
+
+@app.route('/admin/config', methods=['GET'])
+@require_auth
+@require_admin
+def get_config():
+    """Current tunable settings, their version and recent reloads"""
+    return jsonify(config_manager.status())
+
+@app.route('/admin/config', methods=['PATCH'])
+@require_auth
+@require_admin
+def update_config():
+    """Validate and apply tunable settings, persisting them to the watched config file if any"""
+    try:
+        changes = request.get_json(silent=True)
+        if not isinstance(changes, dict) or not changes:
+            return jsonify({'error': 'Expected a JSON object of settings'}), 400
+        config_manager.update(changes, source=f"api:{request.user_id}")
+        return jsonify(config_manager.status())
+    except ConfigValidationError as e:
+        return jsonify({'error': 'Invalid config', 'details': e.errors}), 400
+    except Exception as e:
+        logger.error("Config update error: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/admin/profiles', methods=['GET'])
+@require_auth
+@require_admin
+def list_profiles():
+    """List captured analysis profiles"""
+    return jsonify({'profiles': profile_store.list()})
+
+@app.route('/admin/profiles/<profile_id>', methods=['GET'])
+@require_auth
+@require_admin
+def download_profile(profile_id):
+    """Download a captured profile (folded stacks or pstats)"""
+    path = profile_store.path_for(profile_id)
+    if path is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    return send_file(os.path.abspath(path), as_attachment=True, download_name=os.path.basename(path))
+
+@app.route('/admin/memory', methods=['GET'])
+@require_auth
+@require_admin
+def memory_report():
+    """Per-component memory usage and process RSS"""
+    return jsonify(bias_service.memory.report())
+
+@app.route('/admin/memory/tracemalloc', methods=['POST'])
+@require_auth
+@require_admin
+def control_tracemalloc():
+    """Start or stop tracemalloc allocation tracing"""
+    data = request.get_json(silent=True) or {}
+    action = data.get('action', 'start')
+    if action == 'start':
+        return jsonify(bias_service.memory.start_tracing(int(data.get('frames', 10))))
+    if action == 'stop':
+        return jsonify(bias_service.memory.stop_tracing())
+    return jsonify({'error': f'Unknown action: {action}'}), 400
+
+@app.route('/admin/memory/snapshots', methods=['POST'])
+@require_auth
+@require_admin
+def take_memory_snapshot():
+    """Take a named tracemalloc snapshot"""
+    data = request.get_json(silent=True) or {}
+    label = data.get('label') or datetime.now().strftime('%Y%m%dT%H%M%S')
+    try:
+        return jsonify(bias_service.memory.take_snapshot(label))
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 409
+
+@app.route('/admin/memory/snapshots/<label>', methods=['GET'])
+@require_auth
+@require_admin
+def memory_snapshot_top(label):
+    """Top allocation sites in a snapshot"""
+    limit = request.args.get('limit', 20, type=int)
+    key_type = request.args.get('key_type', 'lineno')
+    if key_type not in SNAPSHOT_KEY_TYPES:
+        return jsonify({'error': f"key_type must be one of {', '.join(SNAPSHOT_KEY_TYPES)}"}), 400
+    try:
+        return jsonify({'label': label, 'top': bias_service.memory.top_allocations(label, limit, key_type)})
+    except KeyError:
+        return jsonify({'error': f'Snapshot not found: {label}'}), 404
+
+@app.route('/admin/memory/diff', methods=['GET'])
+@require_auth
+@require_admin
+def memory_snapshot_diff():
+    """Allocation growth between two snapshots"""
+    from_label = request.args.get('from')
+    to_label = request.args.get('to')
+    if not from_label or not to_label:
+        return jsonify({'error': 'Both from and to snapshot labels are required'}), 400
+    limit = request.args.get('limit', 20, type=int)
+    key_type = request.args.get('key_type', 'lineno')
+    if key_type not in SNAPSHOT_KEY_TYPES:
+        return jsonify({'error': f"key_type must be one of {', '.join(SNAPSHOT_KEY_TYPES)}"}), 400
+    try:
+        return jsonify({
+            'from': from_label,
+            'to': to_label,
+            'diff': bias_service.memory.diff(from_label, to_label, limit, key_type)
+        })
+    except KeyError as e:
+        return jsonify({'error': f'Snapshot not found: {e.args[0]}'}), 404
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Service latency, throughput and cache metrics of this process as JSON (per worker under the supervisor)"""
+    return metrics_json_response(service_metrics)
+
+@app.route('/metrics/prometheus', methods=['GET'])
+def get_prometheus_metrics():
+    """Service metrics in Prometheus text exposition format"""
+    return metrics_prometheus_response(service_metrics)
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({'error': 'Endpoint not found'}), 404
 
+@app.errorhandler(413)
+def request_too_large(error):
+    return jsonify({'error': f'Request body exceeds {config.max_session_size_mb} MB limit'}), 413
+
 @app.errorhandler(500)
 def internal_error(error):
     return jsonify({'error': 'Internal server error'}), 500
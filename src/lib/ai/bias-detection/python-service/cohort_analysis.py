@@ -0,0 +1,430 @@
+"""
+Pixelated Empathy Bias Detection Cohort Analysis
+
+Fairness across sessions rather than within one session:
+- A per-process columnar cache of stored results: one .npy file per column
+  per segment, memory-mapped on read, with demographics dictionary-encoded
+  as int32 codes; small appended segments are compacted in the background
+- Group gaps for one demographic dimension, intersectional disparities across
+  several, and per-group trends over arbitrary time windows
+
+All reductions are np.bincount passes over each segment, accumulated as
+count / sum / sum of squares, so queries never concatenate or copy segments.
+"""
+
+import atexit
+import json
+import logging
+import math
+import os
+import shutil
+import threading
+import uuid
+from typing import Dict, List, Any, Optional, Iterator, Tuple
+
+import numpy as np
+
+from results_store import ANALYSIS_LAYERS, DEMOGRAPHIC_COLUMNS, ResultsStore
+
+logger = logging.getLogger(__name__)
+
+SCORE_COLUMNS = ('overall_score',) + tuple(f'{layer}_score' for layer in ANALYSIS_LAYERS)
+
+MANIFEST_NAME = 'manifest.json'
+
+def _process_alive(pid: int) -> bool:
+    if os.name == 'nt':
+        # os.kill would terminate the process on Windows; never reap there
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+class ColumnarResults:
+    """Incrementally maintained, memory-mapped column segments of the results store
+
+    ``refresh()`` writes rows inserted since the last refresh as a new
+    segment and never rewrites existing ones. Once ``compact_segments``
+    undersized segments accumulate, a background thread merges them into
+    one of up to ``segment_rows`` rows.
+
+    Each process keeps its own cache under ``directory`` (``proc_<pid>``),
+    so deleting replaced segments never touches files another worker still
+    has mapped. The cache is removed when the process exits (``close()``),
+    and caches left by processes that died are removed at startup.
+    """
+
+    def __init__(self, store: ResultsStore, directory: str, segment_rows: int = 1000000,
+                 compact_segments: int = 8):
+        self.store = store
+        self.base_directory = directory
+        self.segment_rows = segment_rows
+        self.compact_segments = compact_segments
+        self._open_process_directory()
+
+    def _open_process_directory(self) -> None:
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._compacting = False
+        self.directory = os.path.join(self.base_directory, f"proc_{self._pid}")
+        os.makedirs(self.directory, exist_ok=True)
+        atexit.register(self.close)
+        self._remove_exited_processes()
+        self._manifest = self._load_manifest()
+        self._segments: Dict[str, Dict[str, np.ndarray]] = {}
+        self._remove_unreferenced()
+
+    def _check_process(self) -> None:
+        # A forked child must not share (or delete) its parent's cache
+        if os.getpid() != self._pid:
+            self._open_process_directory()
+
+    def close(self) -> None:
+        """Remove this process's cache; a forked child leaves its parent's alone"""
+        if os.getpid() == self._pid:
+            with self._lock:
+                self._segments.clear()
+                shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _remove_exited_processes(self) -> None:
+        for name in os.listdir(self.base_directory):
+            pid = name[len('proc_'):]
+            if name.startswith('proc_') and pid.isdigit() and int(pid) != self._pid and not _process_alive(int(pid)):
+                shutil.rmtree(os.path.join(self.base_directory, name), ignore_errors=True)
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        path = os.path.join(self.directory, MANIFEST_NAME)
+        if os.path.exists(path):
+            with open(path) as f:
+                return json.load(f)
+        return {
+            'last_row_key': 0,
+            'dictionaries': {column: [] for column in DEMOGRAPHIC_COLUMNS},
+            'segments': []
+        }
+
+    def _save_manifest(self, manifest: Dict[str, Any]) -> None:
+        path = os.path.join(self.directory, MANIFEST_NAME)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, path)
+
+    def dictionary(self, column: str) -> List[str]:
+        """Decoded values of a demographic column, indexed by code"""
+        return self._manifest['dictionaries'][column]
+
+    def refresh(self) -> int:
+        """Load rows added to the store since the last refresh; returns the number of new rows"""
+        self._check_process()
+        with self._lock:
+            manifest = json.loads(json.dumps(self._manifest))
+            lookups = {
+                column: {value: code for code, value in enumerate(values)}
+                for column, values in manifest['dictionaries'].items()
+            }
+            added = 0
+            while True:
+                rows = self.store.scan_after(manifest['last_row_key'], limit=self.segment_rows)
+                if not rows:
+                    break
+                self._append(manifest, lookups, rows)
+                manifest['last_row_key'] = rows[-1]['row_key']
+                added += len(rows)
+            if added:
+                self._save_manifest(manifest)
+                self._manifest = manifest
+            small = self._undersized_segments()
+            if len(small) >= self.compact_segments and not self._compacting:
+                self._compacting = True
+                threading.Thread(target=self._compact, args=(small,), name='cohort-compactor', daemon=True).start()
+            return added
+
+    def _undersized_segments(self) -> List[str]:
+        return [
+            name for name in self._manifest['segments']
+            if len(self._read_segment(name)['created_ts']) < self.segment_rows
+        ]
+
+    def _compact(self, names: List[str]) -> None:
+        """Merge undersized segments, up to segment_rows rows each, off the query path"""
+        try:
+            # The segment map is shared with request threads; only the merge itself runs unlocked
+            with self._lock:
+                counts = [(name, len(self._read_segment(name)['created_ts'])) for name in names]
+            groups: List[List[str]] = [[]]
+            rows = 0
+            for name, count in counts:
+                if groups[-1] and rows + count > self.segment_rows:
+                    groups.append([])
+                    rows = 0
+                groups[-1].append(name)
+                rows += count
+            for group in groups:
+                if len(group) < 2:
+                    continue
+                with self._lock:
+                    segments = [self._read_segment(name) for name in group]
+                merged = self._write_segment({
+                    column: np.concatenate([segment[column] for segment in segments])
+                    for column in segments[0]
+                })
+                with self._lock:
+                    # refresh() only appends, so the merged segments are all still listed
+                    manifest = json.loads(json.dumps(self._manifest))
+                    position = manifest['segments'].index(group[0])
+                    manifest['segments'] = [name for name in manifest['segments'] if name not in group]
+                    manifest['segments'].insert(position, merged)
+                    self._save_manifest(manifest)
+                    self._manifest = manifest
+                    self._remove_unreferenced()
+        except Exception as e:
+            logger.error("Cohort segment compaction failed: %s", e)
+        finally:
+            self._compacting = False
+
+    def _remove_unreferenced(self) -> None:
+        """Delete segments replaced by a compaction; open memory maps keep their data"""
+        referenced = set(self._manifest['segments'])
+        for name in list(self._segments):
+            if name not in referenced:
+                del self._segments[name]
+        for name in os.listdir(self.directory):
+            if name.lstrip('.').startswith('segment_') and name not in referenced:
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+    def _append(self, manifest: Dict[str, Any], lookups: Dict[str, Dict[str, int]], rows: List[Any]) -> None:
+        columns: Dict[str, np.ndarray] = {
+            'created_ts': np.fromiter((row['created_ts'] for row in rows), dtype=np.float64, count=len(rows))
+        }
+        for column in SCORE_COLUMNS:
+            columns[column] = np.fromiter(
+                (np.nan if row[column] is None else row[column] for row in rows),
+                dtype=np.float64, count=len(rows)
+            )
+        for column in DEMOGRAPHIC_COLUMNS:
+            lookup = lookups[column]
+            values = manifest['dictionaries'][column]
+            codes = np.empty(len(rows), dtype=np.int32)
+            for i, row in enumerate(rows):
+                value = row[column]
+                if value is None:
+                    codes[i] = -1
+                    continue
+                code = lookup.get(value)
+                if code is None:
+                    code = lookup[value] = len(values)
+                    values.append(value)
+                codes[i] = code
+            columns[column] = codes
+
+        manifest['segments'].append(self._write_segment(columns))
+
+    def _write_segment(self, columns: Dict[str, np.ndarray]) -> str:
+        name = f"segment_{uuid.uuid4().hex}"
+        tmp_dir = os.path.join(self.directory, f".{name}")
+        os.makedirs(tmp_dir)
+        for column, values in columns.items():
+            np.save(os.path.join(tmp_dir, f"{column}.npy"), values)
+        os.replace(tmp_dir, os.path.join(self.directory, name))
+        return name
+
+    def _read_segment(self, name: str) -> Dict[str, np.ndarray]:
+        segment = self._segments.get(name)
+        if segment is None:
+            path = os.path.join(self.directory, name)
+            segment = {
+                column: np.load(os.path.join(path, f"{column}.npy"), mmap_mode='r')
+                for column in ('created_ts',) + SCORE_COLUMNS + tuple(DEMOGRAPHIC_COLUMNS)
+            }
+            self._segments[name] = segment
+        return segment
+
+    def segments(self) -> Iterator[Dict[str, np.ndarray]]:
+        self._check_process()
+        with self._lock:
+            names = list(self._manifest['segments'])
+            segments = [self._read_segment(name) for name in names]
+        yield from segments
+
+def _window_mask(segment: Dict[str, np.ndarray], start_ts: Optional[float], end_ts: Optional[float]) -> np.ndarray:
+    created = segment['created_ts']
+    mask = np.ones(len(created), dtype=bool)
+    if start_ts is not None:
+        mask &= created >= start_ts
+    if end_ts is not None:
+        mask &= created < end_ts
+    return mask
+
+def _moments(codes: np.ndarray, scores: np.ndarray, size: int) -> np.ndarray:
+    """(3, size) array of per-code count, sum and sum of squares"""
+    return np.stack([
+        np.bincount(codes, minlength=size).astype(np.float64),
+        np.bincount(codes, weights=scores, minlength=size),
+        np.bincount(codes, weights=scores * scores, minlength=size),
+    ])
+
+def _group_stats(moments: np.ndarray) -> List[Dict[str, Any]]:
+    counts, sums, sumsqs = moments
+    stats = []
+    for count, total, sumsq in zip(counts, sums, sumsqs):
+        if count == 0:
+            stats.append(None)
+            continue
+        mean = total / count
+        variance = max(sumsq / count - mean * mean, 0.0)
+        stats.append({
+            'count': int(count),
+            'mean_bias_score': float(mean),
+            'std_bias_score': math.sqrt(variance),
+            'standard_error': math.sqrt(variance / count)
+        })
+    return stats
+
+def _disparities(groups: Dict[str, Dict[str, Any]], overall_mean: float) -> Dict[str, Any]:
+    """Largest gap between group means, min/max ratio and each group's gap from the overall mean"""
+    if len(groups) < 2:
+        return {'max_gap': 0.0, 'disparity_ratio': 1.0, 'highest_group': None, 'lowest_group': None}
+    highest = max(groups, key=lambda group: groups[group]['mean_bias_score'])
+    lowest = min(groups, key=lambda group: groups[group]['mean_bias_score'])
+    high_mean = groups[highest]['mean_bias_score']
+    low_mean = groups[lowest]['mean_bias_score']
+    gap = high_mean - low_mean
+    gap_error = math.sqrt(groups[highest]['standard_error'] ** 2 + groups[lowest]['standard_error'] ** 2)
+    for stats in groups.values():
+        stats['gap_from_overall'] = stats['mean_bias_score'] - overall_mean
+    return {
+        'max_gap': gap,
+        'max_gap_z': gap / gap_error if gap_error > 0 else None,
+        'disparity_ratio': low_mean / high_mean if high_mean > 0 else 1.0,
+        'highest_group': highest,
+        'lowest_group': lowest
+    }
+
+class CohortAnalyzer:
+    """Vectorized cross-session fairness metrics over ColumnarResults"""
+
+    def __init__(self, columns: ColumnarResults):
+        self.columns = columns
+
+    @staticmethod
+    def _check(dimensions: List[str], score: str) -> None:
+        for dimension in dimensions:
+            if dimension not in DEMOGRAPHIC_COLUMNS:
+                raise ValueError(f"Unknown demographic dimension: {dimension}")
+        if score not in SCORE_COLUMNS:
+            raise ValueError(f"Unknown score column: {score}")
+
+    def _accumulate(self, dimensions: List[str], score: str, start_ts: Optional[float],
+                    end_ts: Optional[float], buckets: Optional[Tuple[float, float]] = None) -> Tuple[np.ndarray, List[int], int]:
+        """Moments keyed by the mixed-radix code of the dimensions (and time bucket)
+
+        Rows missing any dimension or the score are excluded.
+        """
+        sizes = [max(len(self.columns.dictionary(dimension)), 1) for dimension in dimensions]
+        bucket_count = 1
+        if buckets is not None:
+            bucket_origin, bucket_seconds = buckets
+            bucket_count = max(int(math.ceil((end_ts - bucket_origin) / bucket_seconds)), 1)
+        size = int(np.prod(sizes)) * bucket_count
+        moments = np.zeros((3, size))
+        for segment in self.columns.segments():
+            mask = _window_mask(segment, start_ts, end_ts)
+            mask &= ~np.isnan(segment[score])
+            scores = segment[score][mask]
+            combined = np.zeros(len(scores), dtype=np.int64)
+            valid = np.ones(len(scores), dtype=bool)
+            for dimension, radix in zip(dimensions, sizes):
+                codes = segment[dimension][mask]
+                valid &= codes >= 0
+                combined = combined * radix + codes
+            if buckets is not None:
+                bucket_index = ((segment['created_ts'][mask] - bucket_origin) // bucket_seconds).astype(np.int64)
+                valid &= (bucket_index >= 0) & (bucket_index < bucket_count)
+                combined = combined * bucket_count + bucket_index
+            if valid.any():
+                moments += _moments(combined[valid], scores[valid], size)
+        return moments, sizes, bucket_count
+
+    def _decode(self, dimensions: List[str], sizes: List[int], code: int) -> List[str]:
+        values = []
+        for dimension, radix in reversed(list(zip(dimensions, sizes))):
+            values.append(self.columns.dictionary(dimension)[code % radix])
+            code //= radix
+        return list(reversed(values))
+
+    def group_gaps(self, dimension: str, start_ts: Optional[float] = None, end_ts: Optional[float] = None,
+                   score: str = 'overall_score', min_count: int = 1) -> Dict[str, Any]:
+        """Per-group statistics and disparities for one demographic dimension"""
+        return self.intersectional([dimension], start_ts, end_ts, score, min_count)
+
+    def intersectional(self, dimensions: List[str], start_ts: Optional[float] = None,
+                       end_ts: Optional[float] = None, score: str = 'overall_score',
+                       min_count: int = 1) -> Dict[str, Any]:
+        """Statistics and disparities for every combination of the given dimensions
+
+        Combinations with fewer than ``min_count`` sessions are reported in
+        ``suppressed_groups`` and left out of the disparity figures.
+        """
+        self._check(dimensions, score)
+        self.columns.refresh()
+        moments, sizes, _ = self._accumulate(dimensions, score, start_ts, end_ts)
+        groups: Dict[str, Dict[str, Any]] = {}
+        suppressed = 0
+        for code, stats in enumerate(_group_stats(moments)):
+            if stats is None:
+                continue
+            if stats['count'] < min_count:
+                suppressed += 1
+                continue
+            groups[' & '.join(self._decode(dimensions, sizes, code))] = stats
+        total = moments[0].sum()
+        overall_mean = float(moments[1].sum() / total) if total else 0.0
+        return {
+            'dimensions': dimensions,
+            'score': score,
+            'sessions': int(total),
+            'overall_mean_bias_score': overall_mean,
+            'groups': groups,
+            'suppressed_groups': suppressed,
+            'disparities': _disparities(groups, overall_mean)
+        }
+
+    def trends(self, dimension: str, start_ts: float, end_ts: float, bucket_seconds: float = 86400.0,
+               score: str = 'overall_score') -> Dict[str, Any]:
+        """Per-group mean score and largest gap per time bucket"""
+        self._check([dimension], score)
+        self.columns.refresh()
+        moments, sizes, bucket_count = self._accumulate(
+            [dimension], score, start_ts, end_ts, buckets=(start_ts, bucket_seconds)
+        )
+        values = self.columns.dictionary(dimension)
+        # (stat, group, bucket)
+        moments = moments.reshape(3, sizes[0], bucket_count)
+        counts = moments[0]
+        populated = counts > 0
+        means = np.divide(moments[1], counts, out=np.full_like(counts, np.nan), where=populated)
+        gaps = np.where(
+            populated.any(axis=0),
+            np.where(populated, means, -np.inf).max(axis=0) - np.where(populated, means, np.inf).min(axis=0),
+            np.nan
+        )
+        return {
+            'dimension': dimension,
+            'score': score,
+            'bucket_seconds': bucket_seconds,
+            'bucket_starts': [start_ts + i * bucket_seconds for i in range(bucket_count)],
+            'groups': {
+                value: {
+                    'counts': counts[code].astype(int).tolist(),
+                    'mean_bias_scores': [None if np.isnan(m) else float(m) for m in means[code]]
+                }
+                for code, value in enumerate(values)
+                if counts[code].any()
+            },
+            'max_gap': [None if np.isnan(gap) else float(gap) for gap in gaps]
+        }
@@ -0,0 +1,265 @@
+"""
+Pixelated Empathy Bias Detection Config Reloading
+
+Hot reloading of the tunable parts of BiasDetectionConfig:
+- Thresholds, layer weights, analyzer switches and budgets can be
+  changed at runtime; everything else (paths, pools, limits) still needs
+  a restart and is rejected
+- Overrides come from a JSON/YAML file polled for changes, or from the
+  admin endpoint; with a file configured, endpoint updates are written
+  back to it so every worker picks them up
+- Updates are validated first and swapped in as a whole new config
+  object, so a request that already started keeps its snapshot
+- Every config carries a version hash of its tunable values
+"""
+
+import dataclasses
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Callable, Iterable, Optional
+
+try:
+    import yaml
+    YAML_AVAILABLE = True
+except ImportError as e:
+    YAML_AVAILABLE = False
+    logging.warning("PyYAML not available, YAML config files cannot be reloaded: %s", e)
+
+from results_store import ANALYSIS_LAYERS
+
+logger = logging.getLogger(__name__)
+
+RELOADABLE_FIELDS = (
+    'warning_threshold',
+    'high_threshold',
+    'critical_threshold',
+    'layer_weights',
+    'enabled_analyzers',
+    'analysis_cost_budget_ms',
+    'default_deadline_ms',
+    'profile_sample_rate'
+)
+
+class ConfigValidationError(ValueError):
+    """Config overrides that cannot be applied"""
+
+    def __init__(self, errors: List[str]):
+        super().__init__('; '.join(errors))
+        self.errors = errors
+
+def reloadable_values(config: Any) -> Dict[str, Any]:
+    return {name: getattr(config, name) for name in RELOADABLE_FIELDS}
+
+def config_version(config: Any) -> str:
+    """Short hash of the tunable values; equal configs share a version"""
+    canonical = json.dumps(reloadable_values(config), sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:12]
+
+def _is_number(value: Any) -> bool:
+    # NaN compares false against every bound, so it (and infinity) must be rejected explicitly
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+def validate_overrides(base: Any, overrides: Dict[str, Any], known_analyzers: Iterable[str] = ()) -> Dict[str, Any]:
+    """Check overrides against the base config; returns them normalized
+
+    Raises ConfigValidationError listing every problem found.
+    """
+    if not isinstance(overrides, dict):
+        raise ConfigValidationError(['Config overrides must be an object'])
+    errors = []
+    unknown = sorted(set(overrides) - set(RELOADABLE_FIELDS))
+    if unknown:
+        errors.append(f"Not reloadable: {', '.join(unknown)}")
+
+    normalized = {}
+    for name in ('warning_threshold', 'high_threshold', 'critical_threshold', 'profile_sample_rate'):
+        if name in overrides:
+            value = overrides[name]
+            if not _is_number(value) or not 0.0 <= value <= 1.0:
+                errors.append(f"{name} must be a number between 0 and 1")
+            else:
+                normalized[name] = float(value)
+    for name in ('analysis_cost_budget_ms', 'default_deadline_ms'):
+        if name in overrides:
+            value = overrides[name]
+            if value is not None and (not _is_number(value) or value <= 0):
+                errors.append(f"{name} must be a positive number or null")
+            else:
+                normalized[name] = float(value) if value is not None else None
+
+    if 'layer_weights' in overrides:
+        weights = overrides['layer_weights']
+        if not isinstance(weights, dict):
+            errors.append('layer_weights must be an object')
+        else:
+            unknown_layers = sorted(set(weights) - set(ANALYSIS_LAYERS))
+            if unknown_layers:
+                errors.append(f"Unknown layers in layer_weights: {', '.join(unknown_layers)}")
+            if any(not _is_number(w) or w < 0 for w in weights.values()):
+                errors.append('layer_weights must be non-negative numbers')
+            elif not unknown_layers:
+                merged = dict(base.layer_weights)
+                merged.update({layer: float(w) for layer, w in weights.items()})
+                if sum(merged.values()) <= 0:
+                    errors.append('layer_weights must not all be zero')
+                normalized['layer_weights'] = merged
+
+    if 'enabled_analyzers' in overrides:
+        switches = overrides['enabled_analyzers']
+        known = set(known_analyzers)
+        if not isinstance(switches, dict) or any(not isinstance(v, bool) for v in switches.values()):
+            errors.append('enabled_analyzers must map analyzer names to true/false')
+        elif known and set(switches) - known:
+            errors.append(f"Unknown analyzers: {', '.join(sorted(set(switches) - known))}")
+        else:
+            normalized['enabled_analyzers'] = dict(switches)
+
+    warning = normalized.get('warning_threshold', base.warning_threshold)
+    high = normalized.get('high_threshold', base.high_threshold)
+    critical = normalized.get('critical_threshold', base.critical_threshold)
+    if not errors and not warning < high < critical:
+        errors.append('Thresholds must satisfy warning < high < critical')
+
+    if errors:
+        raise ConfigValidationError(errors)
+    return normalized
+
+def apply_overrides(base: Any, overrides: Dict[str, Any]) -> Any:
+    """New config with overrides applied and a fresh version"""
+    return dataclasses.replace(base, **overrides, config_version=None)
+
+def read_config_file(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        if path.endswith(('.yaml', '.yml')):
+            if not YAML_AVAILABLE:
+                raise ConfigValidationError(['PyYAML is required for YAML config files'])
+            return yaml.safe_load(f) or {}
+        return json.load(f)
+
+def write_config_file(path: str, overrides: Dict[str, Any]) -> None:
+    """Atomically replace the config file so watchers never read a partial write"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        if path.endswith(('.yaml', '.yml')) and YAML_AVAILABLE:
+            yaml.safe_dump(overrides, f, sort_keys=True)
+        else:
+            json.dump(overrides, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+class ConfigManager:
+    """Holds the current config and swaps in validated overrides"""
+
+    def __init__(self, base: Any, path: Optional[str] = None, poll_seconds: float = 5.0,
+                 known_analyzers: Callable[[], Iterable[str]] = lambda: (),
+                 on_change: Optional[Callable[[Any], None]] = None, max_history: int = 20):
+        self.base = base
+        self.path = path
+        self.poll_seconds = poll_seconds
+        self.known_analyzers = known_analyzers
+        self.on_change = on_change
+        self.max_history = max_history
+        self.current = base
+        self.overrides: Dict[str, Any] = {}
+        self.history: List[Dict[str, Any]] = []
+        self.last_error: Optional[str] = None
+        self._file_stamp = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    def apply(self, overrides: Dict[str, Any], source: str) -> Any:
+        """Validate and swap in a full set of overrides (relative to the base config)"""
+        with self._lock:
+            return self._apply_locked(overrides, source)
+
+    def update(self, changes: Dict[str, Any], source: str = 'api') -> Any:
+        """Merge changes into the current overrides, persisting them to the watched file if any
+
+        Merge, validation, file write and swap happen under one lock, and the
+        new config only goes live once the write succeeded.
+        """
+        with self._lock:
+            overrides = dict(self.overrides)
+            overrides.update(changes)
+            return self._apply_locked(overrides, source, persist=True)
+
+    def _apply_locked(self, overrides: Dict[str, Any], source: str, persist: bool = False) -> Any:
+        # on_change runs under the lock too, so listeners see versions in order
+        normalized = validate_overrides(self.base, overrides, self.known_analyzers())
+        config = apply_overrides(self.base, normalized)
+        if persist and self.path:
+            write_config_file(self.path, normalized)
+            self._file_stamp = self._stat()
+        previous = self.current
+        self.overrides = normalized
+        self.current = config
+        self.last_error = None
+        if config.config_version != previous.config_version:
+            self.history.append({
+                'version': config.config_version,
+                'previous_version': previous.config_version,
+                'source': source,
+                'applied_at': datetime.now().isoformat()
+            })
+            del self.history[:-self.max_history]
+            logger.info("Config %s applied from %s (was %s)", config.config_version, source, previous.config_version)
+            if self.on_change is not None:
+                self.on_change(config)
+        return config
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def reload_file(self, force: bool = False) -> bool:
+        """Apply the config file if it changed since the last check"""
+        if not self.path:
+            return False
+        with self._lock:
+            stamp = self._stat()
+            if stamp is None or (stamp == self._file_stamp and not force):
+                return False
+            self._file_stamp = stamp
+            try:
+                self._apply_locked(read_config_file(self.path), f"file:{self.path}")
+                return True
+            except Exception as e:
+                # Keep serving the last good config
+                self.last_error = str(e)
+                logger.error("Rejected config file %s: %s", self.path, e)
+                return False
+
+    def start(self) -> None:
+        if not self.path or self._watcher is not None:
+            return
+        self.reload_file(force=True)
+        self._watcher = threading.Thread(target=self._watch, name='config-watcher', daemon=True)
+        self._watcher.start()
+
+    def _watch(self) -> None:
+        while not self._stopping.wait(self.poll_seconds):
+            self.reload_file()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=self.poll_seconds + 1.0)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'version': self.current.config_version,
+            'base_version': self.base.config_version,
+            'values': reloadable_values(self.current),
+            'overrides': self.overrides,
+            'file': self.path,
+            'last_error': self.last_error,
+            'history': list(self.history)
+        }
@@ -0,0 +1,313 @@
+"""
+Pixelated Empathy Bias Detection Drift Monitoring
+
+Online detection of shifts in mean bias score per demographic slice:
+- Two-sided Page-Hinkley test per slice, O(1) state and O(1) update
+- Exponentially weighted recent mean/variance for reporting
+- Bounded, queryable history of raised drift alerts
+
+Each completed analysis is fed to the monitor once; history is never re-scanned.
+With a results store, detector state and alerts live in the shared database
+and are updated by its write hook, so every worker process sees the whole
+stream of stored results rather than the subset routed to it.
+"""
+
+import json
+import logging
+import math
+import sqlite3
+import threading
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+from results_store import DEMOGRAPHIC_COLUMNS, ResultsStore, demographic_value
+
+logger = logging.getLogger(__name__)
+
+# Dimension used for the unsliced stream of all sessions
+ALL_DIMENSION = 'all'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS drift_detectors (
+    dimension TEXT NOT NULL,
+    slice TEXT NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (dimension, slice)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS drift_alerts (
+    alert_id TEXT PRIMARY KEY,
+    detected_at TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    alert TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_drift_alerts_detected ON drift_alerts (detected_at);
+"""
+
+_STATE_FIELDS = ('count', 'mean', 'cumulative_up', 'minimum_up', 'cumulative_down', 'minimum_down',
+                 'ewma_mean', 'ewma_variance', 'last_updated')
+
+class PageHinkley:
+    """Two-sided Page-Hinkley change detector for a stream of scores
+
+    ``delta`` is the magnitude of change tolerated without accumulating
+    evidence; ``threshold`` (lambda) is the accumulated deviation that raises
+    an alarm. Both are in score units.
+    """
+
+    __slots__ = ('delta', 'threshold', 'min_samples', 'ewma_alpha', 'count', 'mean',
+                 'cumulative_up', 'minimum_up', 'cumulative_down', 'minimum_down',
+                 'ewma_mean', 'ewma_variance', 'last_updated')
+
+    def __init__(self, delta: float, threshold: float, min_samples: int, ewma_alpha: float):
+        self.delta = delta
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.ewma_alpha = ewma_alpha
+        self.reset()
+        self.ewma_mean: Optional[float] = None
+        self.ewma_variance = 0.0
+        self.last_updated: Optional[str] = None
+
+    def reset(self) -> None:
+        """Start a new baseline (after an alarm)"""
+        self.count = 0
+        self.mean = 0.0
+        self.cumulative_up = 0.0
+        self.minimum_up = 0.0
+        self.cumulative_down = 0.0
+        self.minimum_down = 0.0
+
+    def update(self, value: float) -> Optional[Tuple[str, float]]:
+        """Add a score; returns (direction, statistic) when a shift is detected"""
+        self.count += 1
+        self.mean += (value - self.mean) / self.count
+        self.cumulative_up += value - self.mean - self.delta
+        self.minimum_up = min(self.minimum_up, self.cumulative_up)
+        self.cumulative_down += self.mean - value - self.delta
+        self.minimum_down = min(self.minimum_down, self.cumulative_down)
+
+        if self.ewma_mean is None:
+            self.ewma_mean = value
+        else:
+            difference = value - self.ewma_mean
+            self.ewma_mean += self.ewma_alpha * difference
+            self.ewma_variance = (1 - self.ewma_alpha) * (self.ewma_variance + self.ewma_alpha * difference * difference)
+        self.last_updated = datetime.now().isoformat()
+
+        if self.count < self.min_samples:
+            return None
+        up = self.cumulative_up - self.minimum_up
+        down = self.cumulative_down - self.minimum_down
+        if up > self.threshold:
+            return 'increase', up
+        if down > self.threshold:
+            return 'decrease', down
+        return None
+
+    def state(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in _STATE_FIELDS}
+
+    def restore(self, state: Dict[str, Any]) -> 'PageHinkley':
+        for name in _STATE_FIELDS:
+            setattr(self, name, state[name])
+        return self
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'samples_since_reset': self.count,
+            'baseline_mean': self.mean,
+            'recent_mean': self.ewma_mean,
+            'recent_std': math.sqrt(self.ewma_variance),
+            'increase_statistic': self.cumulative_up - self.minimum_up,
+            'decrease_statistic': self.cumulative_down - self.minimum_down,
+            'last_updated': self.last_updated
+        }
+
+class DriftMonitor:
+    """Page-Hinkley detectors per demographic slice plus a bounded alert history
+
+    Without a store, ``observe()`` feeds in-process detectors. With one, the
+    store's write hook feeds detectors persisted in the results database and
+    listeners are told about alerts once the raising batch has committed.
+    """
+
+    def __init__(self, delta: float = 0.025, threshold: float = 1.0, min_samples: int = 30,
+                 ewma_alpha: float = 0.05, max_alerts: int = 1000, max_slices: int = 1000,
+                 store: Optional[ResultsStore] = None):
+        self.delta = delta
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.ewma_alpha = ewma_alpha
+        self.max_alerts = max_alerts
+        self.max_slices = max_slices
+        self.store = store
+        self._detectors: Dict[Tuple[str, str], PageHinkley] = {}
+        self._alerts: deque = deque(maxlen=max_alerts)
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[Dict[str, Any], Optional[str], Optional[str]], None]] = []
+        # Alerts raised by the current write transaction, announced after it commits
+        self._uncommitted: List[Tuple[Dict[str, Any], Optional[str], Optional[str]]] = []
+
+        if store is not None:
+            store._connection().executescript(SCHEMA)
+            store.add_write_hook(self.apply)
+            store.add_commit_hook(self._announce_committed)
+
+    def add_listener(self, listener: Callable[[Dict[str, Any], Optional[str], Optional[str]], None]) -> None:
+        """Call ``listener(alert, session_hash, user_id)`` for every raised alert"""
+        self._listeners.append(listener)
+
+    def _announce(self, alert: Dict[str, Any], session_hash: Optional[str], user_id: Optional[str]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(alert, session_hash, user_id)
+            except Exception as e:
+                logger.error("Drift alert listener failed: %s", e)
+
+    def _new_detector(self) -> PageHinkley:
+        return PageHinkley(self.delta, self.threshold, self.min_samples, self.ewma_alpha)
+
+    def _slices(self, result: Dict[str, Any]) -> List[Tuple[str, str]]:
+        demographics = result.get('demographics') or {}
+        slices = [(ALL_DIMENSION, ALL_DIMENSION)]
+        for column in DEMOGRAPHIC_COLUMNS:
+            value = demographic_value(demographics, column)
+            if value is not None:
+                slices.append((column, value))
+        return slices
+
+    def observe(self, result: Dict[str, Any], session_hash: Optional[str] = None,
+                user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Feed a completed analysis result to in-process detectors; returns any drift alerts it triggered"""
+        score = float(result.get('overall_bias_score', 0.0))
+        raised = []
+        with self._lock:
+            for key in self._slices(result):
+                detector = self._detectors.get(key)
+                if detector is None:
+                    if len(self._detectors) >= self.max_slices:
+                        logger.warning("Drift monitor slice limit reached; not tracking %s=%s", key[0], key[1])
+                        continue
+                    detector = self._detectors[key] = self._new_detector()
+                alert = self._update(detector, key, score, result.get('result_id'))
+                if alert is not None:
+                    self._alerts.append(alert)
+                    raised.append(alert)
+        for alert in raised:
+            self._announce(alert, session_hash, user_id)
+        return raised
+
+    def _update(self, detector: PageHinkley, key: Tuple[str, str], score: float,
+                result_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        detection = detector.update(score)
+        if detection is None:
+            return None
+        direction, statistic = detection
+        alert = {
+            'alert_id': uuid.uuid4().hex,
+            'detected_at': datetime.now().isoformat(),
+            'dimension': key[0],
+            'slice': key[1],
+            'direction': direction,
+            'statistic': statistic,
+            'threshold': self.threshold,
+            'baseline_mean': detector.mean,
+            'recent_mean': detector.ewma_mean,
+            'samples': detector.count,
+            'result_id': result_id
+        }
+        detector.reset()
+        return alert
+
+    # Shared state in the results database
+
+    def apply(self, connection: sqlite3.Connection, rows: List[Dict[str, Any]]) -> None:
+        """Results store write hook: update persisted detectors with each stored result"""
+        self._uncommitted = []
+        detectors: Dict[Tuple[str, str], Optional[PageHinkley]] = {}
+        tracked = connection.execute('SELECT COUNT(*) FROM drift_detectors').fetchone()[0]
+        alerts = []
+        for row in rows:
+            keys = [(ALL_DIMENSION, ALL_DIMENSION)]
+            keys.extend((column, row[column]) for column in DEMOGRAPHIC_COLUMNS if row.get(column) is not None)
+            for key in keys:
+                if key not in detectors:
+                    stored = connection.execute(
+                        'SELECT state FROM drift_detectors WHERE dimension = ? AND slice = ?', key
+                    ).fetchone()
+                    if stored is not None:
+                        detectors[key] = self._new_detector().restore(json.loads(stored[0]))
+                    elif tracked < self.max_slices:
+                        detectors[key] = self._new_detector()
+                        tracked += 1
+                    else:
+                        logger.warning("Drift monitor slice limit reached; not tracking %s=%s", key[0], key[1])
+                        detectors[key] = None
+                detector = detectors[key]
+                if detector is None:
+                    continue
+                alert = self._update(detector, key, float(row['overall_score']), row['result_id'])
+                if alert is not None:
+                    alerts.append(alert)
+                    self._uncommitted.append((alert, row.get('session_hash'), row.get('user_id')))
+
+        connection.executemany(
+            'INSERT OR REPLACE INTO drift_detectors (dimension, slice, state) VALUES (?, ?, ?)',
+            [key + (json.dumps(detector.state()),) for key, detector in detectors.items() if detector is not None]
+        )
+        if alerts:
+            connection.executemany(
+                'INSERT INTO drift_alerts (alert_id, detected_at, dimension, alert) VALUES (?, ?, ?, ?)',
+                [(alert['alert_id'], alert['detected_at'], alert['dimension'], json.dumps(alert)) for alert in alerts]
+            )
+            connection.execute(
+                'DELETE FROM drift_alerts WHERE alert_id NOT IN '
+                '(SELECT alert_id FROM drift_alerts ORDER BY detected_at DESC LIMIT ?)',
+                (self.max_alerts,)
+            )
+
+    def _announce_committed(self) -> None:
+        committed, self._uncommitted = self._uncommitted, []
+        for alert, session_hash, user_id in committed:
+            self._announce(alert, session_hash, user_id)
+
+    def alerts(self, since: Optional[str] = None, dimension: Optional[str] = None,
+               limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recent drift alerts first, optionally filtered by time and dimension"""
+        if self.store is not None:
+            clauses, params = [], []
+            if since is not None:
+                clauses.append('detected_at >= ?')
+                params.append(since)
+            if dimension is not None:
+                clauses.append('dimension = ?')
+                params.append(dimension)
+            where = f"WHERE {' AND '.join(clauses)} " if clauses else ''
+            rows = self.store._connection().execute(
+                f'SELECT alert FROM drift_alerts {where}ORDER BY detected_at DESC LIMIT ?', params + [limit]
+            ).fetchall()
+            return [json.loads(row['alert']) for row in rows]
+        with self._lock:
+            alerts = list(self._alerts)
+        matching = [
+            alert for alert in reversed(alerts)
+            if (since is None or alert['detected_at'] >= since)
+            and (dimension is None or alert['dimension'] == dimension)
+        ]
+        return matching[:limit]
+
+    def status(self) -> Dict[str, Any]:
+        """Current detector state per slice"""
+        if self.store is not None:
+            rows = self.store._connection().execute('SELECT dimension, slice, state FROM drift_detectors').fetchall()
+            return {
+                f"{row['dimension']}:{row['slice']}": self._new_detector().restore(json.loads(row['state'])).snapshot()
+                for row in rows
+            }
+        with self._lock:
+            return {
+                f"{dimension}:{value}": detector.snapshot()
+                for (dimension, value), detector in self._detectors.items()
+            }
@@ -0,0 +1,132 @@
+"""
+Pixelated Empathy Bias Detection Encryption Helpers
+
+Key management shared by every component that encrypts data at rest:
+- A keyring of Fernet keys: the first key encrypts, all keys decrypt
+  (MultiFernet), so keys rotate without breaking existing records
+- Pre-derived keys can be supplied directly, skipping PBKDF2 at boot
+- Password-derived keys are derived once per process and can be cached in
+  a key file shared by all workers of a deployment
+"""
+
+import base64
+import functools
+import hashlib
+import json
+import logging
+import os
+from typing import List, Optional
+
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+logger = logging.getLogger(__name__)
+
+PBKDF2_ITERATIONS = 100000
+
+@functools.lru_cache(maxsize=8)
+def derive_fernet_key(password: bytes, salt: bytes, iterations: int = PBKDF2_ITERATIONS) -> bytes:
+    """Derive a urlsafe-base64 Fernet key from a password with PBKDF2-HMAC-SHA256
+
+    Memoized, so components in one process share a single derivation.
+    """
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=iterations,
+    )
+    return base64.urlsafe_b64encode(kdf.derive(password))
+
+def environment_key_material() -> tuple:
+    """Password and salt configured for the deployment"""
+    password = os.environ.get('ENCRYPTION_PASSWORD', 'default-password-change-in-production').encode()
+    salt = os.environ.get('ENCRYPTION_SALT', 'default-salt-change-in-production').encode()
+    return password, salt
+
+def key_fingerprint(key: bytes) -> str:
+    """Short, non-reversible identifier for logging and status output"""
+    return hashlib.sha256(key).hexdigest()[:12]
+
+def _split_keys(value: Optional[str]) -> List[bytes]:
+    return [key.strip().encode() for key in (value or '').split(',') if key.strip()]
+
+def _cached_derived_key(path: str, password: bytes, salt: bytes) -> bytes:
+    """Derived key from the key file, deriving and writing it on first use
+
+    The file records which password/salt/iteration count it was derived
+    from, so changing the password invalidates it.
+    """
+    kdf_id = hashlib.sha256(b'|'.join([password, salt, str(PBKDF2_ITERATIONS).encode()])).hexdigest()
+    try:
+        with open(path) as f:
+            cached = json.load(f)
+        if cached.get('kdf_id') == kdf_id:
+            return cached['key'].encode()
+    except (OSError, ValueError, KeyError):
+        pass
+
+    key = derive_fernet_key(password, salt)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w') as f:
+        json.dump({'kdf_id': kdf_id, 'key': key.decode()}, f)
+    os.replace(tmp_path, path)
+    logger.info("Derived encryption key %s cached in %s", key_fingerprint(key), path)
+    return key
+
+def environment_keyring() -> List[bytes]:
+    """Fernet keys configured for the deployment, primary first
+
+    - BIAS_ENCRYPTION_KEYS: pre-derived Fernet keys, comma separated; the
+      first is the primary. No key derivation happens.
+    - Otherwise the primary is derived from ENCRYPTION_PASSWORD and
+      ENCRYPTION_SALT, via BIAS_DERIVED_KEY_FILE when that is set.
+    - BIAS_RETIRED_ENCRYPTION_KEYS: older pre-derived keys kept for
+      decryption only.
+    """
+    keys = _split_keys(os.environ.get('BIAS_ENCRYPTION_KEYS'))
+    if not keys:
+        password, salt = environment_key_material()
+        key_file = os.environ.get('BIAS_DERIVED_KEY_FILE')
+        keys = [_cached_derived_key(key_file, password, salt) if key_file else derive_fernet_key(password, salt)]
+    for key in _split_keys(os.environ.get('BIAS_RETIRED_ENCRYPTION_KEYS')):
+        if key not in keys:
+            keys.append(key)
+    return keys
+
+class FernetCipher:
+    """String encrypt/decrypt over a keyring with the same interface as SecurityManager"""
+
+    def __init__(self, keys):
+        if isinstance(keys, (bytes, str)):
+            keys = [keys]
+        self.keys = [key.encode() if isinstance(key, str) else key for key in keys]
+        self.primary = Fernet(self.keys[0])
+        self.fernet = MultiFernet([Fernet(key) for key in self.keys])
+
+    @classmethod
+    def from_environment(cls) -> 'FernetCipher':
+        return cls(environment_keyring())
+
+    def encrypt_data(self, data: str) -> str:
+        return self.fernet.encrypt(data.encode()).decode()
+
+    def decrypt_data(self, encrypted_data: str) -> str:
+        return self.fernet.decrypt(encrypted_data.encode()).decode()
+
+    def is_current(self, encrypted_data: str) -> bool:
+        """Whether a token is already encrypted under the primary key"""
+        try:
+            self.primary.decrypt(encrypted_data.encode())
+            return True
+        except InvalidToken:
+            return False
+
+    def rotate_data(self, encrypted_data: str) -> str:
+        """Re-encrypt a token under the primary key, preserving its timestamp"""
+        return self.fernet.rotate(encrypted_data.encode()).decode()
+
+    def fingerprints(self) -> List[str]:
+        return [key_fingerprint(key) for key in self.keys]
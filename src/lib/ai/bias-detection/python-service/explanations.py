@@ -0,0 +1,399 @@
+"""
+Pixelated Empathy Bias Detection Explanations
+
+LIME/SHAP explanations of the bias classifier for alerting results:
+- Only results at the configured alert levels (high/critical) are explained
+- Nothing runs on the request path: requests only enqueue work, a
+  dispatcher thread hands it to a process pool and records the outcome
+- Each explanation has a time budget; the perturbation sample count is
+  derived from the measured per-sample inference cost in that worker
+- Perturbed texts go through the classifier pipeline in batches
+- An explanation running past its timeout restarts the pool, so a hung
+  worker cannot hold its text's slot forever
+- Explanations are cached by response text hash (plus method and model), so
+  a response seen again links to the stored explanation instead of re-running
+- Stored encrypted in the results database and fetched by result ID
+"""
+
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+try:
+    from lime.lime_text import LimeTextExplainer
+    LIME_AVAILABLE = True
+except ImportError as e:
+    LIME_AVAILABLE = False
+    logging.warning("LIME not available, LIME explanations are disabled: %s", e)
+
+try:
+    import shap
+    SHAP_AVAILABLE = True
+except ImportError as e:
+    SHAP_AVAILABLE = False
+    logging.warning("SHAP not available, SHAP explanations are disabled: %s", e)
+
+from model_registry import BIAS_CLASSIFIER_MODEL, bias_classifier
+from results_store import ResultsStore, json_default
+
+logger = logging.getLogger(__name__)
+
+EXPLANATION_METHODS = ('lime', 'shap')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS explanations (
+    cache_key TEXT PRIMARY KEY,
+    method TEXT NOT NULL,
+    created_ts REAL NOT NULL,
+    encrypted_explanation TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS result_explanations (
+    result_id TEXT NOT NULL,
+    response_index INTEGER NOT NULL,
+    cache_key TEXT NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT,
+    requested_ts REAL NOT NULL,
+    completed_ts REAL,
+    PRIMARY KEY (result_id, response_index)
+);
+CREATE INDEX IF NOT EXISTS idx_result_explanations_key ON result_explanations (cache_key, status);
+"""
+
+def method_available(method: str) -> bool:
+    return (method == 'lime' and LIME_AVAILABLE) or (method == 'shap' and SHAP_AVAILABLE)
+
+def explanation_key(text: str, method: str) -> str:
+    return hashlib.sha256(f"{method}|{BIAS_CLASSIFIER_MODEL}|{text}".encode()).hexdigest()
+
+# Pool process state
+
+_seconds_per_sample: Optional[float] = None
+
+def _load_model() -> None:
+    # Pool initializer: load the classifier before the first budget starts ticking
+    bias_classifier()
+
+def _sample_count(budget_seconds: float, elapsed: float, max_samples: int, batch_size: int) -> int:
+    # The budget wins over batch size: a nearly spent budget gets a handful of samples
+    remaining = budget_seconds - elapsed
+    return int(min(max_samples, max(1, remaining / _seconds_per_sample)))
+
+def explain_text(text: str, method: str, budget_seconds: float, max_samples: int,
+                 batch_size: int, num_features: int = 10, seed: int = 0) -> Dict[str, Any]:
+    """Explain the classifier's top label for ``text``; runs in a pool process"""
+    global _seconds_per_sample
+    start = time.perf_counter()
+    classifier = bias_classifier()
+    id2label = classifier.model.config.id2label
+    labels = [id2label[i] for i in sorted(id2label)]
+    columns = {label: i for i, label in enumerate(labels)}
+
+    def predict(texts) -> np.ndarray:
+        texts = [str(t) for t in texts]
+        probabilities = np.zeros((len(texts), len(labels)))
+        outputs = classifier(texts, batch_size=batch_size, truncation=True, top_k=None)
+        for row, output in enumerate(outputs):
+            for item in output:
+                probabilities[row, columns[item['label']]] = item['score']
+        return probabilities
+
+    base = predict([text])[0]
+    target = int(np.argmax(base))
+    if _seconds_per_sample is None:
+        probe_start = time.perf_counter()
+        predict([text] * batch_size)
+        _seconds_per_sample = (time.perf_counter() - probe_start) / batch_size
+    samples = _sample_count(budget_seconds, time.perf_counter() - start, max_samples, batch_size)
+
+    explain_start = time.perf_counter()
+    if method == 'lime':
+        explainer = LimeTextExplainer(class_names=labels, random_state=seed)
+        explanation = explainer.explain_instance(text, predict, labels=(target,),
+                                                 num_features=num_features, num_samples=samples)
+        features = explanation.as_list(label=target)
+    else:
+        explainer = shap.Explainer(lambda texts: predict(texts)[:, target], shap.maskers.Text(r"\W+"), seed=seed)
+        values = explainer([text], max_evals=samples, batch_size=batch_size, silent=True)
+        features = sorted(
+            ((str(term).strip(), float(weight)) for term, weight in zip(values.data[0], values.values[0])
+             if str(term).strip()),
+            key=lambda feature: abs(feature[1]), reverse=True
+        )[:num_features]
+    # Refine the cost estimate for the next budget in this process
+    _seconds_per_sample = 0.7 * _seconds_per_sample + 0.3 * (time.perf_counter() - explain_start) / samples
+
+    return {
+        'method': method,
+        'model': BIAS_CLASSIFIER_MODEL,
+        'label': labels[target],
+        'label_probability': float(base[target]),
+        'features': [{'term': term, 'weight': float(weight)} for term, weight in features],
+        'samples': samples,
+        'budget_ms': budget_seconds * 1000,
+        'duration_ms': (time.perf_counter() - start) * 1000
+    }
+
+# Service side
+
+class ExplanationPool:
+    """Explains alerting results' responses in a process pool and stores the explanations
+
+    Requests, completions and timeouts are all handled on the dispatcher
+    thread, so database updates and in-flight bookkeeping never race.
+    """
+
+    def __init__(self, store: ResultsStore, method: str = 'lime', budget_ms: float = 5000.0,
+                 max_samples: int = 1000, batch_size: int = 32, workers: int = 1,
+                 max_responses: int = 5, levels: tuple = ('high', 'critical'), max_pending: int = 1000,
+                 timeout_ms: float = 120000.0):
+        if method not in EXPLANATION_METHODS:
+            raise ValueError(f"Unknown explanation method: {method}")
+        self.store = store
+        self.method = method
+        self.budget_ms = budget_ms
+        self.max_samples = max_samples
+        self.batch_size = batch_size
+        self.workers = workers
+        self.max_responses = max_responses
+        self.levels = levels
+        self.max_pending = max_pending
+        self.timeout_ms = timeout_ms
+        self.stats = {'requested': 0, 'cache_hits': 0, 'shared': 0, 'completed': 0, 'failed': 0, 'dropped': 0,
+                      'timed_out': 0, 'pool_restarts': 0}
+        self._events: 'queue.Queue' = queue.Queue()
+        self._queued_results: set = set()
+        self._queued_lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        # When each in-flight future was first seen running
+        self._running_since: Dict[str, float] = {}
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._stopping = threading.Event()
+
+        store._connection().executescript(SCHEMA)
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name='explanation-dispatcher', daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, result_id: str, alert_level: str, responses: List[Tuple[int, str]]) -> bool:
+        """Queue explanations of an alerting result's responses; never blocks the caller"""
+        if alert_level not in self.levels or not responses:
+            return False
+        with self._queued_lock:
+            if len(self._queued_results) >= self.max_pending:
+                self.stats['dropped'] += 1
+                return False
+            self._queued_results.add(result_id)
+        self._events.put(('request', result_id, responses[:self.max_responses], time.time()))
+        return True
+
+    def _dispatch_loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                self._expire_hung()
+            except Exception as e:
+                logger.error("Explanation timeout check failed: %s", e)
+            try:
+                event = self._events.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                if event[0] == 'request':
+                    self._schedule(*event[1:])
+                else:
+                    self._complete(*event[1:])
+            except Exception as e:
+                logger.error("Explanation %s handling failed: %s", event[0], e)
+            finally:
+                if event[0] == 'request':
+                    with self._queued_lock:
+                        self._queued_results.discard(event[1])
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Forking this multi-threaded process could copy held locks, so workers come from a
+            # forkserver that has only imported this module (spawn where forkserver is unavailable).
+            # Both re-import the entry script as __mp_main__, which must not start the service.
+            if os.name == 'posix':
+                context = multiprocessing.get_context('forkserver')
+                context.set_forkserver_preload([__name__])
+            else:
+                context = multiprocessing.get_context('spawn')
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_load_model
+            )
+        return self._executor
+
+    def _fail(self, key: str, error: str) -> None:
+        self.stats['failed'] += 1
+        logger.warning("Explanation %s failed: %s", key[:12], error)
+        connection = self.store._connection()
+        with connection:
+            connection.execute(
+                "UPDATE result_explanations SET status = 'failed', error = ?, completed_ts = ? "
+                "WHERE cache_key = ? AND status = 'pending'",
+                (error, time.time(), key)
+            )
+
+    def _expire_hung(self) -> None:
+        """Restart the pool when an explanation has run past its timeout"""
+        now = time.monotonic()
+        for key, future in self._in_flight.items():
+            if key not in self._running_since and future.running():
+                self._running_since[key] = now
+        hung = [key for key, since in self._running_since.items() if now - since > self.timeout_ms / 1000.0]
+        if not hung:
+            return
+        # A running task cannot be cancelled; stop the workers and fail everything they held
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            for process in list((getattr(executor, '_processes', None) or {}).values()):
+                process.terminate()
+            executor.shutdown(wait=False, cancel_futures=True)
+        self.stats['timed_out'] += len(hung)
+        self.stats['pool_restarts'] += 1
+        logger.error("Explanations %s exceeded %.0f ms; restarting the pool", [key[:12] for key in hung], self.timeout_ms)
+        in_flight, self._in_flight = self._in_flight, {}
+        self._running_since.clear()
+        for key in in_flight:
+            self._fail(key, 'timed out' if key in hung else 'explanation pool restarted after a timeout')
+
+    def _schedule(self, result_id: str, responses: List[Tuple[int, str]], requested_ts: float) -> None:
+        keys = {index: explanation_key(text, self.method) for index, text in responses}
+        distinct = sorted(set(keys.values()))
+        connection = self.store._connection()
+        cached = {
+            row['cache_key'] for row in connection.execute(
+                f"SELECT cache_key FROM explanations WHERE cache_key IN ({', '.join('?' for _ in distinct)})",
+                distinct
+            )
+        }
+        now = time.time()
+        with connection:
+            connection.executemany(
+                'INSERT OR REPLACE INTO result_explanations '
+                '(result_id, response_index, cache_key, status, requested_ts, completed_ts) VALUES (?, ?, ?, ?, ?, ?)',
+                [
+                    (result_id, index, key, 'completed' if key in cached else 'pending',
+                     requested_ts, now if key in cached else None)
+                    for index, key in keys.items()
+                ]
+            )
+
+        for index, text in responses:
+            key = keys[index]
+            self.stats['requested'] += 1
+            if key in cached:
+                self.stats['cache_hits'] += 1
+                continue
+            if key in self._in_flight:
+                self.stats['shared'] += 1
+                continue
+            future = self._pool().submit(
+                explain_text, text, self.method, self.budget_ms / 1000.0, self.max_samples,
+                self.batch_size, seed=int(key[:8], 16)
+            )
+            self._in_flight[key] = future
+            future.add_done_callback(lambda done, key=key: self._events.put(('complete', key, done)))
+
+    def _complete(self, key: str, future: Future) -> None:
+        if self._in_flight.get(key) is not future:
+            # Already failed by a timeout; a newer request may own the key now
+            return
+        del self._in_flight[key]
+        self._running_since.pop(key, None)
+        connection = self.store._connection()
+        now = time.time()
+        try:
+            explanation = future.result()
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                # A worker died (e.g. out of memory); start a fresh pool next time
+                self._executor = None
+            self._fail(key, str(e) or type(e).__name__)
+            return
+
+        self.stats['completed'] += 1
+        encrypted = self.store.cipher.encrypt_data(json.dumps(explanation, default=json_default))
+        with connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO explanations (cache_key, method, created_ts, encrypted_explanation) '
+                'VALUES (?, ?, ?, ?)',
+                (key, explanation['method'], now, encrypted)
+            )
+            connection.execute(
+                "UPDATE result_explanations SET status = 'completed', error = NULL, completed_ts = ? "
+                "WHERE cache_key = ? AND status = 'pending'",
+                (now, key)
+            )
+
+    def get(self, result_id: str) -> Optional[Dict[str, Any]]:
+        """Explanations recorded for a result, or None if none were requested"""
+        rows = self.store._connection().execute(
+            'SELECT r.response_index, r.status, r.error, r.requested_ts, r.completed_ts, e.encrypted_explanation '
+            'FROM result_explanations r LEFT JOIN explanations e ON e.cache_key = r.cache_key '
+            'WHERE r.result_id = ? ORDER BY r.response_index',
+            (result_id,)
+        ).fetchall()
+        if not rows:
+            with self._queued_lock:
+                queued = result_id in self._queued_results
+            return {'result_id': result_id, 'status': 'pending', 'responses': []} if queued else None
+
+        responses = []
+        for row in rows:
+            entry = {'response_index': row['response_index'], 'status': row['status'],
+                     'requested_ts': row['requested_ts'], 'completed_ts': row['completed_ts']}
+            if row['status'] == 'completed' and row['encrypted_explanation']:
+                entry['explanation'] = json.loads(self.store.cipher.decrypt_data(row['encrypted_explanation']))
+            elif row['error']:
+                entry['error'] = row['error']
+            responses.append(entry)
+
+        statuses = {entry['status'] for entry in responses}
+        if statuses == {'completed'}:
+            status = 'completed'
+        elif 'pending' in statuses:
+            status = 'pending'
+        elif statuses == {'failed'}:
+            status = 'failed'
+        else:
+            status = 'partial'
+        return {'result_id': result_id, 'status': status, 'responses': responses}
+
+    def pending(self) -> List[Any]:
+        """Snapshot of queued requests and completions plus in-flight futures"""
+        with self._events.mutex:
+            events = list(self._events.queue)
+        return events + list(self._in_flight.values())
+
+    def status(self) -> Dict[str, Any]:
+        with self._queued_lock:
+            queued = len(self._queued_results)
+        return {
+            'method': self.method,
+            'budget_ms': self.budget_ms,
+            'timeout_ms': self.timeout_ms,
+            'workers': self.workers,
+            'levels': list(self.levels),
+            'queued_results': queued,
+            'in_flight': len(self._in_flight),
+            **self.stats
+        }
+
+    def close(self) -> None:
+        self._stopping.set()
+        self._dispatcher.join(timeout=5.0)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
@@ -0,0 +1,173 @@
+"""
+Pixelated Empathy Bias Detection Streaming Export
+
+Encoders that turn an iterator of stored results into response chunks, so
+exports are streamed with memory bounded by the chunk size rather than the
+date range:
+- JSON (the original {"sessions": [...], "metadata": {...}} document)
+- CSV and newline-delimited JSON
+- Parquet, written one row group at a time (requires pyarrow)
+"""
+
+import csv
+import io
+import json
+import logging
+from typing import Dict, List, Any, Iterable, Iterator, Optional
+
+from results_store import ANALYSIS_LAYERS, DEMOGRAPHIC_COLUMNS, ResultsStore, json_default
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError as e:
+    PARQUET_AVAILABLE = False
+    logging.warning("Parquet export not available: %s", e)
+
+EXPORT_FIELDS = (
+    ['session_id', 'bias_score', 'alert_level', 'timestamp', 'confidence']
+    + [f'{layer}_score' for layer in ANALYSIS_LAYERS]
+    + list(DEMOGRAPHIC_COLUMNS)
+)
+
+EXPORT_FORMATS = {
+    # format -> (mimetype, file extension)
+    'json': ('application/json', 'json'),
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+def export_records(store: ResultsStore, start_ts: Optional[float] = None,
+                   end_ts: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """Stored results in a time range, shaped as export rows"""
+    for row in store.iter_rows(start_ts, end_ts):
+        record = {
+            'session_id': row['session_id'],
+            'bias_score': row['overall_score'],
+            'alert_level': row['alert_level'],
+            'timestamp': row['created_at'],
+            'confidence': row['confidence'],
+        }
+        for layer in ANALYSIS_LAYERS:
+            record[f'{layer}_score'] = row[f'{layer}_score']
+        for column in DEMOGRAPHIC_COLUMNS:
+            record[column] = row[column]
+        yield record
+
+def stream_json(records: Iterable[Dict[str, Any]], metadata: Dict[str, Any],
+                chunk_rows: int = 500) -> Iterator[str]:
+    """The JSON export document, with metadata (and its record count) after the sessions"""
+    yield '{"sessions": ['
+    total = 0
+    chunk: List[str] = []
+    for record in records:
+        chunk.append(json.dumps(record, default=json_default))
+        total += 1
+        if len(chunk) >= chunk_rows:
+            yield (',' if total > len(chunk) else '') + ','.join(chunk)
+            chunk = []
+    if chunk:
+        yield (',' if total > len(chunk) else '') + ','.join(chunk)
+    yield '], "metadata": ' + json.dumps(dict(metadata, total_records=total), default=json_default) + '}'
+
+def stream_ndjson(records: Iterable[Dict[str, Any]], chunk_rows: int = 500) -> Iterator[str]:
+    chunk: List[str] = []
+    for record in records:
+        chunk.append(json.dumps(record, default=json_default) + '\n')
+        if len(chunk) >= chunk_rows:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+def stream_csv(records: Iterable[Dict[str, Any]], chunk_rows: int = 500) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    pending = 0
+    for record in records:
+        writer.writerow(record)
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue()
+
+class _DrainingSink(io.RawIOBase):
+    """Write-only file object whose written bytes are handed out and released"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+def _parquet_schema() -> 'pa.Schema':
+    return pa.schema(
+        [
+            ('session_id', pa.string()),
+            ('bias_score', pa.float64()),
+            ('alert_level', pa.string()),
+            ('timestamp', pa.string()),
+            ('confidence', pa.float64()),
+        ]
+        + [(f'{layer}_score', pa.float64()) for layer in ANALYSIS_LAYERS]
+        + [(column, pa.string()) for column in DEMOGRAPHIC_COLUMNS]
+    )
+
+def stream_parquet(records: Iterable[Dict[str, Any]], row_group_rows: int = 10000) -> Iterator[bytes]:
+    """Parquet file bytes, emitting each row group as soon as it is written"""
+    if not PARQUET_AVAILABLE:
+        raise RuntimeError('Parquet export requires pyarrow')
+    schema = _parquet_schema()
+    sink = _DrainingSink()
+    writer = pq.ParquetWriter(sink, schema, compression='zstd')
+    try:
+        columns: Dict[str, List[Any]] = {field: [] for field in EXPORT_FIELDS}
+        rows = 0
+        for record in records:
+            for field in EXPORT_FIELDS:
+                columns[field].append(record[field])
+            rows += 1
+            if rows >= row_group_rows:
+                writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+                columns = {field: [] for field in EXPORT_FIELDS}
+                rows = 0
+                yield sink.drain()
+        if rows:
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+    finally:
+        writer.close()
+    yield sink.drain()
+
+def stream_export(export_format: str, records: Iterable[Dict[str, Any]],
+                  metadata: Dict[str, Any]) -> Iterator[Any]:
+    """Chunks for the requested format; see EXPORT_FORMATS for supported values"""
+    if export_format == 'json':
+        return stream_json(records, metadata)
+    if export_format == 'csv':
+        return stream_csv(records)
+    if export_format == 'ndjson':
+        return stream_ndjson(records)
+    if export_format == 'parquet':
+        return stream_parquet(records)
+    raise ValueError(f"Unknown export format: {export_format}")
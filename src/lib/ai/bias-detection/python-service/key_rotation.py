@@ -0,0 +1,138 @@
+"""
+Pixelated Empathy Bias Detection Key Rotation
+
+Background re-encryption of records written under retired keys:
+- Stored results (encrypted session ID and result payload), in rowid pages
+  with one short transaction per page
+- The audit log's encrypted_details, rewritten to a new file and swapped in
+  atomically, with appends made during the rewrite carried over
+
+Once a job completes with no failures, retired keys can be dropped from
+the keyring.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from encryption import FernetCipher
+
+logger = logging.getLogger(__name__)
+
+class ReencryptionJob:
+    """Re-encrypts results store rows and audit log entries under the primary key"""
+
+    def __init__(self, cipher: FernetCipher, results_store=None, audit_file: Optional[str] = None,
+                 audit_lock: Optional[threading.Lock] = None, page_size: int = 500,
+                 pause_seconds: float = 0.0):
+        self.cipher = cipher
+        self.results_store = results_store
+        self.audit_file = audit_file
+        self.audit_lock = audit_lock or threading.Lock()
+        self.page_size = page_size
+        self.pause_seconds = pause_seconds
+        self._thread: Optional[threading.Thread] = None
+        self.progress: Dict[str, Any] = {'state': 'idle'}
+
+    def start(self) -> bool:
+        """Run in a background thread; False if a job is already running"""
+        if self._thread is not None and self._thread.is_alive():
+            return False
+        self.progress = {
+            'state': 'running',
+            'started_at': datetime.now().isoformat(),
+            'primary_key': self.cipher.fingerprints()[0],
+            'results': {'scanned': 0, 'reencrypted': 0, 'failed': 0},
+            'audit_log': {'scanned': 0, 'reencrypted': 0, 'failed': 0}
+        }
+        self._thread = threading.Thread(target=self._run, name='key-rotation', daemon=True)
+        self._thread.start()
+        return True
+
+    def _run(self) -> None:
+        try:
+            if self.results_store is not None:
+                self._reencrypt_results(self.progress['results'])
+            if self.audit_file and os.path.exists(self.audit_file):
+                self._reencrypt_audit_log(self.progress['audit_log'])
+            self.progress['state'] = 'completed'
+        except Exception as e:
+            logger.error("Re-encryption job failed: %s", e)
+            self.progress.update({'state': 'failed', 'error': str(e)})
+        finally:
+            self.progress['finished_at'] = datetime.now().isoformat()
+
+    def _rotate(self, token: str, counters: Dict[str, int]) -> Optional[str]:
+        """Token re-encrypted under the primary key, or None if it already is (or cannot be read)"""
+        counters['scanned'] += 1
+        if self.cipher.is_current(token):
+            return None
+        try:
+            rotated = self.cipher.rotate_data(token)
+        except Exception:
+            counters['failed'] += 1
+            return None
+        counters['reencrypted'] += 1
+        return rotated
+
+    def _reencrypt_results(self, counters: Dict[str, int]) -> None:
+        connection = self.results_store._connection()
+        last_row_key = 0
+        while True:
+            rows = connection.execute(
+                'SELECT rowid, encrypted_session_id, encrypted_result FROM analysis_results '
+                'WHERE rowid > ? ORDER BY rowid LIMIT ?',
+                (last_row_key, self.page_size)
+            ).fetchall()
+            if not rows:
+                return
+            updates = []
+            for row in rows:
+                session_id = self._rotate(row['encrypted_session_id'], counters)
+                result = self._rotate(row['encrypted_result'], counters)
+                if session_id is not None or result is not None:
+                    updates.append((
+                        session_id or row['encrypted_session_id'],
+                        result or row['encrypted_result'],
+                        row['rowid']
+                    ))
+            if updates:
+                with connection:
+                    connection.executemany(
+                        'UPDATE analysis_results SET encrypted_session_id = ?, encrypted_result = ? WHERE rowid = ?',
+                        updates
+                    )
+            last_row_key = rows[-1]['rowid']
+            if self.pause_seconds:
+                time.sleep(self.pause_seconds)
+
+    def _rotate_audit_line(self, line: str, counters: Dict[str, int]) -> str:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            return line
+        token = entry.get('encrypted_details')
+        if not token:
+            return line
+        rotated = self._rotate(token, counters)
+        if rotated is None:
+            return line
+        entry['encrypted_details'] = rotated
+        return json.dumps(entry) + '\n'
+
+    def _reencrypt_audit_log(self, counters: Dict[str, int]) -> None:
+        tmp_path = f"{self.audit_file}.rotating"
+        with open(self.audit_file) as source, open(tmp_path, 'w') as target:
+            for line in source:
+                target.write(self._rotate_audit_line(line, counters))
+            # Carry over lines appended during the rewrite, then swap with appends blocked
+            with self.audit_lock:
+                for line in source:
+                    target.write(self._rotate_audit_line(line, counters))
+                target.flush()
+                os.fsync(target.fileno())
+                os.replace(tmp_path, self.audit_file)
@@ -0,0 +1,211 @@
+"""
+Pixelated Empathy Bias Detection Memory Accounting
+
+Attributes process memory to service components and exposes tracemalloc
+snapshots for leak hunting:
+- Per-component size estimates (model weights, caches, buffers)
+- Process RSS from /proc or getrusage
+- Named tracemalloc snapshots with top allocation sites and diffs
+"""
+
+import gc
+import os
+import sys
+import threading
+import tracemalloc
+import types
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Any, Callable
+
+SNAPSHOT_KEY_TYPES = ('lineno', 'filename', 'traceback')
+
+def process_memory() -> Dict[str, Any]:
+    """Current and peak resident set size of this process in bytes"""
+    usage: Dict[str, Any] = {'rss_bytes': None, 'peak_rss_bytes': None}
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    usage['rss_bytes'] = int(line.split()[1]) * 1024
+                elif line.startswith('VmHWM:'):
+                    usage['peak_rss_bytes'] = int(line.split()[1]) * 1024
+    except OSError:
+        try:
+            import resource
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # ru_maxrss is bytes on macOS and kilobytes on Linux
+            usage['peak_rss_bytes'] = peak if sys.platform == 'darwin' else peak * 1024
+        except ImportError:
+            pass
+    return usage
+
+def deep_sizeof(obj: Any, max_objects: int = 200000) -> int:
+    """Approximate retained size of an object graph
+
+    Follows gc referents, counting each object once. Modules,
+    classes and functions are not followed so shared code is not attributed.
+    Stops after ``max_objects`` objects to keep the walk bounded.
+    """
+    seen = set()
+    pending = [obj]
+    total = 0
+    skipped_types = (type, types.ModuleType, types.FunctionType, types.MethodType, types.BuiltinFunctionType)
+    while pending and len(seen) < max_objects:
+        current = pending.pop()
+        if id(current) in seen or isinstance(current, skipped_types):
+            continue
+        seen.add(id(current))
+        nbytes = getattr(current, 'nbytes', None)
+        if isinstance(nbytes, int) and not isinstance(current, (bytes, bytearray)):
+            # NumPy arrays and similar buffers report their data size directly
+            total += nbytes + sys.getsizeof(current)
+            continue
+        try:
+            total += sys.getsizeof(current)
+        except TypeError:
+            continue
+        pending.extend(gc.get_referents(current))
+    return total
+
+def torch_model_bytes(model: Any) -> int:
+    """Parameter and buffer bytes of a torch module, 0 if not a torch module"""
+    total = 0
+    for getter in ('parameters', 'buffers'):
+        tensors = getattr(model, getter, None)
+        if tensors is None:
+            continue
+        try:
+            total += sum(t.numel() * t.element_size() for t in tensors())
+        except Exception:
+            continue
+    return total
+
+class MemoryAccountant:
+    """Registry of component size estimators plus tracemalloc snapshot management"""
+
+    def __init__(self, max_snapshots: int = 10):
+        self.max_snapshots = max_snapshots
+        self._components: Dict[str, Callable[[], int]] = OrderedDict()
+        self._snapshots: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, name: str, estimator: Callable[[], int]) -> None:
+        """Register a callable returning the current size of a component in bytes"""
+        with self._lock:
+            self._components[name] = estimator
+
+    def unregister(self, name: str) -> None:
+        with self._lock:
+            self._components.pop(name, None)
+
+    def report(self) -> Dict[str, Any]:
+        """Per-component sizes alongside process RSS"""
+        with self._lock:
+            components = list(self._components.items())
+        sizes: Dict[str, Any] = {}
+        for name, estimator in components:
+            try:
+                sizes[name] = int(estimator())
+            except Exception as e:
+                sizes[name] = {'error': str(e)}
+        accounted = sum(v for v in sizes.values() if isinstance(v, int))
+        process = process_memory()
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'process': process,
+            'components': sizes,
+            'accounted_bytes': accounted,
+            'unaccounted_bytes': process['rss_bytes'] - accounted if process['rss_bytes'] else None,
+            'tracemalloc': self.tracemalloc_status()
+        }
+
+    # tracemalloc snapshots
+
+    def start_tracing(self, frames: int = 10) -> Dict[str, Any]:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        return self.tracemalloc_status()
+
+    def stop_tracing(self) -> Dict[str, Any]:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        with self._lock:
+            self._snapshots.clear()
+        return self.tracemalloc_status()
+
+    def tracemalloc_status(self) -> Dict[str, Any]:
+        status: Dict[str, Any] = {'tracing': tracemalloc.is_tracing()}
+        if status['tracing']:
+            current, peak = tracemalloc.get_traced_memory()
+            status.update({
+                'traced_current_bytes': current,
+                'traced_peak_bytes': peak,
+                'traceback_limit': tracemalloc.get_traceback_limit()
+            })
+        with self._lock:
+            status['snapshots'] = [
+                {'label': label, 'taken_at': entry['taken_at']}
+                for label, entry in self._snapshots.items()
+            ]
+        return status
+
+    def take_snapshot(self, label: str) -> Dict[str, Any]:
+        """Take a named snapshot, evicting the oldest beyond max_snapshots"""
+        if not tracemalloc.is_tracing():
+            raise RuntimeError('tracemalloc is not tracing; start it first')
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+        entry = {'snapshot': snapshot, 'taken_at': datetime.now().isoformat()}
+        with self._lock:
+            self._snapshots[label] = entry
+            self._snapshots.move_to_end(label)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        return {'label': label, 'taken_at': entry['taken_at']}
+
+    def _get_snapshot(self, label: str) -> tracemalloc.Snapshot:
+        with self._lock:
+            entry = self._snapshots.get(label)
+        if entry is None:
+            raise KeyError(label)
+        return entry['snapshot']
+
+    def top_allocations(self, label: str, limit: int = 20, key_type: str = 'lineno') -> List[Dict[str, Any]]:
+        """Largest allocation sites in a snapshot"""
+        self._check_key_type(key_type)
+        stats = self._get_snapshot(label).statistics(key_type)
+        return [
+            {
+                'location': self._format_traceback(stat.traceback),
+                'size_bytes': stat.size,
+                'count': stat.count
+            }
+            for stat in stats[:limit]
+        ]
+
+    def diff(self, from_label: str, to_label: str, limit: int = 20, key_type: str = 'lineno') -> List[Dict[str, Any]]:
+        """Allocation sites that grew most between two snapshots"""
+        self._check_key_type(key_type)
+        stats = self._get_snapshot(to_label).compare_to(self._get_snapshot(from_label), key_type)
+        return [
+            {
+                'location': self._format_traceback(stat.traceback),
+                'size_bytes': stat.size,
+                'size_diff_bytes': stat.size_diff,
+                'count': stat.count,
+                'count_diff': stat.count_diff
+            }
+            for stat in stats[:limit]
+        ]
+
+    @staticmethod
+    def _check_key_type(key_type: str) -> None:
+        if key_type not in SNAPSHOT_KEY_TYPES:
+            raise ValueError(f"key_type must be one of {', '.join(SNAPSHOT_KEY_TYPES)}")
+
+    @staticmethod
+    def _format_traceback(traceback: tracemalloc.Traceback) -> List[str]:
+        return [f"{os.path.basename(frame.filename)}:{frame.lineno}" for frame in traceback]
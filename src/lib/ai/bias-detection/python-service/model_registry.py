@@ -0,0 +1,51 @@
+"""
+Pixelated Empathy Bias Detection Model Registry
+
+Process-wide cache of loaded NLP/ML models:
+- Each model is loaded at most once per process
+- The supervisor preloads models before forking, so workers inherit them
+  copy-on-write instead of loading their own copies
+"""
+
+import logging
+import threading
+from typing import Dict, List, Any, Callable
+
+logger = logging.getLogger(__name__)
+
+SPACY_MODEL = 'en_core_web_sm'
+BIAS_CLASSIFIER_MODEL = 'unitary/toxic-bert'
+
+_models: Dict[str, Any] = {}
+_lock = threading.Lock()
+
+def get_or_load(name: str, loader: Callable[[], Any]) -> Any:
+    """Model registered under ``name``, loading it on first use"""
+    with _lock:
+        if name not in _models:
+            _models[name] = loader()
+        return _models[name]
+
+def loaded_models() -> List[str]:
+    with _lock:
+        return list(_models)
+
+def spacy_model() -> Any:
+    import spacy
+    return get_or_load(f"spacy:{SPACY_MODEL}", lambda: spacy.load(SPACY_MODEL))
+
+def bias_classifier() -> Any:
+    from transformers import pipeline
+    return get_or_load(
+        f"hf:{BIAS_CLASSIFIER_MODEL}",
+        lambda: pipeline("text-classification", model=BIAS_CLASSIFIER_MODEL, device=-1)  # CPU
+    )
+
+def preload_models() -> List[str]:
+    """Load every model whose libraries are installed; returns the loaded names"""
+    for loader in (spacy_model, bias_classifier):
+        try:
+            loader()
+        except Exception as e:
+            logger.warning("Model preload skipped (%s): %s", loader.__name__, e)
+    return loaded_models()
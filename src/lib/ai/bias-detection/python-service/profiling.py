@@ -0,0 +1,208 @@
+"""
+Pixelated Empathy Bias Detection Request Profiling
+
+Opt-in profiling for individual analysis requests:
+- Stack sampling profiler producing folded stacks (flamegraph.pl / speedscope),
+  limited to the request thread and the worker threads attached to it
+- cProfile capture saved as a pstats file (snakeviz, flameprof); only one
+  profiler can be active per process, so captures are serialized
+- Bounded on-disk store for captured profiles
+
+Nothing here runs unless a profile is explicitly requested or sampled.
+"""
+
+import cProfile
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Iterator
+
+PROFILE_MODES = ('sample', 'cprofile')
+
+_PROFILE_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+# cProfile (sys.monitoring on 3.12+) allows a single active profiler per process
+_cprofile_lock = threading.Lock()
+
+_active_sampler: ContextVar[Optional['StackSampler']] = ContextVar('bias_active_sampler', default=None)
+
+def active_sampler() -> Optional['StackSampler']:
+    """Sampler profiling the current request, if any; pass it to worker threads"""
+    return _active_sampler.get()
+
+class StackSampler:
+    """Periodically samples thread stacks and aggregates them as folded stacks
+
+    Samples the thread that started the sampler plus any worker thread while
+    it runs inside ``attach()``, so concurrent requests sharing a pool don't
+    leak into the profile.
+    """
+
+    def __init__(self, interval_seconds: float = 0.005):
+        self.interval_seconds = interval_seconds
+        self.stacks: Counter = Counter()
+        self.sample_count = 0
+        self._target_ident: Optional[int] = None
+        self._attached: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._target_ident = threading.get_ident()
+        self._thread = threading.Thread(target=self._run, name='bias-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    @contextmanager
+    def attach(self) -> Iterator[None]:
+        """Include the calling thread in samples while it works on this request"""
+        ident = threading.get_ident()
+        with self._lock:
+            self._attached[ident] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._attached[ident] -= 1
+                if not self._attached[ident]:
+                    del self._attached[ident]
+
+    def _sampled_idents(self) -> List[int]:
+        with self._lock:
+            attached = [ident for ident in self._attached if ident != self._target_ident]
+        return [self._target_ident] + attached
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            frames = sys._current_frames()
+            for ident in self._sampled_idents():
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                self.stacks[self._fold(frame)] += 1
+            self.sample_count += 1
+
+    @staticmethod
+    def _fold(frame) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+    def folded(self) -> str:
+        """Folded stack lines ("frame;frame;frame count") for flame graph tools"""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+class ProfileStore:
+    """Keeps the most recent captured profiles on disk"""
+
+    def __init__(self, directory: str, max_profiles: int = 50):
+        self.directory = directory
+        self.max_profiles = max_profiles
+        self._lock = threading.Lock()
+
+    def save(self, profile_id: str, mode: str, payload: Any, metadata: Dict[str, Any]) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        extension = 'folded' if mode == 'sample' else 'prof'
+        path = os.path.join(self.directory, f"{profile_id}.{extension}")
+        if mode == 'sample':
+            with open(path, 'w') as f:
+                f.write(payload)
+        else:
+            payload.dump_stats(path)
+        with open(os.path.join(self.directory, f"{profile_id}.meta"), 'w') as f:
+            f.write('\n'.join(f"{k}={v}" for k, v in metadata.items()))
+        self._prune()
+        return path
+
+    def _prune(self) -> None:
+        with self._lock:
+            profiles = self.list()
+            for entry in profiles[self.max_profiles:]:
+                for name in os.listdir(self.directory):
+                    if name.startswith(entry['profile_id']):
+                        try:
+                            os.remove(os.path.join(self.directory, name))
+                        except FileNotFoundError:
+                            pass
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Stored profiles, newest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for name in os.listdir(self.directory):
+            profile_id, _, extension = name.partition('.')
+            if extension not in ('folded', 'prof'):
+                continue
+            path = os.path.join(self.directory, name)
+            entries.append({
+                'profile_id': profile_id,
+                'mode': 'sample' if extension == 'folded' else 'cprofile',
+                'size_bytes': os.path.getsize(path),
+                'created_at': datetime.fromtimestamp(os.path.getmtime(path)).isoformat()
+            })
+        entries.sort(key=lambda entry: entry['created_at'], reverse=True)
+        return entries
+
+    def path_for(self, profile_id: str) -> Optional[str]:
+        """Location of a stored profile, rejecting anything that is not a profile ID"""
+        if not _PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        for extension in ('folded', 'prof'):
+            path = os.path.join(self.directory, f"{profile_id}.{extension}")
+            if os.path.exists(path):
+                return path
+        return None
+
+@contextmanager
+def capture_profile(mode: str, store: ProfileStore, metadata: Optional[Dict[str, Any]] = None,
+                    sample_interval_seconds: float = 0.005) -> Iterator[Dict[str, Any]]:
+    """Profile the enclosed block and save the result to the store
+
+    Yields a dict that receives ``profile_id`` and ``path`` once the block exits.
+    cProfile captures wait for any capture already in progress.
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode: {mode}")
+
+    info: Dict[str, Any] = {'profile_id': uuid.uuid4().hex, 'mode': mode}
+    start = time.perf_counter()
+    if mode == 'sample':
+        sampler = StackSampler(interval_seconds=sample_interval_seconds)
+        token = _active_sampler.set(sampler)
+        sampler.start()
+        try:
+            yield info
+        finally:
+            sampler.stop()
+            _active_sampler.reset(token)
+            payload = sampler.folded()
+    else:
+        with _cprofile_lock:
+            start = time.perf_counter()
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield info
+            finally:
+                profiler.disable()
+                payload = profiler
+
+    meta = dict(metadata or {})
+    meta.update({'mode': mode, 'duration_seconds': f"{time.perf_counter() - start:.6f}"})
+    info['path'] = store.save(info['profile_id'], mode, payload, meta)
@@ -0,0 +1,145 @@
+"""
+Pixelated Empathy Bias Detection Rate Limiting
+
+Token-bucket rate limiting with O(1) checks:
+- Buckets refill continuously at rate_per_minute up to a burst capacity
+- Several keys (e.g. user and client IP) are charged atomically: a request
+  only consumes tokens if every bucket can pay
+- Request cost can be weighted, so large sessions consume more tokens;
+  bodies of unknown length are charged after they have been read
+- Bucket state is kept in process memory, or in a local SQLite file shared
+  by all workers on the host
+"""
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+
+class RateLimitDecision:
+    """Outcome of a rate limit check"""
+
+    __slots__ = ('allowed', 'retry_after_seconds', 'remaining', 'limited_key')
+
+    def __init__(self, allowed: bool, retry_after_seconds: float, remaining: float, limited_key: Optional[str]):
+        self.allowed = allowed
+        self.retry_after_seconds = retry_after_seconds
+        self.remaining = remaining
+        self.limited_key = limited_key
+
+def _refill(tokens: float, updated: float, now: float, capacity: float, rate_per_second: float) -> float:
+    return min(capacity, tokens + (now - updated) * rate_per_second)
+
+class MemoryBucketStore:
+    """Per-process bucket state, bounded by evicting the least recently used keys"""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: 'OrderedDict[str, Tuple[float, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, keys: List[str], cost: float, capacity: float, rate_per_second: float,
+                force: bool = False) -> RateLimitDecision:
+        now = time.monotonic()
+        with self._lock:
+            levels = {}
+            for key in keys:
+                tokens, updated = self._buckets.get(key, (capacity, now))
+                levels[key] = _refill(tokens, updated, now, capacity, rate_per_second)
+            decision = _decide(levels, cost, rate_per_second)
+            for key, tokens in levels.items():
+                self._buckets[key] = (tokens - cost if decision.allowed or force else tokens, now)
+                self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return decision
+
+class SQLiteBucketStore:
+    """Bucket state in a local SQLite file so every worker on a host shares limits"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._connection().execute(
+            'CREATE TABLE IF NOT EXISTS rate_limit_buckets ('
+            'bucket_key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL) WITHOUT ROWID'
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=OFF')
+            self._local.connection = connection
+        return connection
+
+    def consume(self, keys: List[str], cost: float, capacity: float, rate_per_second: float,
+                force: bool = False) -> RateLimitDecision:
+        # Wall clock, since monotonic clocks are not comparable across processes
+        now = time.time()
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            levels = {}
+            for key in keys:
+                row = connection.execute(
+                    'SELECT tokens, updated FROM rate_limit_buckets WHERE bucket_key = ?', (key,)
+                ).fetchone()
+                tokens, updated = row if row else (capacity, now)
+                levels[key] = _refill(tokens, updated, now, capacity, rate_per_second)
+            decision = _decide(levels, cost, rate_per_second)
+            connection.executemany(
+                'INSERT INTO rate_limit_buckets (bucket_key, tokens, updated) VALUES (?, ?, ?) '
+                'ON CONFLICT (bucket_key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated',
+                [(key, tokens - cost if decision.allowed or force else tokens, now) for key, tokens in levels.items()]
+            )
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        return decision
+
+def _decide(levels: Dict[str, float], cost: float, rate_per_second: float) -> RateLimitDecision:
+    limited_key = None
+    shortfall = 0.0
+    for key, tokens in levels.items():
+        if tokens < cost and cost - tokens > shortfall:
+            limited_key, shortfall = key, cost - tokens
+    remaining = min(levels.values()) if levels else 0.0
+    if limited_key is None:
+        return RateLimitDecision(True, 0.0, remaining - cost, None)
+    return RateLimitDecision(False, shortfall / rate_per_second, remaining, limited_key)
+
+class RateLimiter:
+    """Token buckets refilled at rate_per_minute with a burst capacity"""
+
+    def __init__(self, rate_per_minute: float, burst: Optional[float] = None, store: Any = None):
+        self.rate_per_minute = rate_per_minute
+        self.capacity = float(burst if burst is not None else rate_per_minute)
+        self.rate_per_second = rate_per_minute / 60.0
+        self.store = store if store is not None else MemoryBucketStore()
+
+    def check(self, keys: List[str], cost: float = 1.0) -> RateLimitDecision:
+        """Charge ``cost`` tokens to every key, or to none if any bucket is short
+
+        Costs above the burst capacity are capped so a request can always
+        eventually be admitted.
+        """
+        return self.store.consume(keys, min(cost, self.capacity), self.capacity, self.rate_per_second)
+
+    def charge(self, keys: List[str], cost: float) -> None:
+        """Charge ``cost`` tokens to every key even if that leaves a bucket in debt
+
+        For costs only known after the request was admitted; the debt delays
+        the key's next requests.
+        """
+        if cost > 0:
+            self.store.consume(keys, min(cost, self.capacity), self.capacity, self.rate_per_second, force=True)
+
+def request_cost(content_length: Optional[int], unit_bytes: int) -> float:
+    """One token per request plus one per full ``unit_bytes`` of body"""
+    if not content_length or unit_bytes <= 0:
+        return 1.0
+    return 1.0 + content_length // unit_bytes
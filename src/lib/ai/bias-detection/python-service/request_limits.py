@@ -0,0 +1,101 @@
+"""
+Pixelated Empathy Bias Detection Request Size Limits
+
+Bounded reading of JSON request bodies:
+- Bodies are read from the input stream in chunks and rejected as soon as
+  they pass the limit, whether or not Content-Length was sent
+- With ijson installed the body is parsed straight from the stream, so the
+  raw bytes are never held alongside the parsed document
+- Without it the raw buffer is parsed once and released before returning
+"""
+
+import json
+import logging
+from typing import Any
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError as e:
+    IJSON_AVAILABLE = False
+    logging.warning("ijson not available, request bodies will be buffered before parsing: %s", e)
+
+class RequestTooLarge(Exception):
+    """Request body exceeded the configured size limit"""
+
+    def __init__(self, limit_bytes: int):
+        super().__init__(f"Request body exceeds {limit_bytes} bytes")
+        self.limit_bytes = limit_bytes
+
+class CountingReader:
+    """File-like wrapper that counts the bytes read through it"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.stream.read(size)
+        self.bytes_read += len(data)
+        return data
+
+    def readline(self, size: int = -1) -> bytes:
+        data = self.stream.readline(size)
+        self.bytes_read += len(data)
+        return data
+
+class LimitedReader:
+    """File-like wrapper that raises RequestTooLarge once more than ``limit_bytes`` are read"""
+
+    def __init__(self, stream, limit_bytes: int):
+        self.stream = stream
+        self.limit_bytes = limit_bytes
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        if size == 0:
+            # ijson probes with read(0); WSGI input streams treat an empty read as a disconnect
+            return b''
+        # Never ask for more than one byte past the limit
+        allowed = self.limit_bytes - self.bytes_read + 1
+        data = self.stream.read(allowed if size is None or size < 0 else min(size, allowed))
+        self.bytes_read += len(data)
+        if self.bytes_read > self.limit_bytes:
+            raise RequestTooLarge(self.limit_bytes)
+        return data
+
+def read_json_body(stream, limit_bytes: int, chunk_size: int = 64 * 1024) -> Any:
+    """Parse a JSON document from a request stream without exceeding ``limit_bytes``
+
+    Raises RequestTooLarge when the body is too big and ValueError when it is
+    not valid JSON. Returns None for an empty body.
+    """
+    reader = LimitedReader(stream, limit_bytes)
+    if IJSON_AVAILABLE:
+        document = None
+        try:
+            # Iterate to the end so trailing data after the document is parsed (and rejected)
+            for index, item in enumerate(ijson.items(reader, '', use_float=True, buf_size=chunk_size)):
+                if index:
+                    raise ValueError('Invalid JSON body: trailing data after document')
+                document = item
+        except ijson.JSONError as e:
+            if reader.bytes_read == 0:
+                return None
+            raise ValueError(f"Invalid JSON body: {e}")
+        return document
+
+    buffer = bytearray()
+    while True:
+        chunk = reader.read(chunk_size)
+        if not chunk:
+            break
+        buffer += chunk
+    if not buffer.strip():
+        return None
+    try:
+        return json.loads(buffer)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON body: {e}")
+    finally:
+        del buffer
@@ -0,0 +1,154 @@
+"""
+Pixelated Empathy Bias Detection Response Encoding
+
+Fast, NumPy-aware JSON responses:
+- orjson (when installed) serializes NumPy scalars and arrays natively;
+  otherwise the stdlib encoder converts them through json_default
+- ``fields=`` projections trim results before encoding, e.g.
+  ``fields=overall_bias_score,alert_level`` or ``fields=-layer_results.*.metrics``
+- gzip/deflate compression negotiated from Accept-Encoding
+"""
+
+import dataclasses
+import json
+import logging
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, List, Optional, Tuple
+from uuid import UUID
+
+from flask.json.provider import JSONProvider
+
+from results_store import json_default
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError as e:
+    ORJSON_AVAILABLE = False
+    logging.warning("orjson not available, falling back to the standard JSON encoder: %s", e)
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/plain', 'text/csv')
+
+def _default(value: Any) -> Any:
+    """Values neither encoder handles natively"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    return json_default(value)
+
+if ORJSON_AVAILABLE:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(value: Any) -> bytes:
+        """Encode to compact JSON bytes"""
+        return orjson.dumps(value, default=_default, option=_ORJSON_OPTIONS)
+
+    def loads(data: Any) -> Any:
+        return orjson.loads(data)
+else:
+    def dumps(value: Any) -> bytes:
+        """Encode to compact JSON bytes"""
+        return json.dumps(value, default=_default, separators=(',', ':')).encode()
+
+    def loads(data: Any) -> Any:
+        return json.loads(data)
+
+class FastJSONProvider(JSONProvider):
+    """Flask JSON provider so every jsonify() goes through the fast encoder"""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dumps(obj).decode()
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        # Skip the bytes -> str -> bytes round trip of the base implementation
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj) + b'\n', mimetype='application/json')
+
+def parse_fields(value: Optional[str]) -> Optional[Tuple[List[List[str]], List[List[str]]]]:
+    """Split a ``fields=`` parameter into included and excluded dotted paths"""
+    if not value:
+        return None
+    includes, excludes = [], []
+    for field in value.split(','):
+        field = field.strip()
+        if field.startswith('-'):
+            excludes.append(field[1:].split('.'))
+        elif field:
+            includes.append(field.split('.'))
+    return (includes, excludes) if includes or excludes else None
+
+def _matches(segment: str, key: Any) -> bool:
+    return segment == '*' or segment == str(key)
+
+def _include(value: Any, paths: List[List[str]]) -> Any:
+    if any(not path for path in paths):
+        return value
+    if isinstance(value, list):
+        return [_include(item, paths) for item in value]
+    if not isinstance(value, dict):
+        return value
+    projected = {}
+    for key, child in value.items():
+        child_paths = [path[1:] for path in paths if _matches(path[0], key)]
+        if child_paths:
+            projected[key] = _include(child, child_paths)
+    return projected
+
+def _exclude(value: Any, path: List[str]) -> Any:
+    if isinstance(value, list):
+        return [_exclude(item, path) for item in value]
+    if not isinstance(value, dict) or not path:
+        return value
+    if len(path) == 1:
+        return {key: child for key, child in value.items() if not _matches(path[0], key)}
+    return {
+        key: _exclude(child, path[1:]) if _matches(path[0], key) else child
+        for key, child in value.items()
+    }
+
+def project(value: Any, fields: Optional[str]) -> Any:
+    """Apply a ``fields=`` projection; includes are applied before excludes
+
+    The input is never modified; only the containers along projected paths
+    are copied.
+    """
+    parsed = parse_fields(fields)
+    if parsed is None:
+        return value
+    includes, excludes = parsed
+    if includes:
+        value = _include(value, includes)
+    for path in excludes:
+        value = _exclude(value, path)
+    return value
+
+def compress_response(response, accept_encodings, min_bytes: int = 1024, level: int = 6):
+    """Compress a buffered response body with the client's preferred encoding
+
+    Streamed responses, already encoded bodies and bodies under
+    ``min_bytes`` are left alone.
+    """
+    response.vary.add('Accept-Encoding')
+    if (response.direct_passthrough or response.is_streamed or response.status_code < 200
+            or response.status_code in (204, 304) or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    encoding = accept_encodings.best_match(('gzip', 'deflate'))
+    if encoding is None:
+        return response
+    body = response.get_data()
+    if len(body) < min_bytes:
+        return response
+    # wbits 31 writes a gzip container, 15 a zlib (HTTP "deflate") one
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31 if encoding == 'gzip' else 15)
+    response.set_data(compressor.compress(body) + compressor.flush())
+    response.headers['Content-Encoding'] = encoding
+    return response
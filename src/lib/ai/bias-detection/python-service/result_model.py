@@ -0,0 +1,201 @@
+"""
+Pixelated Empathy Bias Detection Result Model
+
+Compact types for sessions and analysis results:
+- __slots__ classes instead of per-instance dicts, with numeric fields
+  coerced to plain floats (no NumPy scalars held in results)
+- Attributes cannot be rebound after construction, like a frozen
+  dataclass; the freeze is shallow
+- Top-level result sequences are stored as tuples; the free-form
+  payloads (metrics, analyzer status, demographics, and the session's
+  dicts and lists) are the caller's objects, held without copying, and
+  must be treated as read-only
+- Converted to the JSON dict shape only at the edges (HTTP responses,
+  persistence) via to_dict(); get() keeps dict-style access for
+  consumers that accept either form
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from typing import Dict, List, Any, Iterable, Optional, Union
+
+# Skip reasons that make a result partial: the caller chose to cut the analysis short.
+# Circuit-open and saturated analyzers are an ongoing service condition, so those
+# results are still stored (with their skip reasons) to keep history and alerting running.
+PARTIAL_SKIP_REASONS = ('deadline_exceeded',)
+
+class _Frozen:
+    """Base for slotted types whose attributes are set once in __init__ (nested values are not frozen)"""
+
+    __slots__ = ()
+
+    def _init(self, **values: Any) -> None:
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Dict-style read access to a field"""
+        value = getattr(self, key, None) if key in self.__slots__ else None
+        return default if value is None else value
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__[:3])
+        return f"{type(self).__name__}({fields}, ...)"
+
+class SessionData(_Frozen):
+    """Structured session data for bias analysis"""
+
+    __slots__ = ('session_id', 'participant_demographics', 'training_scenario', 'content', 'ai_responses',
+                 'expected_outcomes', 'transcripts', 'metadata', 'timestamp')
+
+    def __init__(self, session_id: str, participant_demographics: Dict[str, Any], training_scenario: Dict[str, Any],
+                 content: Dict[str, Any], ai_responses: List[Dict[str, Any]], expected_outcomes: List[Dict[str, Any]],
+                 transcripts: List[Dict[str, Any]], metadata: Dict[str, Any], timestamp: Optional[str] = None):
+        self._init(
+            session_id=session_id,
+            participant_demographics=participant_demographics,
+            training_scenario=training_scenario,
+            content=content,
+            ai_responses=ai_responses,
+            expected_outcomes=expected_outcomes,
+            transcripts=transcripts,
+            metadata=metadata,
+            timestamp=timestamp if timestamp is not None else datetime.now().isoformat()
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def content_hash(self) -> str:
+        """Stable hash of the session inputs (excluding the receive timestamp)"""
+        payload = self.to_dict()
+        payload.pop('timestamp', None)
+        canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+class LayerResult(_Frozen):
+    """Outcome of one analysis layer"""
+
+    __slots__ = ('layer', 'bias_score', 'detected_biases', 'metrics', 'recommendations', 'analyzers',
+                 'coverage', 'skipped', 'error')
+
+    def __init__(self, layer: str, bias_score: float = 0.0, detected_biases: Iterable[Any] = (),
+                 metrics: Optional[Dict[str, Any]] = None, recommendations: Iterable[str] = (),
+                 analyzers: Optional[Dict[str, Dict[str, Any]]] = None, coverage: float = 1.0,
+                 skipped: bool = False, error: Optional[str] = None):
+        self._init(
+            layer=layer,
+            bias_score=float(bias_score),
+            detected_biases=tuple(detected_biases),
+            metrics=metrics if metrics is not None else {},
+            recommendations=tuple(recommendations),
+            analyzers=analyzers if analyzers is not None else {},
+            coverage=float(coverage),
+            skipped=bool(skipped),
+            error=error
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {
+            'layer': self.layer,
+            'bias_score': self.bias_score,
+            'detected_biases': list(self.detected_biases),
+            'metrics': self.metrics,
+            'recommendations': list(self.recommendations),
+            'analyzers': self.analyzers,
+            'coverage': self.coverage
+        }
+        if self.skipped:
+            result['skipped'] = True
+        if self.error is not None:
+            result['error'] = self.error
+        return result
+
+class AnalysisResult(_Frozen):
+    """Complete analysis of a session; layer results are kept in analysis order
+
+    ``skipped_analyzers`` maps each skipped analyzer to its skip reason (a
+    plain list of names means the reason is unknown).
+    """
+
+    __slots__ = ('session_id', 'timestamp', 'overall_bias_score', 'layers', 'demographics', 'recommendations',
+                 'alert_level', 'confidence', 'processing_time_seconds', 'deterministic', 'partial',
+                 'skipped_analyzers', 'skip_reasons', 'deadline_ms', 'result_id', 'service_version', 'config_version')
+
+    def __init__(self, session_id: str, timestamp: str, overall_bias_score: Optional[float], layers: Iterable[LayerResult],
+                 demographics: Dict[str, Any], recommendations: Iterable[str], alert_level: str, confidence: float,
+                 processing_time_seconds: float, deterministic: bool,
+                 skipped_analyzers: Union[Dict[str, str], Iterable[str]],
+                 deadline_ms: Optional[float], result_id: str, service_version: str,
+                 config_version: Optional[str] = None):
+        if not isinstance(skipped_analyzers, dict):
+            skipped_analyzers = {name: 'unknown' for name in skipped_analyzers}
+        skip_reasons = dict(skipped_analyzers)
+        self._init(
+            session_id=session_id,
+            timestamp=timestamp,
+            overall_bias_score=float(overall_bias_score) if overall_bias_score is not None else None,
+            layers=tuple(layers),
+            demographics=demographics,
+            recommendations=tuple(recommendations),
+            alert_level=alert_level,
+            confidence=float(confidence),
+            processing_time_seconds=float(processing_time_seconds),
+            deterministic=bool(deterministic),
+            partial=any(reason in PARTIAL_SKIP_REASONS for reason in skip_reasons.values()),
+            skipped_analyzers=tuple(skip_reasons),
+            skip_reasons=skip_reasons,
+            deadline_ms=float(deadline_ms) if deadline_ms is not None else None,
+            result_id=result_id,
+            service_version=service_version,
+            config_version=config_version
+        )
+
+    @property
+    def storable(self) -> bool:
+        """Whether the result belongs in stored history, rollups, alerts and drift baselines"""
+        return not self.partial and self.overall_bias_score is not None
+
+    @property
+    def layer_results(self) -> Dict[str, LayerResult]:
+        return {layer.layer: layer for layer in self.layers}
+
+    def layer(self, name: str) -> Optional[LayerResult]:
+        for layer in self.layers:
+            if layer.layer == name:
+                return layer
+        return None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == 'layer_results':
+            return self.layer_results
+        return super().get(key, default)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready dict in the service's response shape"""
+        return {
+            'session_id': self.session_id,
+            'timestamp': self.timestamp,
+            'overall_bias_score': self.overall_bias_score,
+            'layer_results': {layer.layer: layer.to_dict() for layer in self.layers},
+            'demographics': self.demographics,
+            'recommendations': list(self.recommendations),
+            'alert_level': self.alert_level,
+            'confidence': self.confidence,
+            'processing_time_seconds': self.processing_time_seconds,
+            'deterministic': self.deterministic,
+            'partial': self.partial,
+            'skipped_analyzers': list(self.skipped_analyzers),
+            'skip_reasons': dict(self.skip_reasons),
+            'deadline_ms': self.deadline_ms,
+            'result_id': self.result_id,
+            'service_version': self.service_version,
+            'config_version': self.config_version
+        }
@@ -0,0 +1,406 @@
+"""
+Pixelated Empathy Bias Detection Results Store
+
+SQLite (WAL mode) persistence for analysis results:
+- Full results are encrypted; only non-identifying columns are indexed
+- Writes are queued and committed in batches by a background thread; a
+  full queue drops the result rather than blocking the request, and a
+  batch that fails is retried row by row
+- Reads are indexed queries used by the session, dashboard and export endpoints
+"""
+
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Iterator
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_LAYERS = ('preprocessing', 'model_level', 'interactive', 'evaluation')
+
+DEMOGRAPHIC_COLUMNS = {
+    # column -> accepted keys in participant demographics
+    'age_group': ('age', 'age_group', 'ageGroup'),
+    'gender': ('gender',),
+    'ethnicity': ('ethnicity',),
+    'primary_language': ('primaryLanguage', 'primary_language', 'language'),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analysis_results (
+    result_id TEXT PRIMARY KEY,
+    session_hash TEXT NOT NULL,
+    created_ts REAL NOT NULL,
+    created_at TEXT NOT NULL,
+    alert_level TEXT NOT NULL,
+    overall_score REAL NOT NULL,
+    confidence REAL,
+    preprocessing_score REAL,
+    model_level_score REAL,
+    interactive_score REAL,
+    evaluation_score REAL,
+    age_group TEXT,
+    gender TEXT,
+    ethnicity TEXT,
+    primary_language TEXT,
+    user_id TEXT,
+    encrypted_session_id TEXT NOT NULL,
+    encrypted_result TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_session ON analysis_results (session_hash, created_ts);
+CREATE INDEX IF NOT EXISTS idx_results_created ON analysis_results (created_ts);
+CREATE INDEX IF NOT EXISTS idx_results_alert ON analysis_results (alert_level, created_ts);
+CREATE INDEX IF NOT EXISTS idx_results_age_group ON analysis_results (age_group, created_ts);
+CREATE INDEX IF NOT EXISTS idx_results_gender ON analysis_results (gender, created_ts);
+CREATE INDEX IF NOT EXISTS idx_results_ethnicity ON analysis_results (ethnicity, created_ts);
+"""
+
+def json_default(value: Any) -> Any:
+    """JSON fallback for NumPy scalars/arrays and other non-native values"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+def parse_timestamp(value: Optional[str]) -> Optional[float]:
+    """ISO-8601 string (date or datetime) to epoch seconds"""
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+def demographic_value(demographics: Dict[str, Any], column: str) -> Optional[str]:
+    for key in DEMOGRAPHIC_COLUMNS[column]:
+        value = demographics.get(key)
+        if value not in (None, ''):
+            return str(value).lower()
+    return None
+
+class ResultsStore:
+    """Encrypted, indexed store of analysis results with asynchronous batched writes"""
+
+    def __init__(self, db_path: str, cipher, batch_size: int = 100,
+                 flush_interval_seconds: float = 0.5, max_pending: int = 10000):
+        self.db_path = db_path
+        self.cipher = cipher
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self._queue: 'queue.Queue' = queue.Queue(maxsize=max_pending)
+        self._local = threading.local()
+        self._write_hooks: List[Any] = []
+        self._commit_hooks: List[Any] = []
+        self._stopping = threading.Event()
+        # Updated by request threads (drops) and the writer thread
+        self.stats = {'written': 0, 'dropped': 0, 'failed': 0}
+        self._stats_lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        connection = self._connection()
+        connection.executescript(SCHEMA)
+
+        self._writer = threading.Thread(target=self._writer_loop, name='results-store-writer', daemon=True)
+        self._writer.start()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Per-thread connection; WAL lets readers proceed while the writer commits"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30.0)
+            connection.row_factory = sqlite3.Row
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    # Writes
+
+    def add_write_hook(self, hook) -> None:
+        """Call ``hook(connection, rows)`` inside each batch's write transaction"""
+        self._write_hooks.append(hook)
+
+    def add_commit_hook(self, hook) -> None:
+        """Call ``hook()`` on the writer thread after each write transaction commits"""
+        self._commit_hooks.append(hook)
+
+    def submit(self, result: Any, session_hash: str, user_id: Optional[str] = None) -> str:
+        """Queue a result (dict or AnalysisResult) for persistence and return its result ID
+
+        Serialization, encryption and the database write all happen on the
+        writer thread, so queued results stay in their compact form.
+        """
+        result_id = result.get('result_id') or uuid.uuid4().hex
+        try:
+            self._queue.put_nowait((result_id, result, session_hash, user_id, time.time()))
+        except queue.Full:
+            self._count('dropped')
+            logger.warning("Results queue full; dropped result %s", result_id)
+        return result_id
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued so far has been written"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def pending(self) -> List[Any]:
+        """Snapshot of queued, not yet written results"""
+        with self._queue.mutex:
+            return list(self._queue.queue)
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[name] += amount
+
+    def status(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        return {'queued': self._queue.qsize(), 'capacity': self._queue.maxsize, **stats}
+
+    def close(self) -> None:
+        self.flush(timeout=10.0)
+        self._stopping.set()
+        self._writer.join(timeout=5.0)
+
+    def _build_row(self, result_id: str, result: Any, session_hash: str,
+                   user_id: Optional[str], received_ts: float) -> Dict[str, Any]:
+        if hasattr(result, 'to_dict'):
+            result = result.to_dict()
+        demographics = result.get('demographics') or {}
+        layer_results = result.get('layer_results') or {}
+        timestamp = result.get('timestamp')
+        created_ts = parse_timestamp(timestamp) if timestamp else received_ts
+        row = {
+            'result_id': result_id,
+            'session_hash': session_hash,
+            'created_ts': created_ts,
+            'created_at': datetime.fromtimestamp(created_ts).isoformat(),
+            'alert_level': result.get('alert_level', 'low'),
+            'overall_score': float(result.get('overall_bias_score', 0.0)),
+            'confidence': float(result.get('confidence', 0.0)),
+            'user_id': user_id,
+            'encrypted_session_id': self.cipher.encrypt_data(str(result.get('session_id', ''))),
+            'encrypted_result': self.cipher.encrypt_data(json.dumps(result, default=json_default)),
+        }
+        for layer in ANALYSIS_LAYERS:
+            layer_result = layer_results.get(layer)
+            row[f'{layer}_score'] = float(layer_result.get('bias_score', 0.0)) if layer_result else None
+        for column in DEMOGRAPHIC_COLUMNS:
+            row[column] = demographic_value(demographics, column)
+        return row
+
+    def _writer_loop(self) -> None:
+        connection = self._connection()
+        while not self._stopping.is_set() or not self._queue.empty():
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval_seconds)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(connection, batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_batch(self, connection: sqlite3.Connection, batch: List[tuple]) -> None:
+        rows = []
+        for item in batch:
+            try:
+                rows.append(self._build_row(*item))
+            except Exception as e:
+                self._count('failed')
+                logger.error("Failed to serialize analysis result %s: %s", item[0], e)
+        if not rows:
+            return
+        try:
+            self._write_rows(connection, rows)
+            self._count('written', len(rows))
+            return
+        except Exception as e:
+            if len(rows) == 1:
+                self._count('failed')
+                logger.error("Failed to persist analysis result %s: %s", rows[0]['result_id'], e)
+                return
+            logger.warning("Batch of %s analysis results failed (%s); retrying individually", len(rows), e)
+        # One bad row (or hook) should not cost the rest of the batch
+        for row in rows:
+            try:
+                self._write_rows(connection, [row])
+                self._count('written')
+            except Exception as e:
+                self._count('failed')
+                logger.error("Failed to persist analysis result %s: %s", row['result_id'], e)
+
+    def _write_rows(self, connection: sqlite3.Connection, rows: List[Dict[str, Any]]) -> None:
+        columns = list(rows[0].keys())
+        placeholders = ', '.join(f':{column}' for column in columns)
+        with connection:
+            connection.executemany(
+                f"INSERT OR REPLACE INTO analysis_results ({', '.join(columns)}) VALUES ({placeholders})",
+                rows
+            )
+            for hook in self._write_hooks:
+                hook(connection, rows)
+        for hook in self._commit_hooks:
+            try:
+                hook()
+            except Exception as e:
+                logger.error("Results store commit hook failed: %s", e)
+
+    # Reads
+
+    def _decrypt_result(self, row: sqlite3.Row) -> Dict[str, Any]:
+        result = json.loads(self.cipher.decrypt_data(row['encrypted_result']))
+        result['result_id'] = row['result_id']
+        return result
+
+    def get_result(self, result_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(
+            'SELECT result_id, encrypted_result FROM analysis_results WHERE result_id = ?',
+            (result_id,)
+        ).fetchone()
+        return self._decrypt_result(row) if row else None
+
+    def latest_for_session(self, session_hash: str) -> Optional[Dict[str, Any]]:
+        """Most recent stored result for a hashed session ID"""
+        row = self._connection().execute(
+            'SELECT result_id, encrypted_result FROM analysis_results '
+            'WHERE session_hash = ? ORDER BY created_ts DESC LIMIT 1',
+            (session_hash,)
+        ).fetchone()
+        return self._decrypt_result(row) if row else None
+
+    def recent_alerts(self, levels: tuple = ('high', 'critical'), limit: int = 10,
+                      since_ts: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Newest results at the given alert levels, decrypted"""
+        placeholders = ', '.join('?' for _ in levels)
+        rows = self._connection().execute(
+            f'SELECT result_id, encrypted_result FROM analysis_results '
+            f'WHERE alert_level IN ({placeholders}) AND created_ts >= ? '
+            f'ORDER BY created_ts DESC LIMIT ?',
+            (*levels, since_ts or 0.0, limit)
+        ).fetchall()
+        return [self._decrypt_result(row) for row in rows]
+
+    def summary(self, since_ts: Optional[float] = None) -> Dict[str, Any]:
+        """Totals, average score and per-alert-level counts"""
+        connection = self._connection()
+        row = connection.execute(
+            'SELECT COUNT(*) AS total, AVG(overall_score) AS average, AVG(confidence) AS confidence '
+            'FROM analysis_results WHERE created_ts >= ?',
+            (since_ts or 0.0,)
+        ).fetchone()
+        alert_rows = connection.execute(
+            'SELECT alert_level, COUNT(*) AS count FROM analysis_results '
+            'WHERE created_ts >= ? GROUP BY alert_level',
+            (since_ts or 0.0,)
+        ).fetchall()
+        return {
+            'total_sessions': row['total'],
+            'average_bias_score': row['average'] or 0.0,
+            'average_confidence': row['confidence'] or 0.0,
+            'alert_counts': {r['alert_level']: r['count'] for r in alert_rows}
+        }
+
+    def layer_averages(self, since_ts: Optional[float] = None) -> Dict[str, float]:
+        row = self._connection().execute(
+            'SELECT ' + ', '.join(f'AVG({layer}_score) AS {layer}' for layer in ANALYSIS_LAYERS) +
+            ' FROM analysis_results WHERE created_ts >= ?',
+            (since_ts or 0.0,)
+        ).fetchone()
+        return {layer: row[layer] or 0.0 for layer in ANALYSIS_LAYERS}
+
+    def daily_trends(self, days: int = 7) -> List[Dict[str, Any]]:
+        """Per-day count, average score and high/critical alert count"""
+        start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days - 1)
+        rows = self._connection().execute(
+            "SELECT date(created_ts, 'unixepoch', 'localtime') AS day, COUNT(*) AS count, "
+            "AVG(overall_score) AS average, "
+            "SUM(CASE WHEN alert_level IN ('high', 'critical') THEN 1 ELSE 0 END) AS alerts "
+            "FROM analysis_results WHERE created_ts >= ? GROUP BY day ORDER BY day",
+            (start.timestamp(),)
+        ).fetchall()
+        by_day = {row['day']: row for row in rows}
+        trends = []
+        for offset in range(days):
+            day = (start + timedelta(days=offset)).date().isoformat()
+            row = by_day.get(day)
+            trends.append({
+                'date': day,
+                'count': row['count'] if row else 0,
+                'average_bias_score': row['average'] if row else 0.0,
+                'alerts': row['alerts'] if row else 0
+            })
+        return trends
+
+    def averages_by(self, column: str, since_ts: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Session count and average score grouped by a demographic column"""
+        if column not in DEMOGRAPHIC_COLUMNS:
+            raise ValueError(f"Unknown demographic column: {column}")
+        rows = self._connection().execute(
+            f'SELECT {column} AS value, COUNT(*) AS count, AVG(overall_score) AS average '
+            f'FROM analysis_results WHERE created_ts >= ? AND {column} IS NOT NULL GROUP BY {column}',
+            (since_ts or 0.0,)
+        ).fetchall()
+        return {row['value']: {'count': row['count'], 'average_bias_score': row['average']} for row in rows}
+
+    def scan_after(self, last_row_key: int, limit: int = 10000) -> List[sqlite3.Row]:
+        """Score and demographic columns of rows inserted after ``last_row_key``, in insertion order
+
+        Each row carries its ``row_key`` (SQLite rowid) for resuming the scan.
+        """
+        return self._connection().execute(
+            'SELECT rowid AS row_key, created_ts, overall_score, '
+            + ', '.join(f'{layer}_score' for layer in ANALYSIS_LAYERS) + ', '
+            + ', '.join(DEMOGRAPHIC_COLUMNS) +
+            ' FROM analysis_results WHERE rowid > ? ORDER BY rowid LIMIT ?',
+            (last_row_key, limit)
+        ).fetchall()
+
+    def iter_rows(self, start_ts: Optional[float] = None, end_ts: Optional[float] = None,
+                  include_session_id: bool = True, page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Index-ordered export rows in a time range without decrypting full results
+
+        Reads in keyset-paginated pages on (created_ts, rowid), so a long
+        export never holds a read transaction open or more than one page in memory.
+        """
+        columns = (
+            'rowid AS row_key, result_id, encrypted_session_id, created_ts, created_at, alert_level, '
+            'overall_score, confidence, '
+            + ', '.join(f'{layer}_score' for layer in ANALYSIS_LAYERS) + ', '
+            + ', '.join(DEMOGRAPHIC_COLUMNS)
+        )
+        end = end_ts if end_ts is not None else float('inf')
+        # rowid -1 sorts before every row, so the first page starts at start_ts inclusive
+        last_key = (start_ts if start_ts is not None else 0.0, -1)
+        while True:
+            rows = self._connection().execute(
+                f'SELECT {columns} FROM analysis_results '
+                f'WHERE (created_ts, rowid) > (?, ?) AND created_ts < ? '
+                f'ORDER BY created_ts, rowid LIMIT ?',
+                last_key + (end, page_size)
+            ).fetchall()
+            for row in rows:
+                record = dict(row)
+                del record['row_key']
+                encrypted_session_id = record.pop('encrypted_session_id')
+                if include_session_id:
+                    record['session_id'] = self.cipher.decrypt_data(encrypted_session_id)
+                yield record
+            if len(rows) < page_size:
+                return
+            last_key = (rows[-1]['created_ts'], rows[-1]['row_key'])
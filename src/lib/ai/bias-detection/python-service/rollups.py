@@ -0,0 +1,244 @@
+"""
+Pixelated Empathy Bias Detection Result Rollups
+
+Pre-aggregated hourly and daily buckets of analysis results, maintained
+incrementally inside the results store's write transaction:
+- Count, score sum and sum of squares, confidence sum, alert-level histogram
+- Per-layer score sums
+- One bucket row per (granularity, demographic slice, period)
+
+Dashboard queries read bucket rows instead of scanning analysis_results, so
+their cost depends on the time range, not on how many sessions are stored.
+"""
+
+import math
+import sqlite3
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+
+from results_store import ANALYSIS_LAYERS, DEMOGRAPHIC_COLUMNS, ResultsStore
+
+# Levels produced by BiasDetectionService._determine_alert_level
+ALERT_LEVELS = ('low', 'warning', 'high', 'critical')
+
+GRANULARITIES = ('hour', 'day')
+
+# Ranges up to this long are answered from hourly buckets, longer ones from daily
+HOURLY_RANGE_SECONDS = 72 * 3600
+
+# Dimension used for the unsliced totals
+ALL_DIMENSION = 'all'
+
+COUNTER_COLUMNS = (
+    ['count', 'score_sum', 'score_sumsq', 'confidence_sum']
+    + [f'alerts_{level}' for level in ALERT_LEVELS]
+    + [f'{layer}_sum' for layer in ANALYSIS_LAYERS]
+    + [f'{layer}_count' for layer in ANALYSIS_LAYERS]
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS result_rollups (
+    granularity TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    bucket_ts REAL NOT NULL,
+    slice TEXT NOT NULL,
+""" + ''.join(
+    f"    {column} {'INTEGER' if column == 'count' or column.startswith('alerts_') or column.endswith('_count') else 'REAL'} NOT NULL DEFAULT 0,\n"
+    for column in COUNTER_COLUMNS
+) + """    PRIMARY KEY (granularity, dimension, bucket_ts, slice)
+) WITHOUT ROWID;
+"""
+
+def bucket_start(ts: float, granularity: str) -> float:
+    """Start of the hour (UTC-aligned) or local calendar day containing ts"""
+    if granularity == 'hour':
+        return math.floor(ts / 3600.0) * 3600.0
+    return datetime.fromtimestamp(ts).replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+
+def granularity_for(since_ts: Optional[float], now: Optional[float] = None) -> str:
+    if since_ts is None:
+        return 'day'
+    return 'hour' if (now or time.time()) - since_ts <= HOURLY_RANGE_SECONDS else 'day'
+
+class ResultRollups:
+    """Hourly/daily rollups of stored results, updated as a results store write hook
+
+    Query methods mirror the aggregate reads on ResultsStore. Time ranges are
+    bucket-aligned: ``since_ts`` is rounded down to the start of its bucket.
+    """
+
+    def __init__(self, store: ResultsStore):
+        self.store = store
+        connection = store._connection()
+        columns = {row['name'] for row in connection.execute('PRAGMA table_info(result_rollups)')}
+        if columns and not set(COUNTER_COLUMNS) <= columns:
+            # Rollups are derived data: rebuild them from analysis_results when the counters change
+            connection.execute('DROP TABLE result_rollups')
+            connection.commit()
+        connection.executescript(SCHEMA)
+        self._attach(connection)
+
+    def _attach(self, connection: sqlite3.Connection) -> None:
+        """Backfill from existing results, then register the write hook
+
+        Both happen under the database write lock, so every batch is counted
+        exactly once: either by the backfill or by the hook.
+        """
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            has_rollups = connection.execute('SELECT 1 FROM result_rollups LIMIT 1').fetchone()
+            if not has_rollups:
+                cursor = connection.execute(
+                    'SELECT created_ts, alert_level, overall_score, confidence, '
+                    + ', '.join(f'{layer}_score' for layer in ANALYSIS_LAYERS) + ', '
+                    + ', '.join(DEMOGRAPHIC_COLUMNS) +
+                    ' FROM analysis_results'
+                )
+                while True:
+                    rows = cursor.fetchmany(1000)
+                    if not rows:
+                        break
+                    self.apply(connection, [dict(row) for row in rows])
+            self.store.add_write_hook(self.apply)
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+
+    # Writes
+
+    def apply(self, connection: sqlite3.Connection, rows: Iterable[Dict[str, Any]]) -> None:
+        """Fold result rows into their buckets with one upsert per touched bucket"""
+        deltas: Dict[Tuple[str, str, float, str], Dict[str, float]] = defaultdict(lambda: dict.fromkeys(COUNTER_COLUMNS, 0))
+        for row in rows:
+            slices = [(ALL_DIMENSION, '')]
+            slices.extend((column, row[column]) for column in DEMOGRAPHIC_COLUMNS if row.get(column) is not None)
+            buckets = [(granularity, bucket_start(row['created_ts'], granularity)) for granularity in GRANULARITIES]
+            for granularity, bucket_ts in buckets:
+                for dimension, value in slices:
+                    self._accumulate(deltas[(granularity, dimension, bucket_ts, value)], row)
+
+        if not deltas:
+            return
+        columns = ', '.join(COUNTER_COLUMNS)
+        placeholders = ', '.join('?' for _ in COUNTER_COLUMNS)
+        updates = ', '.join(f'{column} = {column} + excluded.{column}' for column in COUNTER_COLUMNS)
+        connection.executemany(
+            f'INSERT INTO result_rollups (granularity, dimension, bucket_ts, slice, {columns}) '
+            f'VALUES (?, ?, ?, ?, {placeholders}) '
+            f'ON CONFLICT (granularity, dimension, bucket_ts, slice) DO UPDATE SET {updates}',
+            [key + tuple(delta[column] for column in COUNTER_COLUMNS) for key, delta in deltas.items()]
+        )
+
+    @staticmethod
+    def _accumulate(delta: Dict[str, float], row: Dict[str, Any]) -> None:
+        score = float(row['overall_score'])
+        delta['count'] += 1
+        delta['score_sum'] += score
+        delta['score_sumsq'] += score * score
+        delta['confidence_sum'] += float(row.get('confidence') or 0.0)
+        if row['alert_level'] in ALERT_LEVELS:
+            delta[f"alerts_{row['alert_level']}"] += 1
+        for layer in ANALYSIS_LAYERS:
+            layer_score = row.get(f'{layer}_score')
+            if layer_score is not None:
+                delta[f'{layer}_sum'] += layer_score
+                delta[f'{layer}_count'] += 1
+
+    # Reads
+
+    def _totals(self, dimension: str, since_ts: Optional[float],
+                group_by_slice: bool = False) -> List[sqlite3.Row]:
+        granularity = granularity_for(since_ts)
+        start = bucket_start(since_ts, granularity) if since_ts is not None else 0.0
+        sums = ', '.join(f'SUM({column}) AS {column}' for column in COUNTER_COLUMNS)
+        return self.store._connection().execute(
+            f'SELECT slice, {sums} FROM result_rollups '
+            f'WHERE granularity = ? AND dimension = ? AND bucket_ts >= ?'
+            + (' GROUP BY slice' if group_by_slice else ''),
+            (granularity, dimension, start)
+        ).fetchall()
+
+    @staticmethod
+    def _stats(row: Optional[sqlite3.Row]) -> Dict[str, Any]:
+        count = row['count'] if row is not None and row['count'] else 0
+        if not count:
+            return {'count': 0, 'average_bias_score': 0.0, 'bias_score_stddev': 0.0, 'average_confidence': 0.0}
+        mean = row['score_sum'] / count
+        variance = max(row['score_sumsq'] / count - mean * mean, 0.0)
+        return {
+            'count': count,
+            'average_bias_score': mean,
+            'bias_score_stddev': math.sqrt(variance),
+            'average_confidence': row['confidence_sum'] / count
+        }
+
+    def summary(self, since_ts: Optional[float] = None) -> Dict[str, Any]:
+        """Totals, average score and per-alert-level counts"""
+        rows = self._totals(ALL_DIMENSION, since_ts)
+        row = rows[0] if rows else None
+        stats = self._stats(row)
+        return {
+            'total_sessions': stats['count'],
+            'average_bias_score': stats['average_bias_score'],
+            'bias_score_stddev': stats['bias_score_stddev'],
+            'average_confidence': stats['average_confidence'],
+            'alert_counts': {
+                level: row[f'alerts_{level}']
+                for level in ALERT_LEVELS
+                if row is not None and row[f'alerts_{level}']
+            }
+        }
+
+    def layer_averages(self, since_ts: Optional[float] = None) -> Dict[str, float]:
+        rows = self._totals(ALL_DIMENSION, since_ts)
+        row = rows[0] if rows else None
+        return {
+            layer: row[f'{layer}_sum'] / row[f'{layer}_count'] if row is not None and row[f'{layer}_count'] else 0.0
+            for layer in ANALYSIS_LAYERS
+        }
+
+    def averages_by(self, column: str, since_ts: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Session count and score statistics grouped by a demographic column"""
+        if column not in DEMOGRAPHIC_COLUMNS:
+            raise ValueError(f"Unknown demographic column: {column}")
+        return {
+            row['slice']: self._stats(row)
+            for row in self._totals(column, since_ts, group_by_slice=True)
+        }
+
+    def trends(self, granularity: str, periods: int, dimension: str = ALL_DIMENSION,
+               value: str = '') -> List[Dict[str, Any]]:
+        """Per-bucket count, average score and high/critical alert count for the last N periods"""
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity: {granularity}")
+        now = datetime.now()
+        if granularity == 'hour':
+            current = datetime.fromtimestamp(bucket_start(now.timestamp(), 'hour'))
+            starts = [current - timedelta(hours=offset) for offset in range(periods - 1, -1, -1)]
+        else:
+            current = now.replace(hour=0, minute=0, second=0, microsecond=0)
+            starts = [current - timedelta(days=offset) for offset in range(periods - 1, -1, -1)]
+
+        rows = self.store._connection().execute(
+            'SELECT bucket_ts, count, score_sum, alerts_high, alerts_critical FROM result_rollups '
+            'WHERE granularity = ? AND dimension = ? AND slice = ? AND bucket_ts >= ?',
+            (granularity, dimension, value, starts[0].timestamp())
+        ).fetchall()
+        by_bucket = {row['bucket_ts']: row for row in rows}
+
+        trends = []
+        for start in starts:
+            row = by_bucket.get(start.timestamp())
+            trends.append({
+                'date': start.date().isoformat() if granularity == 'day' else start.isoformat(timespec='minutes'),
+                'count': row['count'] if row else 0,
+                'average_bias_score': row['score_sum'] / row['count'] if row and row['count'] else 0.0,
+                'alerts': row['alerts_high'] + row['alerts_critical'] if row else 0
+            })
+        return trends
+
+    def daily_trends(self, days: int = 7) -> List[Dict[str, Any]]:
+        return self.trends('day', days)
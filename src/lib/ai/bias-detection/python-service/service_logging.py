@@ -0,0 +1,187 @@
+"""
+Pixelated Empathy Bias Detection Logging
+
+Non-blocking logging for the service:
+- Request threads only enqueue records; a QueueListener thread formats
+  them and writes to the log file and stdout
+- %-style arguments are only rendered for records that pass the level and
+  sampling checks; the message is rendered on the logging thread before
+  enqueueing, so later changes to the arguments cannot alter it, and the
+  listener thread does the rest of the formatting and the I/O
+- Optional JSON lines output carrying any ``extra=`` fields
+- Optional sampling of INFO and lower records; warnings and errors are
+  always kept
+- A bounded queue: when the listener falls behind (e.g. a stalled log
+  volume), records are dropped and counted instead of blocking requests
+
+Environment:
+- BIAS_LOG_FILE (default bias_detection.log; empty disables the file)
+- BIAS_LOG_LEVEL (default INFO)
+- BIAS_LOG_FORMAT=json for JSON lines
+- BIAS_LOG_INFO_SAMPLE_RATE between 0 and 1 (default 1)
+- BIAS_LOG_QUEUE_SIZE (default 10000)
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Optional
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else came from ``extra=``
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, including ``extra=`` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class InfoSamplingFilter(logging.Filter):
+    """Keep a fraction of records below WARNING; always keep the rest"""
+
+    def __init__(self, sample_rate: float):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or random.random() < self.sample_rate
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks and leaves formatting and I/O to the listener"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Like the stdlib QueueHandler, render the message now: the arguments may be
+        # mutable objects that change before the listener gets to them. Tracebacks
+        # are rendered while the frames are still intact.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+class _Listener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # Blocking put: the listener is still draining, so a full queue frees up
+        self.queue.put(self._sentinel)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[DroppingQueueHandler] = None
+_settings: Dict[str, Any] = {}
+
+def configure_logging(log_file: Optional[str] = 'bias_detection.log', level: str = 'INFO',
+                      json_format: bool = False, info_sample_rate: float = 1.0,
+                      queue_size: int = 10000) -> logging.handlers.QueueListener:
+    """Route root logging through a background QueueListener, replacing existing handlers"""
+    global _listener, _queue_handler, _settings
+    shutdown_logging()
+    _settings = {'log_file': log_file, 'level': level, 'json_format': json_format,
+                 'info_sample_rate': info_sample_rate, 'queue_size': queue_size}
+
+    formatter = JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT)
+    handlers = [logging.StreamHandler(sys.stdout)]
+    if log_file:
+        handlers.insert(0, logging.FileHandler(log_file))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    _queue_handler = DroppingQueueHandler(log_queue)
+    if info_sample_rate < 1.0:
+        _queue_handler.addFilter(InfoSamplingFilter(info_sample_rate))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+
+    _listener = _Listener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+def configure_logging_from_environment() -> logging.handlers.QueueListener:
+    return configure_logging(
+        log_file=os.environ.get('BIAS_LOG_FILE', 'bias_detection.log'),
+        level=os.environ.get('BIAS_LOG_LEVEL', 'INFO').upper(),
+        json_format=os.environ.get('BIAS_LOG_FORMAT', 'text').lower() == 'json',
+        info_sample_rate=float(os.environ.get('BIAS_LOG_INFO_SAMPLE_RATE', '1.0')),
+        queue_size=int(os.environ.get('BIAS_LOG_QUEUE_SIZE', '10000'))
+    )
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+def logging_stats() -> Dict[str, Any]:
+    if _queue_handler is None:
+        return {'queued': 0, 'dropped': 0}
+    return {
+        'queued': _queue_handler.queue.qsize(),
+        'capacity': _queue_handler.queue.maxsize,
+        'dropped': _queue_handler.dropped
+    }
+
+def queued_records() -> List[logging.LogRecord]:
+    """Snapshot of records waiting for the listener"""
+    if _queue_handler is None:
+        return []
+    with _queue_handler.queue.mutex:
+        return list(_queue_handler.queue.queue)
+
+def _restart_after_fork() -> None:
+    # The listener thread does not survive a fork (e.g. gunicorn --preload);
+    # abandon it without joining and start a fresh one in the child
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener = None
+    _queue_handler = None
+    configure_logging(**_settings)
+
+atexit.register(shutdown_logging)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_after_fork)
@@ -0,0 +1,296 @@
+"""
+Pixelated Empathy Bias Detection Service Metrics
+
+In-process instrumentation for the bias detection services:
+- HDR-style latency histograms (log-linear buckets, bounded relative error)
+- Request/error counters and in-flight gauges
+- Cache hit ratios and model inference batch sizes
+
+Metrics are exposed as JSON and in the Prometheus text exposition format.
+"""
+
+import math
+import threading
+import time
+from typing import Dict, List, Any, Optional, Tuple
+
+from flask import Flask, Response, g, request, jsonify
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+DEFAULT_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+def _label_key(labels: Optional[Dict[str, Any]]) -> LabelSet:
+    return tuple(sorted((k, str(v)) for k, v in (labels or {}).items()))
+
+def _format_labels(labels: LabelSet, extra: Optional[Dict[str, str]] = None) -> str:
+    items = list(labels) + sorted((extra or {}).items())
+    if not items:
+        return ''
+    escaped = [
+        '{}="{}"'.format(k, v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for k, v in items
+    ]
+    return '{' + ','.join(escaped) + '}'
+
+class HdrHistogram:
+    """Log-linear histogram with a fixed number of sub-buckets per power of two
+
+    Values are recorded as integers in the histogram's unit (e.g. microseconds);
+    with 64 sub-buckets the relative error of any reported quantile is ~3%.
+    Memory is bounded by the value range, not by the number of samples.
+    """
+
+    def __init__(self, sub_bucket_bits: int = 6):
+        self.sub_bucket_count = 1 << sub_bucket_bits
+        self.sub_bucket_bits = sub_bucket_bits
+        self.counts: Dict[int, int] = {}
+        self.total_count = 0
+        self.total_sum = 0.0
+        self.min_value: Optional[int] = None
+        self.max_value: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _bucket_index(self, value: int) -> int:
+        if value < self.sub_bucket_count:
+            return value
+        exponent = value.bit_length() - self.sub_bucket_bits
+        sub_bucket = value >> exponent
+        return (exponent << self.sub_bucket_bits) + sub_bucket
+
+    def _bucket_upper_bound(self, index: int) -> int:
+        if index < self.sub_bucket_count:
+            return index
+        exponent = index >> self.sub_bucket_bits
+        sub_bucket = index & (self.sub_bucket_count - 1)
+        return ((sub_bucket + 1) << exponent) - 1
+
+    def record(self, value: float) -> None:
+        value_int = max(int(value), 0)
+        index = self._bucket_index(value_int)
+        with self._lock:
+            self.counts[index] = self.counts.get(index, 0) + 1
+            self.total_count += 1
+            self.total_sum += value
+            self.min_value = value_int if self.min_value is None else min(self.min_value, value_int)
+            self.max_value = value_int if self.max_value is None else max(self.max_value, value_int)
+
+    def quantiles(self, quantiles: Tuple[float, ...] = DEFAULT_QUANTILES) -> Dict[float, float]:
+        """Upper bound of the bucket holding each requested quantile"""
+        with self._lock:
+            if self.total_count == 0:
+                return {q: 0.0 for q in quantiles}
+            ordered = sorted(self.counts.items())
+            total = self.total_count
+            max_value = self.max_value
+
+        results = {}
+        for q in quantiles:
+            target = max(1, math.ceil(q * total))
+            cumulative = 0
+            for index, count in ordered:
+                cumulative += count
+                if cumulative >= target:
+                    results[q] = float(min(self._bucket_upper_bound(index), max_value))
+                    break
+        return results
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            count, total_sum = self.total_count, self.total_sum
+            min_value, max_value = self.min_value, self.max_value
+        return {
+            'count': count,
+            'sum': total_sum,
+            'min': min_value or 0,
+            'max': max_value or 0,
+            'mean': total_sum / count if count else 0.0,
+            'quantiles': self.quantiles()
+        }
+
+class _MetricFamily:
+    """Labelled collection of one metric type"""
+
+    def __init__(self, name: str, help_text: str, metric_type: str):
+        self.name = name
+        self.help_text = help_text
+        self.metric_type = metric_type
+        self.series: Dict[LabelSet, Any] = {}
+        self._lock = threading.Lock()
+
+class MetricsRegistry:
+    """Thread-safe registry of counters, gauges and latency histograms"""
+
+    def __init__(self, namespace: str = 'bias_detection'):
+        self.namespace = namespace
+        self.started_at = time.time()
+        self._families: Dict[str, _MetricFamily] = {}
+        self._lock = threading.Lock()
+
+    def _family(self, name: str, help_text: str, metric_type: str) -> _MetricFamily:
+        full_name = f"{self.namespace}_{name}"
+        with self._lock:
+            family = self._families.get(full_name)
+            if family is None:
+                family = _MetricFamily(full_name, help_text, metric_type)
+                self._families[full_name] = family
+            return family
+
+    def inc(self, name: str, amount: float = 1.0, labels: Optional[Dict[str, Any]] = None,
+            help_text: str = '') -> None:
+        """Increment a counter"""
+        family = self._family(name, help_text, 'counter')
+        key = _label_key(labels)
+        with family._lock:
+            family.series[key] = family.series.get(key, 0.0) + amount
+
+    def set_gauge(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None,
+                  help_text: str = '') -> None:
+        family = self._family(name, help_text, 'gauge')
+        with family._lock:
+            family.series[_label_key(labels)] = float(value)
+
+    def add_gauge(self, name: str, amount: float, labels: Optional[Dict[str, Any]] = None,
+                  help_text: str = '') -> None:
+        family = self._family(name, help_text, 'gauge')
+        key = _label_key(labels)
+        with family._lock:
+            family.series[key] = family.series.get(key, 0.0) + amount
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None,
+                help_text: str = '', unit_scale: float = 1e6) -> None:
+        """Record a sample in a histogram
+
+        Samples are stored as integers of value * unit_scale (microseconds for
+        values given in seconds) and reported back in the original unit.
+        """
+        family = self._family(name, help_text, 'summary')
+        key = _label_key(labels)
+        with family._lock:
+            histogram = family.series.get(key)
+            if histogram is None:
+                histogram = (HdrHistogram(), unit_scale)
+                family.series[key] = histogram
+        histogram[0].record(value * unit_scale)
+
+    def observe_latency(self, name: str, seconds: float, labels: Optional[Dict[str, Any]] = None,
+                        help_text: str = '') -> None:
+        self.observe(name, seconds, labels, help_text, unit_scale=1e6)
+
+    def record_cache(self, cache: str, hit: bool) -> None:
+        """Count a cache lookup for hit-ratio reporting"""
+        self.inc('cache_requests_total', labels={'cache': cache, 'result': 'hit' if hit else 'miss'},
+                 help_text='Cache lookups by cache and result')
+
+    def observe_batch_size(self, model: str, size: int) -> None:
+        """Record the number of inputs sent to a model in one inference call"""
+        self.observe('model_batch_size', size, labels={'model': model},
+                     help_text='Inputs per model inference call', unit_scale=1.0)
+
+    def _families_snapshot(self) -> List[_MetricFamily]:
+        with self._lock:
+            return sorted(self._families.values(), key=lambda f: f.name)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-friendly view of every metric"""
+        output: Dict[str, Any] = {
+            'uptime_seconds': time.time() - self.started_at,
+            'metrics': {}
+        }
+        for family in self._families_snapshot():
+            with family._lock:
+                series = list(family.series.items())
+            entries = []
+            for labels, value in series:
+                entry: Dict[str, Any] = {'labels': dict(labels)}
+                if family.metric_type == 'summary':
+                    histogram, unit_scale = value
+                    snapshot = histogram.snapshot()
+                    entry.update({
+                        'count': snapshot['count'],
+                        'sum': snapshot['sum'] / unit_scale,
+                        'mean': snapshot['mean'] / unit_scale,
+                        'min': snapshot['min'] / unit_scale,
+                        'max': snapshot['max'] / unit_scale,
+                        'quantiles': {
+                            str(q): v / unit_scale for q, v in snapshot['quantiles'].items()
+                        }
+                    })
+                else:
+                    entry['value'] = value
+                entries.append(entry)
+            output['metrics'][family.name] = {'type': family.metric_type, 'series': entries}
+        output['cache_hit_ratios'] = self.cache_hit_ratios()
+        return output
+
+    def cache_hit_ratios(self) -> Dict[str, float]:
+        family = self._families.get(f"{self.namespace}_cache_requests_total")
+        if family is None:
+            return {}
+        totals: Dict[str, Dict[str, float]] = {}
+        with family._lock:
+            for labels, value in family.series.items():
+                label_dict = dict(labels)
+                cache_totals = totals.setdefault(label_dict.get('cache', ''), {'hit': 0.0, 'miss': 0.0})
+                cache_totals[label_dict.get('result', 'miss')] += value
+        return {
+            cache: counts['hit'] / (counts['hit'] + counts['miss'])
+            for cache, counts in totals.items()
+            if counts['hit'] + counts['miss'] > 0
+        }
+
+    def to_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format"""
+        lines = []
+        for family in self._families_snapshot():
+            if family.help_text:
+                lines.append(f"# HELP {family.name} {family.help_text}")
+            lines.append(f"# TYPE {family.name} {family.metric_type}")
+            with family._lock:
+                series = list(family.series.items())
+            for labels, value in series:
+                if family.metric_type == 'summary':
+                    histogram, unit_scale = value
+                    snapshot = histogram.snapshot()
+                    for q, v in snapshot['quantiles'].items():
+                        lines.append(f"{family.name}{_format_labels(labels, {'quantile': str(q)})} {v / unit_scale}")
+                    lines.append(f"{family.name}_sum{_format_labels(labels)} {snapshot['sum'] / unit_scale}")
+                    lines.append(f"{family.name}_count{_format_labels(labels)} {snapshot['count']}")
+                else:
+                    lines.append(f"{family.name}{_format_labels(labels)} {value}")
+        lines.append(f"# TYPE {self.namespace}_uptime_seconds gauge")
+        lines.append(f"{self.namespace}_uptime_seconds {time.time() - self.started_at}")
+        return '\n'.join(lines) + '\n'
+
+def instrument_flask_app(app: Flask, metrics: MetricsRegistry) -> None:
+    """Record per-route latency, request/error counts and in-flight requests"""
+
+    @app.before_request
+    def _start_request_timer():
+        g._metrics_start = time.perf_counter()
+        metrics.add_gauge('http_requests_in_flight', 1, help_text='Requests currently being served')
+
+    @app.after_request
+    def _record_request_metrics(response):
+        start = g.pop('_metrics_start', None)
+        if start is not None:
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            labels = {'route': route, 'method': request.method}
+            metrics.observe_latency('http_request_duration_seconds', time.perf_counter() - start,
+                                    labels, help_text='HTTP request latency by route')
+            metrics.inc('http_requests_total', labels={**labels, 'status': response.status_code},
+                        help_text='HTTP requests by route and status')
+            if response.status_code >= 500:
+                metrics.inc('http_request_errors_total', labels=labels,
+                            help_text='HTTP requests that returned a server error')
+        return response
+
+    @app.teardown_request
+    def _finish_request(exc):
+        metrics.add_gauge('http_requests_in_flight', -1, help_text='Requests currently being served')
+
+def metrics_json_response(metrics: MetricsRegistry):
+    return jsonify(metrics.to_dict())
+
+def metrics_prometheus_response(metrics: MetricsRegistry) -> Response:
+    return Response(metrics.to_prometheus(), mimetype='text/plain; version=0.0.4')
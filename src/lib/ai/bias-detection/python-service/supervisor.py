@@ -0,0 +1,621 @@
+#!/usr/bin/env python3
+"""
+Pixelated Empathy Bias Detection Supervisor
+
+Multi-worker entry point with session-affinity routing:
+- Models are preloaded once, then N workers are forked and inherit them
+  copy-on-write; each worker imports the service after the fork so its
+  own threads (results writer, alert dispatcher, ...) start cleanly
+- A front proxy routes every request by consistent hash of its session
+  ID (X-Session-Id header, /session/<id> path, or the JSON body's
+  session_id), so per-session state and caches stay on one worker
+- When a worker dies only its share of sessions moves to the next worker
+  on the ring; it is restarted with backoff and takes its sessions back
+  once healthy
+- Requests without a session (admin, metrics, profiling, memory) are
+  pinned to the lowest live worker, since they read or change state of
+  the process that serves them; X-Bias-Worker picks a worker explicitly
+- /metrics/prometheus is scraped from every worker and merged, each
+  sample labelled with its worker; the JSON /metrics reports only the
+  worker that serves it, so read it per worker with X-Bias-Worker
+
+Usage: python supervisor.py --workers 4 --port 5000
+"""
+
+import argparse
+import bisect
+import hashlib
+import http.client
+import io
+import json
+import logging
+import os
+import select
+import signal
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any, Optional, Tuple
+
+from model_registry import preload_models
+from request_limits import IJSON_AVAILABLE
+
+if IJSON_AVAILABLE:
+    import ijson
+
+logger = logging.getLogger('bias_supervisor')
+
+HOP_BY_HOP_HEADERS = {
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+    'te', 'trailer', 'transfer-encoding', 'upgrade'
+}
+
+# Session-less routes whose state lives in the serving process
+PINNED_PREFIXES = ('/admin/', '/metrics', '/drift/')
+
+# Methods that may be resent after the worker dropped the connection mid-response
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big')
+
+class HashRing:
+    """Consistent hash ring with virtual nodes; lookups are lock-free"""
+
+    def __init__(self, vnodes: int = 64):
+        self.vnodes = vnodes
+        self._nodes: Dict[int, None] = {}
+        self._ring: Tuple[Tuple[int, ...], Tuple[int, ...]] = ((), ())
+        self._lock = threading.Lock()
+
+    def _rebuild(self) -> None:
+        points = sorted(
+            (_hash(f"worker-{node}#{replica}"), node)
+            for node in self._nodes
+            for replica in range(self.vnodes)
+        )
+        self._ring = (tuple(point for point, _ in points), tuple(node for _, node in points))
+
+    def add(self, node: int) -> None:
+        with self._lock:
+            self._nodes[node] = None
+            self._rebuild()
+
+    def remove(self, node: int) -> None:
+        with self._lock:
+            self._nodes.pop(node, None)
+            self._rebuild()
+
+    def nodes(self) -> List[int]:
+        return sorted(self._nodes)
+
+    def get(self, key: str, skip: Tuple[int, ...] = ()) -> Optional[int]:
+        """Node owning ``key``, walking clockwise past any nodes in ``skip``"""
+        points, owners = self._ring
+        if not points:
+            return None
+        start = bisect.bisect(points, _hash(key))
+        for offset in range(len(points)):
+            node = owners[(start + offset) % len(points)]
+            if node not in skip:
+                return node
+        return None
+
+def routing_key(path: str, headers: Any, body: Optional[bytes]) -> Optional[str]:
+    """Session ID a request belongs to, if it can be determined"""
+    session_id = headers.get('X-Session-Id')
+    if session_id:
+        return session_id
+    if path.startswith('/session/'):
+        return path[len('/session/'):].split('?', 1)[0].split('/', 1)[0] or None
+    if body and 'json' in (headers.get('Content-Type') or ''):
+        try:
+            if IJSON_AVAILABLE:
+                # Stops at the top-level session_id without building the document
+                value = next(ijson.items(io.BytesIO(body), 'session_id'), None)
+            else:
+                document = json.loads(body)
+                value = document.get('session_id') if isinstance(document, dict) else None
+        except Exception:
+            return None
+        return str(value) if value is not None else None
+    return None
+
+class BodyTooLarge(Exception):
+    """Request body over the proxy's size limit"""
+
+def _label_sample(line: str, slot: int) -> str:
+    # name{labels} value, or name value
+    brace, space = line.find('{'), line.find(' ')
+    if brace != -1 and (space == -1 or brace < space):
+        return f'{line[:brace + 1]}worker="{slot}",{line[brace + 1:]}'
+    return f'{line[:space]}{{worker="{slot}"}}{line[space:]}'
+
+def merge_prometheus(expositions: Dict[int, str]) -> str:
+    """One exposition from several workers' outputs, keeping each metric family's lines together"""
+    families: Dict[str, Dict[str, Any]] = {}
+    for slot, text in expositions.items():
+        family = families.setdefault('', {'HELP': None, 'TYPE': None, 'samples': []})
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            if line.startswith('#'):
+                parts = line.split(None, 3)
+                if len(parts) >= 3 and parts[1] in ('HELP', 'TYPE'):
+                    family = families.setdefault(parts[2], {'HELP': None, 'TYPE': None, 'samples': []})
+                    family[parts[1]] = family[parts[1]] or line
+                continue
+            family['samples'].append(_label_sample(line, slot))
+    lines = []
+    for family in families.values():
+        lines.extend(header for header in (family['HELP'], family['TYPE']) if header)
+        lines.extend(family['samples'])
+    return '\n'.join(lines) + '\n'
+
+def is_pinned(path: str) -> bool:
+    return path.split('?', 1)[0].startswith(PINNED_PREFIXES)
+
+def _is_stale(connection: http.client.HTTPConnection) -> bool:
+    # An idle keep-alive socket is only readable once the worker has closed it
+    if connection.sock is None:
+        return False
+    try:
+        readable, _, _ = select.select([connection.sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+class WorkerProcess:
+    """Bookkeeping for one worker slot"""
+
+    def __init__(self, slot: int, port: int):
+        self.slot = slot
+        self.port = port
+        self.pid: Optional[int] = None
+        self.started_at: Optional[float] = None
+        self.ready = False
+        self.restarts = 0
+        self.recent_exits: List[float] = []
+        self.respawn_at: Optional[float] = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'slot': self.slot,
+            'pid': self.pid,
+            'port': self.port,
+            'ready': self.ready,
+            'restarts': self.restarts,
+            'uptime_seconds': time.time() - self.started_at if self.started_at and self.pid else None
+        }
+
+def _run_worker(slot: int, host: str, port: int, rate_limit_db: Optional[str]) -> None:
+    """Worker body, run in the forked child; never returns"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    os.environ['BIAS_WORKER_ID'] = str(slot)
+    exit_code = 0
+    try:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        from werkzeug.serving import make_server
+        import bias_detection_service as service
+        from rate_limiting import MemoryBucketStore, SQLiteBucketStore
+
+        # Client addresses arrive in X-Forwarded-For from the front proxy
+        service.app.wsgi_app = ProxyFix(service.app.wsgi_app, x_for=1, x_proto=1)
+        # Per-process buckets would multiply the limit by the worker count
+        if rate_limit_db and service.rate_limiter is not None and isinstance(service.rate_limiter.store, MemoryBucketStore):
+            service.rate_limiter.store = SQLiteBucketStore(rate_limit_db)
+
+        server = make_server(host, port, service.app, threaded=True)
+        signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+        logger.info("Worker %d (pid %d) serving on %s:%d", slot, os.getpid(), host, port)
+        server.serve_forever()
+        if service.bias_service.results_store is not None:
+            service.bias_service.results_store.close()
+        if service.bias_service.cohorts is not None:
+            # os._exit below skips atexit handlers
+            service.bias_service.cohorts.columns.close()
+    except Exception as e:
+        logger.error("Worker %s failed: %s", slot, e)
+        exit_code = 1
+    finally:
+        logging.shutdown()
+        os._exit(exit_code)
+
+class Supervisor:
+    """Forks workers, keeps them alive and routes requests to them by session"""
+
+    def __init__(self, workers: int = 4, host: str = '0.0.0.0', port: int = 5000,
+                 worker_host: str = '127.0.0.1', worker_base_port: int = 5100,
+                 max_body_bytes: int = 50 * 1024 * 1024, rate_limit_db: Optional[str] = 'rate_limits.db',
+                 ready_timeout: float = 120.0, max_restarts_per_minute: int = 5, vnodes: int = 64):
+        self.host = host
+        self.port = port
+        self.worker_host = worker_host
+        self.max_body_bytes = max_body_bytes
+        self.rate_limit_db = rate_limit_db
+        self.ready_timeout = ready_timeout
+        self.max_restarts_per_minute = max_restarts_per_minute
+        self.workers = [WorkerProcess(slot, worker_base_port + slot) for slot in range(workers)]
+        self.ring = HashRing(vnodes)
+        self._round_robin = 0
+        self._stopping = threading.Event()
+        self._local = threading.local()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._serving = False
+
+    # Worker lifecycle
+
+    def _spawn(self, worker: WorkerProcess) -> None:
+        pid = os.fork()
+        if pid == 0:
+            if self._server is not None:
+                self._server.socket.close()
+            _run_worker(worker.slot, self.worker_host, worker.port, self.rate_limit_db)
+        worker.pid = pid
+        worker.started_at = time.time()
+        worker.ready = False
+        worker.respawn_at = None
+
+    def _start_ready_check(self, worker: WorkerProcess) -> None:
+        threading.Thread(target=self._await_ready, args=(worker, worker.pid),
+                         name=f"ready-{worker.slot}", daemon=True).start()
+
+    def _await_ready(self, worker: WorkerProcess, pid: int) -> None:
+        """Add the worker to the ring once its /health endpoint answers"""
+        deadline = time.monotonic() + self.ready_timeout
+        while not self._stopping.is_set() and worker.pid == pid and time.monotonic() < deadline:
+            try:
+                connection = http.client.HTTPConnection(self.worker_host, worker.port, timeout=2.0)
+                connection.request('GET', '/health')
+                healthy = connection.getresponse().status == 200
+                connection.close()
+            except OSError:
+                healthy = False
+            if healthy:
+                worker.ready = True
+                self.ring.add(worker.slot)
+                logger.info("Worker %d (pid %d) ready; ring: %s", worker.slot, pid, self.ring.nodes())
+                return
+            time.sleep(0.2)
+        if worker.pid == pid and not self._stopping.is_set():
+            logger.error("Worker %s (pid %s) did not become ready; restarting it", worker.slot, pid)
+            self._kill(pid)
+
+    @staticmethod
+    def _kill(pid: int, sig: int = signal.SIGKILL) -> None:
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def _reap(self) -> None:
+        """Handle exited workers: drop them from the ring and restart with backoff"""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker = next((w for w in self.workers if w.pid == pid), None)
+            if worker is None:
+                continue
+            self.ring.remove(worker.slot)
+            worker.pid = None
+            worker.ready = False
+            if self._stopping.is_set():
+                continue
+            now = time.time()
+            worker.recent_exits = [t for t in worker.recent_exits if now - t < 60.0] + [now]
+            delay = 0.0 if len(worker.recent_exits) <= 1 else min(30.0, 2.0 ** len(worker.recent_exits))
+            logger.warning(
+                "Worker %d (pid %d) exited with status %d; its sessions moved to %s; restarting in %.0fs",
+                worker.slot, pid, os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status),
+                self.ring.nodes(), delay
+            )
+            if len(worker.recent_exits) > self.max_restarts_per_minute:
+                logger.error("Worker %s is crash-looping; leaving it stopped", worker.slot)
+                continue
+            worker.restarts += 1
+            worker.respawn_at = time.monotonic() + delay
+
+    def _respawn_due(self) -> None:
+        now = time.monotonic()
+        for worker in self.workers:
+            if worker.pid is None and worker.respawn_at is not None and worker.respawn_at <= now:
+                self._spawn(worker)
+                self._start_ready_check(worker)
+
+    # Routing
+
+    def route(self, key: Optional[str], skip: Tuple[int, ...] = (), pinned: bool = False) -> Optional[WorkerProcess]:
+        if key is not None:
+            slot = self.ring.get(key, skip)
+        elif pinned:
+            slot = min((node for node in self.ring.nodes() if node not in skip), default=None)
+        else:
+            nodes = [node for node in self.ring.nodes() if node not in skip]
+            if not nodes:
+                return None
+            self._round_robin = (self._round_robin + 1) % len(nodes)
+            slot = nodes[self._round_robin]
+        return self.workers[slot] if slot is not None else None
+
+    def connection(self, worker: WorkerProcess, fresh: bool = False) -> Tuple[http.client.HTTPConnection, bool]:
+        """Keep-alive connection to a worker for the calling proxy thread; returns (connection, reused)"""
+        pool = self._local.__dict__.setdefault('connections', {})
+        key = (worker.slot, worker.pid)
+        connection = pool.get(key)
+        if connection is not None and not fresh and not _is_stale(connection):
+            return connection, True
+        if connection is not None:
+            connection.close()
+        connection = pool[key] = http.client.HTTPConnection(self.worker_host, worker.port, timeout=300.0)
+        return connection, False
+
+    def status(self) -> Dict[str, Any]:
+        return {'ring': self.ring.nodes(), 'workers': [worker.status() for worker in self.workers]}
+
+    # Main loop
+
+    def run(self) -> None:
+        # Bind first, so a busy port fails before any worker exists
+        handler = type('ProxyHandler', (_ProxyHandler,), {'supervisor': self})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+
+        loaded = preload_models()
+        logger.info("Preloaded models: %s", loaded or 'none')
+        try:
+            # Fork every worker before this process starts any threads of its own
+            for worker in self.workers:
+                self._spawn(worker)
+            for worker in self.workers:
+                self._start_ready_check(worker)
+
+            self._serving = True
+            threading.Thread(target=self._server.serve_forever, name='proxy', daemon=True).start()
+            logger.info("Supervisor (pid %d) listening on %s:%d with %d workers",
+                        os.getpid(), self.host, self.port, len(self.workers))
+
+            signal.signal(signal.SIGTERM, lambda signum, frame: self._stopping.set())
+            signal.signal(signal.SIGINT, lambda signum, frame: self._stopping.set())
+            while not self._stopping.wait(0.5):
+                self._reap()
+                self._respawn_due()
+        finally:
+            self.shutdown()
+
+    def shutdown(self, grace_seconds: float = 15.0) -> None:
+        """Stop accepting requests, then let workers finish and flush"""
+        self._stopping.set()
+        if self._serving:
+            self._server.shutdown()
+            self._serving = False
+        if self._server is not None:
+            self._server.server_close()
+        for worker in self.workers:
+            if worker.pid:
+                self._kill(worker.pid, signal.SIGTERM)
+        deadline = time.monotonic() + grace_seconds
+        while any(worker.pid for worker in self.workers) and time.monotonic() < deadline:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            for worker in self.workers:
+                if worker.pid == pid:
+                    worker.pid = None
+            if pid == 0:
+                time.sleep(0.1)
+        for worker in self.workers:
+            if worker.pid:
+                self._kill(worker.pid)
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    """Forwards each request to the worker owning its session"""
+
+    protocol_version = 'HTTP/1.1'
+    supervisor: Supervisor = None
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.client_address[0], format % args)
+
+    def _send_error(self, status: int, message: str) -> None:
+        body = json.dumps({'error': message}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> Optional[bytes]:
+        """Request body, de-chunked
+
+        Raises BodyTooLarge when over the size limit and ValueError when the
+        framing (Content-Length or a chunk size) is malformed.
+        """
+        limit = self.supervisor.max_body_bytes
+        if 'chunked' in (self.headers.get('Transfer-Encoding') or '').lower():
+            body = bytearray()
+            while True:
+                size_field = self.rfile.readline().split(b';', 1)[0].strip()
+                size = int(size_field, 16)
+                if size < 0:
+                    raise ValueError(f"Invalid chunk size: {size_field!r}")
+                if size == 0:
+                    while self.rfile.readline() not in (b'\r\n', b'\n', b''):
+                        pass
+                    return bytes(body)
+                if len(body) + size > limit:
+                    raise BodyTooLarge()
+                body += self.rfile.read(size)
+                self.rfile.readline()
+        length = int(self.headers.get('Content-Length') or 0)
+        if length < 0:
+            raise ValueError(f"Invalid Content-Length: {length}")
+        if length > limit:
+            raise BodyTooLarge()
+        return self.rfile.read(length) if length else None
+
+    def _forward_headers(self, body: Optional[bytes]) -> Dict[str, str]:
+        headers = {k: v for k, v in self.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS and k.lower() != 'content-length'}
+        forwarded_for = self.headers.get('X-Forwarded-For')
+        client = self.client_address[0]
+        headers['X-Forwarded-For'] = f"{forwarded_for}, {client}" if forwarded_for else client
+        headers['X-Forwarded-Proto'] = 'http'
+        headers['Content-Length'] = str(len(body) if body else 0)
+        return headers
+
+    def _proxy(self) -> None:
+        if self.path == '/_supervisor/status' and self.client_address[0] in ('127.0.0.1', '::1'):
+            body = json.dumps(self.supervisor.status()).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        try:
+            body = self._read_body()
+        except BodyTooLarge:
+            self.close_connection = True
+            return self._send_error(413, 'Request body exceeds the size limit')
+        except ValueError:
+            # The rest of the stream cannot be framed, so the connection is not reusable
+            self.close_connection = True
+            return self._send_error(400, 'Malformed request body framing')
+        if (self.command == 'PATCH' and self.path.split('?', 1)[0] == '/admin/config'
+                and len(self.supervisor.workers) > 1 and not os.environ.get('BIAS_CONFIG_FILE')):
+            # Without a shared config file the change would only reach one worker
+            return self._send_error(409, 'Config updates need BIAS_CONFIG_FILE when running multiple workers')
+        key = routing_key(self.path, self.headers, body)
+        pinned = key is None and is_pinned(self.path)
+        headers = self._forward_headers(body)
+
+        requested = self.headers.get('X-Bias-Worker')
+        if requested is None and self.command == 'GET' and self.path.split('?', 1)[0] == '/metrics/prometheus':
+            return self._scrape_workers(headers)
+        if requested is not None:
+            slot = int(requested) if requested.isdigit() else -1
+            if slot not in self.supervisor.ring.nodes():
+                return self._send_error(503, f"Worker {requested} is not available")
+
+        skip: Tuple[int, ...] = ()
+        fresh = False
+        while True:
+            if requested is not None:
+                worker = self.supervisor.workers[slot] if not skip else None
+            else:
+                worker = self.supervisor.route(key, skip, pinned)
+            if worker is None:
+                return self._send_error(503, 'No workers available')
+            connection, reused = self.supervisor.connection(worker, fresh)
+            try:
+                connection.request(self.command, self.path, body=body, headers=headers)
+            except ConnectionRefusedError:
+                # Worker is gone; the request was never delivered, so try the next one on the ring
+                skip += (worker.slot,)
+                fresh = False
+                continue
+            except (BrokenPipeError, ConnectionResetError) as e:
+                # The worker closed the connection before taking the request, so it can be resent
+                if reused and not fresh:
+                    fresh = True
+                    continue
+                logger.error("Worker %s refused %s %s: %s", worker.slot, self.command, self.path, e)
+                return self._send_error(502, 'Worker failed while handling the request')
+            try:
+                response = connection.getresponse()
+                break
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError) as e:
+                # The request was written, so the worker may have acted on it; only resend what is safe to repeat
+                if reused and not fresh and self.command in IDEMPOTENT_METHODS:
+                    fresh = True
+                    continue
+                logger.error("Worker %s failed during %s %s: %s", worker.slot, self.command, self.path, e)
+                return self._send_error(502, 'Worker failed while handling the request')
+        self._relay(response, worker)
+
+    def _scrape_workers(self, headers: Dict[str, str]) -> None:
+        """Merged Prometheus metrics of every live worker"""
+        expositions = {}
+        for slot in self.supervisor.ring.nodes():
+            worker = self.supervisor.workers[slot]
+            try:
+                connection, _ = self.supervisor.connection(worker)
+                connection.request('GET', self.path, headers=headers)
+                response = connection.getresponse()
+                text = response.read().decode()
+            except (OSError, http.client.HTTPException) as e:
+                # Drop the connection; a partly read response would poison the next request
+                self.supervisor.connection(worker, fresh=True)
+                logger.warning("Metrics scrape of worker %s failed: %s", slot, e)
+                continue
+            if response.status == 200:
+                expositions[slot] = text
+            else:
+                logger.warning("Metrics scrape of worker %s returned %s", slot, response.status)
+        if not expositions:
+            return self._send_error(503, 'No workers available')
+        body = merge_prometheus(expositions).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _relay(self, response: http.client.HTTPResponse, worker: WorkerProcess) -> None:
+        self.send_response(response.status, response.reason)
+        length = response.getheader('Content-Length')
+        for name, value in response.getheaders():
+            if name.lower() not in HOP_BY_HOP_HEADERS and name.lower() not in ('server', 'date'):
+                self.send_header(name, value)
+        self.send_header('X-Bias-Worker', str(worker.slot))
+        chunked = length is None and self.command != 'HEAD' and response.status not in (204, 304)
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        while True:
+            chunk = response.read1(64 * 1024) if chunked else response.read(64 * 1024)
+            if not chunk:
+                break
+            if chunked:
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+            else:
+                self.wfile.write(chunk)
+        if chunked:
+            self.wfile.write(b'0\r\n\r\n')
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = do_OPTIONS = _proxy
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Bias detection service supervisor')
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('BIAS_WORKERS', os.cpu_count() or 2)))
+    parser.add_argument('--host', default=os.environ.get('BIAS_HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('BIAS_PORT', '5000')))
+    parser.add_argument('--worker-base-port', type=int, default=int(os.environ.get('BIAS_WORKER_BASE_PORT', '5100')))
+    parser.add_argument('--max-body-mb', type=int, default=50)
+    parser.add_argument('--rate-limit-db', default='rate_limits.db',
+                        help='SQLite file shared by workers for rate limit buckets ("" to keep per-worker buckets)')
+    args = parser.parse_args()
+
+    if not hasattr(os, 'fork'):
+        sys.exit('The supervisor requires a POSIX platform (os.fork)')
+    # Plain synchronous logging here: the supervisor logs rarely and must not
+    # own a listener thread when it forks (workers set up queued logging)
+    from service_logging import TEXT_FORMAT
+    logging.basicConfig(level=logging.INFO, format=TEXT_FORMAT, stream=sys.stdout)
+    Supervisor(
+        workers=args.workers,
+        host=args.host,
+        port=args.port,
+        worker_base_port=args.worker_base_port,
+        max_body_bytes=args.max_body_mb * 1024 * 1024,
+        rate_limit_db=args.rate_limit_db or None
+    ).run()
+
+if __name__ == '__main__':
+    main()
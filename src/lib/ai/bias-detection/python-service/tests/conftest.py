@@ -0,0 +1,42 @@
+"""Shared fixtures for the bias detection service tests"""
+
+import os
+import sys
+
+import pytest
+
+# The service modules live flat in the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class PlainCipher:
+    """Pass-through stand-in for the field cipher, so stored rows are readable"""
+
+    def encrypt_data(self, data: str) -> str:
+        return data
+
+    def decrypt_data(self, data: str) -> str:
+        return data
+
+@pytest.fixture
+def plain_cipher():
+    return PlainCipher()
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'results.db')
+
+@pytest.fixture
+def make_result():
+    """Factory for result dicts in the service's response shape"""
+    def make(result_id, score, alert_level='low', demographics=None, timestamp=None, layer_scores=None):
+        return {
+            'result_id': result_id,
+            'session_id': f"session-{result_id}",
+            'timestamp': timestamp,
+            'overall_bias_score': score,
+            'alert_level': alert_level,
+            'confidence': 0.9,
+            'demographics': demographics or {},
+            'layer_results': {layer: {'bias_score': value} for layer, value in (layer_scores or {}).items()}
+        }
+    return make
@@ -0,0 +1,136 @@
+"""Alert outbox delivery against a local stand-in HTTP receiver"""
+
+import http.server
+import json
+import threading
+import time
+
+import pytest
+
+from alert_outbox import AlertOutbox, batch_idempotency_key
+from results_store import ResultsStore
+
+class Receiver:
+    """Local alert sink that fails every third request and rejects chosen events"""
+
+    def __init__(self, reject_result_ids=()):
+        self.accepted = {}
+        self.requests = 0
+        self.batch_sizes = []
+        self.reject_result_ids = set(reject_result_ids)
+        self.rejections_left = {result_id: 1 for result_id in reject_result_ids}
+        self.lock = threading.Lock()
+        receiver = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_POST(self):
+                events = json.loads(self.rfile.read(int(self.headers['Content-Length'])))['events']
+                status, reply = receiver.handle(events, self.headers.get('Idempotency-Key'))
+                body = json.dumps(reply).encode()
+                self.send_response(status)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/alerts"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def handle(self, events, idempotency_key):
+        with self.lock:
+            self.requests += 1
+            if self.requests % 3 == 0:
+                return 503, {}
+            assert idempotency_key == batch_idempotency_key([event['event_id'] for event in events])
+            self.batch_sizes.append(len(events))
+            rejected = []
+            for event in events:
+                if self.rejections_left.get(event['result_id'], 0) > 0:
+                    self.rejections_left[event['result_id']] -= 1
+                    rejected.append(event['event_id'])
+                else:
+                    self.accepted[event['event_id']] = self.accepted.get(event['event_id'], 0) + 1
+            return 200, {'rejected': rejected}
+
+    def close(self):
+        self.server.shutdown()
+
+@pytest.fixture
+def receiver():
+    receiver = Receiver(reject_result_ids=('check-3', 'check-7'))
+    yield receiver
+    receiver.close()
+
+def wait_for(condition, timeout_seconds=30.0):
+    deadline = time.time() + timeout_seconds
+    while time.time() < deadline and not condition():
+        time.sleep(0.05)
+    return condition()
+
+def test_competing_dispatchers_deliver_each_event_once(receiver, db_path, plain_cipher):
+    event_count = 20
+    # One store and outbox per simulated worker process, all on the same file
+    stores = [ResultsStore(db_path, plain_cipher) for _ in range(2)]
+    outboxes = [
+        AlertOutbox(store, [receiver.url], base_backoff_seconds=0.05, max_backoff_seconds=0.2,
+                    poll_interval_seconds=0.05)
+        for store in stores
+    ]
+    try:
+        for index in range(event_count):
+            stores[index % 2].submit(
+                {'result_id': f"check-{index}", 'alert_level': 'high', 'overall_bias_score': 0.7}, f"hash-{index}"
+            )
+        for store in stores:
+            assert store.flush(timeout=10.0)
+
+        assert wait_for(lambda: len(receiver.accepted) == event_count)
+    finally:
+        for outbox in outboxes:
+            outbox.close()
+
+    assert all(count == 1 for count in receiver.accepted.values())
+    assert receiver.rejections_left == {'check-3': 0, 'check-7': 0}
+    assert max(receiver.batch_sizes) > 1
+    assert outboxes[0].status()['sinks'][receiver.url] == {'delivered': event_count}
+
+def test_low_alert_levels_are_not_enqueued(db_path, plain_cipher):
+    store = ResultsStore(db_path, plain_cipher)
+    outbox = AlertOutbox(store, ['http://127.0.0.1:9/alerts'])
+    outbox.close()
+    store.submit({'result_id': 'quiet', 'alert_level': 'low', 'overall_bias_score': 0.1}, 'hash')
+    store.submit({'result_id': 'loud', 'alert_level': 'critical', 'overall_bias_score': 0.9}, 'hash')
+    assert store.flush(timeout=10.0)
+
+    rows = store._connection().execute('SELECT result_id FROM alert_outbox').fetchall()
+    assert [row['result_id'] for row in rows] == ['loud']
+
+def test_claimed_events_are_leased_to_one_dispatcher(db_path, plain_cipher):
+    first_store, second_store = ResultsStore(db_path, plain_cipher), ResultsStore(db_path, plain_cipher)
+    # Sinks are configured but the dispatcher threads are stopped, so claims are driven by hand
+    first = AlertOutbox(first_store, ['http://127.0.0.1:9/alerts'])
+    second = AlertOutbox(second_store, ['http://127.0.0.1:9/alerts'])
+    first.close()
+    second.close()
+    first_store.submit({'result_id': 'leased', 'alert_level': 'high', 'overall_bias_score': 0.7}, 'hash')
+    assert first_store.flush(timeout=10.0)
+
+    assert len(first._claim(first_store._connection())) == 1
+    assert second._claim(second_store._connection()) == []
+
+    # An expired lease (a crashed worker) makes the event due again
+    with second_store._connection() as connection:
+        connection.execute('UPDATE alert_outbox SET lease_until = ?', (time.time() - 1,))
+    assert len(second._claim(second_store._connection())) == 1
+
+@pytest.mark.parametrize('reply, expected', [
+    (b'', {}),
+    (b'not json', {}),
+    (b'{"rejected": ["a", "unknown", 3]}', {'a': 'rejected by receiver'}),
+    (b'{"rejected": {"b": "bad payload"}}', {'b': 'bad payload'}),
+])
+def test_rejected_events_parsing(reply, expected):
+    assert AlertOutbox._rejected_events(reply, ['a', 'b']) == expected
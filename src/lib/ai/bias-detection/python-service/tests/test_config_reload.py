@@ -0,0 +1,86 @@
+"""Validation and hot swapping of config overrides"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import pytest
+
+from config_reload import ConfigManager, ConfigValidationError, config_version, validate_overrides
+
+@dataclass
+class ExampleConfig:
+    warning_threshold: float = 0.3
+    high_threshold: float = 0.6
+    critical_threshold: float = 0.8
+    layer_weights: Dict[str, float] = field(default_factory=lambda: {
+        'preprocessing': 0.25, 'model_level': 0.30, 'interactive': 0.20, 'evaluation': 0.25
+    })
+    enabled_analyzers: Dict[str, bool] = field(default_factory=dict)
+    analysis_cost_budget_ms: Optional[float] = None
+    default_deadline_ms: Optional[float] = None
+    profile_sample_rate: float = 0.0
+    config_version: Optional[str] = None
+
+    def __post_init__(self):
+        if self.config_version is None:
+            self.config_version = config_version(self)
+
+def test_valid_overrides_are_normalized():
+    normalized = validate_overrides(
+        ExampleConfig(),
+        {'warning_threshold': 0.2, 'default_deadline_ms': 500, 'layer_weights': {'evaluation': 1}},
+        known_analyzers=('fairlearn',)
+    )
+    assert normalized['warning_threshold'] == 0.2
+    assert normalized['default_deadline_ms'] == 500.0
+    assert normalized['layer_weights']['evaluation'] == 1.0
+    assert normalized['layer_weights']['preprocessing'] == 0.25
+
+@pytest.mark.parametrize('overrides, message', [
+    ({'warning_threshold': 1.5}, 'warning_threshold must be a number between 0 and 1'),
+    ({'warning_threshold': float('nan')}, 'warning_threshold must be a number between 0 and 1'),
+    ({'warning_threshold': True}, 'warning_threshold must be a number between 0 and 1'),
+    ({'default_deadline_ms': float('inf')}, 'default_deadline_ms must be a positive number or null'),
+    ({'analysis_cost_budget_ms': 0}, 'analysis_cost_budget_ms must be a positive number or null'),
+    ({'high_threshold': 0.9}, 'Thresholds must satisfy warning < high < critical'),
+    ({'layer_weights': {'unknown_layer': 1.0}}, 'Unknown layers in layer_weights: unknown_layer'),
+    ({'layer_weights': {'preprocessing': -1}}, 'layer_weights must be non-negative numbers'),
+    ({'enabled_analyzers': {'nonexistent': False}}, 'Unknown analyzers: nonexistent'),
+    ({'results_db_path': '/tmp/x.db'}, 'Not reloadable: results_db_path'),
+])
+def test_invalid_overrides_are_rejected(overrides, message):
+    with pytest.raises(ConfigValidationError) as excinfo:
+        validate_overrides(ExampleConfig(), overrides, known_analyzers=('fairlearn',))
+    assert message in excinfo.value.errors
+
+def test_all_zero_layer_weights_are_rejected():
+    zeros = {layer: 0 for layer in ExampleConfig().layer_weights}
+    with pytest.raises(ConfigValidationError):
+        validate_overrides(ExampleConfig(), {'layer_weights': zeros})
+
+def test_manager_swaps_config_and_records_history():
+    changes = []
+    manager = ConfigManager(ExampleConfig(), on_change=changes.append)
+    base_version = manager.current.config_version
+
+    config = manager.update({'warning_threshold': 0.25})
+    assert config.warning_threshold == 0.25
+    assert config.config_version != base_version
+    assert changes == [config]
+    assert manager.history[-1]['previous_version'] == base_version
+
+    with pytest.raises(ConfigValidationError):
+        manager.update({'critical_threshold': 0.1})
+    assert manager.current is config
+
+def test_rejected_config_file_keeps_last_good_config(tmp_path):
+    path = tmp_path / 'bias_config.json'
+    path.write_text('{"warning_threshold": 0.2}')
+    manager = ConfigManager(ExampleConfig(), path=str(path))
+    assert manager.reload_file()
+    assert manager.current.warning_threshold == 0.2
+
+    path.write_text('{"warning_threshold": 7}')
+    assert not manager.reload_file(force=True)
+    assert manager.current.warning_threshold == 0.2
+    assert 'warning_threshold' in manager.last_error
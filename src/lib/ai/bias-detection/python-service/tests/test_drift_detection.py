@@ -0,0 +1,46 @@
+"""Drift detectors fed by the results store write hook"""
+
+from drift_detection import DriftMonitor
+from results_store import ResultsStore
+
+def submit_scores(store, make_result, scores, offset=0):
+    for index, score in enumerate(scores, start=offset):
+        store.submit(make_result(f"result-{index}", score, demographics={'gender': 'female'}), f"hash-{index}", 'user')
+    assert store.flush(timeout=10.0)
+
+def test_shift_raises_persisted_alert_after_commit(db_path, plain_cipher, make_result):
+    store = ResultsStore(db_path, plain_cipher)
+    monitor = DriftMonitor(min_samples=5, threshold=0.5, delta=0.01, store=store)
+    announced = []
+    monitor.add_listener(lambda alert, session_hash, user_id: announced.append((alert, user_id)))
+
+    submit_scores(store, make_result, [0.1] * 10)
+    assert monitor.alerts() == []
+    submit_scores(store, make_result, [0.9] * 5, offset=10)
+
+    alerts = monitor.alerts()
+    assert {alert['dimension'] for alert in alerts} == {'all', 'gender'}
+    assert all(alert['direction'] == 'increase' for alert in alerts)
+    assert [alert['alert_id'] for alert, _ in announced] == [alert['alert_id'] for alert in reversed(alerts)]
+    assert all(user_id == 'user' for _, user_id in announced)
+    store.close()
+
+def test_detector_state_is_shared_through_the_database(db_path, plain_cipher, make_result):
+    first = ResultsStore(db_path, plain_cipher)
+    DriftMonitor(min_samples=5, threshold=0.5, delta=0.01, store=first)
+    submit_scores(first, make_result, [0.1] * 10)
+
+    # A second process picks up the baseline the first one built
+    second = ResultsStore(db_path, plain_cipher)
+    monitor = DriftMonitor(min_samples=5, threshold=0.5, delta=0.01, store=second)
+    submit_scores(second, make_result, [0.9] * 5, offset=10)
+    assert monitor.alerts(dimension='all')
+    first.close()
+    second.close()
+
+def test_in_process_monitor_without_store():
+    monitor = DriftMonitor(min_samples=5, threshold=0.5, delta=0.01)
+    for _ in range(10):
+        assert monitor.observe({'overall_bias_score': 0.1}) == []
+    raised = [alert for _ in range(5) for alert in monitor.observe({'overall_bias_score': 0.9})]
+    assert [alert['dimension'] for alert in raised] == ['all']
@@ -0,0 +1,35 @@
+"""Bounded JSON body parsing"""
+
+import io
+
+import pytest
+
+import request_limits
+from request_limits import RequestTooLarge, read_json_body
+
+@pytest.fixture(params=['ijson', 'buffered'])
+def parser(request, monkeypatch):
+    if request.param == 'ijson' and not request_limits.IJSON_AVAILABLE:
+        pytest.skip('ijson not installed')
+    if request.param == 'buffered':
+        monkeypatch.setattr(request_limits, 'IJSON_AVAILABLE', False)
+    return request.param
+
+def test_parses_document(parser):
+    assert read_json_body(io.BytesIO(b'{"session_id": "s", "score": 0.5}'), 1024) == {'session_id': 's', 'score': 0.5}
+
+def test_empty_body_is_none(parser):
+    assert read_json_body(io.BytesIO(b''), 1024) is None
+
+@pytest.mark.parametrize('body', [b'{"a": 1} {"b": 2}', b'[1] [2]', b'{"a": 1}}'])
+def test_trailing_data_is_rejected(parser, body):
+    with pytest.raises(ValueError):
+        read_json_body(io.BytesIO(body), 1024)
+
+def test_malformed_body_is_rejected(parser):
+    with pytest.raises(ValueError):
+        read_json_body(io.BytesIO(b'{"a": '), 1024)
+
+def test_oversized_body_is_rejected(parser):
+    with pytest.raises(RequestTooLarge):
+        read_json_body(io.BytesIO(b'{"a": "' + b'x' * 2048 + b'"}'), 1024, chunk_size=256)
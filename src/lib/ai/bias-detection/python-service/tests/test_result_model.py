@@ -0,0 +1,44 @@
+"""Partial-result gate on AnalysisResult"""
+
+import pytest
+
+from result_model import AnalysisResult, LayerResult
+
+def build_result(skipped_analyzers, overall_bias_score=0.4):
+    return AnalysisResult(
+        session_id='session', timestamp='2026-01-01T00:00:00', overall_bias_score=overall_bias_score,
+        layers=[LayerResult('preprocessing', 0.4)], demographics={}, recommendations=[], alert_level='warning',
+        confidence=0.9, processing_time_seconds=0.1, deterministic=True, skipped_analyzers=skipped_analyzers,
+        deadline_ms=None, result_id='result', service_version='test'
+    )
+
+def test_complete_result_is_storable():
+    result = build_result({})
+    assert not result.partial
+    assert result.storable
+
+def test_deadline_skips_make_result_partial():
+    result = build_result({'fairlearn': 'deadline_exceeded', 'consistency': 'circuit_open'})
+    assert result.partial
+    assert not result.storable
+    assert result.to_dict()['skip_reasons'] == {'fairlearn': 'deadline_exceeded', 'consistency': 'circuit_open'}
+
+@pytest.mark.parametrize('reason', ['circuit_open', 'saturated'])
+def test_service_condition_skips_are_still_stored(reason):
+    result = build_result({'fairlearn': reason})
+    assert not result.partial
+    assert result.storable
+    assert result.skipped_analyzers == ('fairlearn',)
+
+def test_insufficient_coverage_is_not_storable():
+    assert not build_result({}, overall_bias_score=None).storable
+
+def test_plain_list_of_skips_has_unknown_reason():
+    result = build_result(['fairlearn'])
+    assert result.skip_reasons == {'fairlearn': 'unknown'}
+    assert result.storable
+
+def test_attributes_cannot_be_rebound():
+    result = build_result({})
+    with pytest.raises(AttributeError):
+        result.alert_level = 'critical'
@@ -0,0 +1,41 @@
+"""Rollup buckets maintained by the results store write hook"""
+
+from rollups import ResultRollups
+from results_store import ResultsStore
+
+def test_write_hook_folds_stored_results_into_buckets(db_path, plain_cipher, make_result):
+    store = ResultsStore(db_path, plain_cipher)
+    rollups = ResultRollups(store)
+    for index, (score, level) in enumerate([(0.1, 'low'), (0.4, 'warning'), (0.7, 'high'), (0.9, 'critical')]):
+        store.submit(
+            make_result(f"result-{index}", score, level, demographics={'gender': 'Female' if index % 2 else 'male'},
+                        layer_scores={'preprocessing': score}),
+            f"hash-{index}"
+        )
+    assert store.flush(timeout=10.0)
+
+    summary = rollups.summary()
+    assert summary['total_sessions'] == 4
+    assert abs(summary['average_bias_score'] - 0.525) < 1e-9
+    assert summary['alert_counts'] == {'low': 1, 'warning': 1, 'high': 1, 'critical': 1}
+    assert abs(rollups.layer_averages()['preprocessing'] - 0.525) < 1e-9
+    assert rollups.layer_averages()['evaluation'] == 0.0
+
+    by_gender = rollups.averages_by('gender')
+    assert by_gender['female']['count'] == 2
+    assert by_gender['male']['count'] == 2
+    store.close()
+
+def test_existing_results_are_backfilled_once(db_path, plain_cipher, make_result):
+    store = ResultsStore(db_path, plain_cipher)
+    store.submit(make_result('before', 0.5, 'warning'), 'hash')
+    assert store.flush(timeout=10.0)
+
+    rollups = ResultRollups(store)
+    store.submit(make_result('after', 0.3, 'warning'), 'hash')
+    assert store.flush(timeout=10.0)
+    assert rollups.summary()['total_sessions'] == 2
+
+    # Reopening sees populated rollups and does not count the history again
+    assert ResultRollups(ResultsStore(db_path, plain_cipher)).summary()['total_sessions'] == 2
+    store.close()
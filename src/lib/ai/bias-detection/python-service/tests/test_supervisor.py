@@ -0,0 +1,52 @@
+"""Session-affinity routing in the supervisor"""
+
+from supervisor import HashRing, routing_key
+
+KEYS = [f"session-{index}" for index in range(2000)]
+
+def build_ring(nodes):
+    ring = HashRing()
+    for node in nodes:
+        ring.add(node)
+    return ring
+
+def test_empty_ring_has_no_owner():
+    assert HashRing().get('session') is None
+
+def test_routing_is_stable_and_spread():
+    ring = build_ring(range(4))
+    owners = [ring.get(key) for key in KEYS]
+    assert owners == [build_ring([3, 1, 0, 2]).get(key) for key in KEYS]
+    shares = [owners.count(node) for node in range(4)]
+    assert min(shares) > len(KEYS) / 4 * 0.5
+
+def test_removing_a_worker_only_moves_its_sessions():
+    ring = build_ring(range(4))
+    before = {key: ring.get(key) for key in KEYS}
+    ring.remove(2)
+    after = {key: ring.get(key) for key in KEYS}
+    for key in KEYS:
+        if before[key] != 2:
+            assert after[key] == before[key]
+        else:
+            assert after[key] != 2
+    ring.add(2)
+    assert {key: ring.get(key) for key in KEYS} == before
+
+def test_skip_walks_to_next_worker():
+    ring = build_ring(range(3))
+    for key in KEYS[:100]:
+        owner = ring.get(key)
+        fallback = ring.get(key, skip=(owner,))
+        assert fallback is not None and fallback != owner
+    assert ring.get('session', skip=(0, 1, 2)) is None
+
+def test_routing_key_sources():
+    assert routing_key('/analyze', {'X-Session-Id': 'from-header'}, b'{"session_id": "from-body"}') == 'from-header'
+    assert routing_key('/session/abc', {}, None) == 'abc'
+    json_headers = {'Content-Type': 'application/json'}
+    assert routing_key('/analyze', json_headers, b'{"session_id": "from-body"}') == 'from-body'
+    assert routing_key('/analyze', json_headers, b'{"session_id": 42}') == '42'
+    assert routing_key('/analyze', json_headers, b'not json') is None
+    assert routing_key('/analyze', {}, b'{"session_id": "from-body"}') is None
+    assert routing_key('/dashboard', {}, None) is None
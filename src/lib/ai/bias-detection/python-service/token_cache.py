@@ -0,0 +1,88 @@
+"""
+Pixelated Empathy Bias Detection Verified Token Cache
+
+Skips repeated JWT signature verification for tokens that were already
+verified:
+- Keyed by SHA-256 digest of the token, so raw tokens are never retained
+- Entries expire at the token's ``exp`` claim (capped by a maximum TTL)
+- Tied to a fingerprint of the signing key; rotating the key drops the cache
+- Bounded with least-recently-used eviction
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+class VerifiedTokenCache:
+    """Bounded cache of verified token digests to decoded claims"""
+
+    def __init__(self, max_entries: int = 10000, max_ttl_seconds: float = 300.0, metrics: Any = None):
+        self.max_entries = max_entries
+        self.max_ttl_seconds = max_ttl_seconds
+        self.metrics = metrics
+        self._entries: 'OrderedDict[bytes, Tuple[Dict[str, Any], float]]' = OrderedDict()
+        self._key_fingerprint: Optional[bytes] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _digest(value: str) -> bytes:
+        return hashlib.sha256(value.encode()).digest()
+
+    def _check_key(self, signing_key: str) -> None:
+        """Drop every entry when the signing key has changed (called under the lock)"""
+        fingerprint = self._digest(signing_key)
+        if fingerprint != self._key_fingerprint:
+            self._entries.clear()
+            self._key_fingerprint = fingerprint
+
+    def get(self, token: str, signing_key: str) -> Optional[Dict[str, Any]]:
+        """Claims for a previously verified, unexpired token, else None"""
+        digest = self._digest(token)
+        now = time.time()
+        with self._lock:
+            self._check_key(signing_key)
+            entry = self._entries.get(digest)
+            if entry is not None and entry[1] <= now:
+                del self._entries[digest]
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(digest)
+                self.hits += 1
+        if self.metrics is not None:
+            self.metrics.record_cache('jwt_verification', entry is not None)
+        return dict(entry[0]) if entry is not None else None
+
+    def put(self, token: str, signing_key: str, claims: Dict[str, Any]) -> None:
+        """Remember claims of a token that has just passed verification"""
+        expires_at = time.time() + self.max_ttl_seconds
+        exp = claims.get('exp')
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, float(exp))
+        digest = self._digest(token)
+        with self._lock:
+            self._check_key(signing_key)
+            self._entries[digest] = (dict(claims), expires_at)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0
+            }
@@ -8,16 +8,18 @@ for the TypeScript frontend to communicate with the Python analysis engine.
 
 import os
 import sys
-import json
 import logging
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from datetime import datetime
+from datetime import datetime, timedelta
 import asyncio
-from typing import Dict, Any
+import hashlib
+import time
+import uuid
 
 # Add the python directory to the path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python-service'))
 
 try:
     from python.bias_detection_service import BiasDetectionService, BiasDetectionConfig, SessionData
@@ -26,6 +28,11 @@ except ImportError as e:
     print("Please ensure all dependencies are installed by running setup.sh or setup.bat")
     sys.exit(1)
 
+from service_metrics import MetricsRegistry, instrument_flask_app, metrics_prometheus_response
+from encryption import FernetCipher
+from results_store import ResultsStore
+from rollups import ResultRollups
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -37,12 +44,33 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend communication
 
+# Request and analysis metrics
+service_metrics = MetricsRegistry()
+instrument_flask_app(app, service_metrics)
+
 # Global bias detection service instance
 bias_service = None
+results_store = None
+rollups = None
+
+TIME_RANGES = {
+    '1h': timedelta(hours=1),
+    '24h': timedelta(hours=24),
+    '7d': timedelta(days=7),
+    '30d': timedelta(days=30),
+    '90d': timedelta(days=90)
+}
+
+def _since_timestamp(time_range: str) -> float:
+    """Start of a '24h'/'7d'-style time range as epoch seconds"""
+    return (datetime.now() - TIME_RANGES.get(time_range, TIME_RANGES['24h'])).timestamp()
+
+def _hash_session_id(session_id: str) -> str:
+    return hashlib.sha256(session_id.encode()).hexdigest()
 
 def initialize_service():
     """Initialize the bias detection service"""
-    global bias_service
+    global bias_service, results_store, rollups
     
     try:
         config = BiasDetectionConfig(
@@ -54,6 +82,11 @@ def initialize_service():
         )
         
         bias_service = BiasDetectionService(config)
+        results_store = ResultsStore(
+            os.getenv('BIAS_RESULTS_DB_PATH', 'bias_detection_results.db'),
+            FernetCipher.from_environment()
+        )
+        rollups = ResultRollups(results_store)
         logger.info("Bias detection service initialized successfully")
         return True
         
@@ -108,10 +141,17 @@ def analyze_session():
         )
         
         # Run analysis
+        analysis_start = time.perf_counter()
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
         result = loop.run_until_complete(bias_service.analyze_session(session_data))
         loop.close()
+        service_metrics.observe_latency('analysis_duration_seconds', time.perf_counter() - analysis_start,
+                                        help_text='End-to-end analyze_session latency')
+        
+        # Persist off the request path
+        result['result_id'] = uuid.uuid4().hex
+        results_store.submit(result, _hash_session_id(data['sessionId']))
         
         logger.info(f"Analysis completed for session {data['sessionId']}")
         return jsonify(result)
@@ -135,44 +175,59 @@ def get_dashboard_data():
         # Get query parameters
         time_range = request.args.get('timeRange', '24h')
         demographic_filter = request.args.get('demographic', 'all')
+        since_ts = _since_timestamp(time_range)
+        
+        summary = rollups.summary(since_ts)
+        alerts = results_store.recent_alerts(since_ts=since_ts)
+        
+        breakdown_column = demographic_filter if demographic_filter in ('gender', 'age_group', 'ethnicity') else 'gender'
+        groups = rollups.averages_by(breakdown_column, since_ts)
+        grouped_total = sum(stats['count'] for stats in groups.values())
+        daily = rollups.daily_trends(7)
         
-        # Generate mock dashboard data
-        # In production, this would query your database
         dashboard_data = {
             'summary': {
-                'totalSessions': 1247,
-                'averageBiasScore': 0.23,
-                'alertsCount': 12,
-                'trendsDirection': 'improving',
+                'totalSessions': summary['total_sessions'],
+                'averageBiasScore': summary['average_bias_score'],
+                'alertsCount': sum(
+                    count for level, count in summary['alert_counts'].items()
+                    if level in ('high', 'critical')
+                ),
                 'lastUpdated': datetime.now().isoformat()
             },
             'alerts': [
                 {
-                    'id': 'alert-001',
-                    'sessionId': 'session-123',
-                    'level': 'high',
-                    'message': 'Potential gender bias detected in therapeutic responses',
-                    'timestamp': datetime.now().isoformat(),
-                    'biasType': 'gender',
-                    'confidence': 0.87,
-                    'affectedDemographics': ['female', 'non-binary'],
-                    'recommendations': [
-                        'Review language patterns in AI responses',
-                        'Implement gender-neutral terminology'
-                    ]
+                    'id': alert['result_id'],
+                    'sessionId': alert.get('session_id'),
+                    'level': alert.get('alert_level'),
+                    'timestamp': alert.get('timestamp'),
+                    'confidence': alert.get('confidence'),
+                    'overallBiasScore': alert.get('overall_bias_score'),
+                    'recommendations': alert.get('recommendations', [])
                 }
+                for alert in alerts
             ],
             'trends': {
-                'biasScoreOverTime': [],
-                'alertsOverTime': [],
+                'biasScoreOverTime': [
+                    {'date': day['date'], 'value': day['average_bias_score']}
+                    for day in daily
+                ],
+                'alertsOverTime': [
+                    {'date': day['date'], 'value': day['alerts']}
+                    for day in daily
+                ],
                 'demographicTrends': {}
             },
             'demographics': {
-                'totalParticipants': 1247,
+                'totalParticipants': summary['total_sessions'],
                 'breakdown': [
-                    {'group': 'Female', 'count': 623, 'percentage': 50.0, 'averageBiasScore': 0.21},
-                    {'group': 'Male', 'count': 498, 'percentage': 39.9, 'averageBiasScore': 0.25},
-                    {'group': 'Non-binary', 'count': 87, 'percentage': 7.0, 'averageBiasScore': 0.28}
+                    {
+                        'group': group,
+                        'count': stats['count'],
+                        'percentage': 100.0 * stats['count'] / grouped_total if grouped_total else 0.0,
+                        'averageBiasScore': stats['average_bias_score']
+                    }
+                    for group, stats in groups.items()
                 ]
             }
         }
@@ -195,21 +250,27 @@ def get_session_analysis(session_id):
                 'error': 'Service not initialized'
             }), 500
         
-        # In production, this would query your database for stored results
-        # For now, return a mock response
+        stored = results_store.latest_for_session(_hash_session_id(session_id))
+        if stored is None:
+            return jsonify({
+                'error': 'Session analysis not found'
+            }), 404
+        
+        layer_results = stored.get('layer_results', {})
         result = {
             'sessionId': session_id,
-            'timestamp': datetime.now().isoformat(),
-            'overallBiasScore': 0.25,
-            'alertLevel': 'low',
+            'resultId': stored['result_id'],
+            'timestamp': stored.get('timestamp'),
+            'overallBiasScore': stored.get('overall_bias_score'),
+            'alertLevel': stored.get('alert_level'),
             'layerResults': {
-                'preprocessing': {'biasScore': 0.2},
-                'modelLevel': {'biasScore': 0.3},
-                'interactive': {'biasScore': 0.2},
-                'evaluation': {'biasScore': 0.3}
+                'preprocessing': {'biasScore': layer_results.get('preprocessing', {}).get('bias_score')},
+                'modelLevel': {'biasScore': layer_results.get('model_level', {}).get('bias_score')},
+                'interactive': {'biasScore': layer_results.get('interactive', {}).get('bias_score')},
+                'evaluation': {'biasScore': layer_results.get('evaluation', {}).get('bias_score')}
             },
-            'recommendations': ['Continue monitoring'],
-            'confidence': 0.85
+            'recommendations': stored.get('recommendations', []),
+            'confidence': stored.get('confidence')
         }
         
         return jsonify(result)
@@ -234,44 +295,41 @@ def get_metrics():
         time_range = request.args.get('timeRange', '24h')
         include_details = request.args.get('includeDetails', 'false').lower() == 'true'
         
-        # Generate mock metrics
+        # Processing time from the live analysis latency histogram (milliseconds)
+        latency = service_metrics.to_dict()['metrics'].get('bias_detection_analysis_duration_seconds')
+        latency_series = latency['series'][0] if latency and latency['series'] else None
+        processing_time = {
+            'average': latency_series['mean'] * 1000 if latency_series else 0.0,
+            'p95': latency_series['quantiles']['0.95'] * 1000 if latency_series else 0.0,
+            'p99': latency_series['quantiles']['0.99'] * 1000 if latency_series else 0.0,
+            'samples': latency_series['count'] if latency_series else 0
+        }
+        
+        since_ts = _since_timestamp(time_range)
+        summary = rollups.summary(since_ts)
+        
         metrics = {
-            'totalSessions': 1247,
-            'averageBiasScore': 0.23,
+            'totalSessions': summary['total_sessions'],
+            'averageBiasScore': summary['average_bias_score'],
             'alertCounts': {
-                'critical': 2,
-                'high': 8,
-                'medium': 15,
-                'low': 45
-            },
-            'processingTime': {
-                'average': 85,  # milliseconds
-                'p95': 120,
-                'p99': 180
+                level: summary['alert_counts'].get(level, 0)
+                for level in ('critical', 'high', 'warning', 'low')
             },
-            'accuracy': {
-                'overall': 0.92,
-                'byDemographic': {
-                    'gender': 0.94,
-                    'ethnicity': 0.89,
-                    'age': 0.93
-                }
-            }
+            'processingTime': processing_time
         }
         
         if include_details:
+            layer_averages = rollups.layer_averages(since_ts)
             metrics['detailedBreakdown'] = {
-                'biasTypes': {
-                    'gender': 0.15,
-                    'racial': 0.12,
-                    'age': 0.08,
-                    'cultural': 0.18
+                'layerAverageBiasScores': {
+                    'preprocessing': layer_averages['preprocessing'],
+                    'modelLevel': layer_averages['model_level'],
+                    'interactive': layer_averages['interactive'],
+                    'evaluation': layer_averages['evaluation']
                 },
-                'layerPerformance': {
-                    'preprocessing': 0.91,
-                    'modelLevel': 0.88,
-                    'interactive': 0.94,
-                    'evaluation': 0.89
+                'byDemographic': {
+                    column: rollups.averages_by(column, since_ts)
+                    for column in ('gender', 'age_group', 'ethnicity')
                 }
             }
         
@@ -284,6 +342,11 @@ def get_metrics():
             'message': str(e)
         }), 500
 
+@app.route('/metrics/prometheus', methods=['GET'])
+def get_prometheus_metrics():
+    """Service metrics in Prometheus text exposition format"""
+    return metrics_prometheus_response(service_metrics)
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({
@@ -312,7 +375,7 @@ def main():
     port = int(os.getenv('BIAS_SERVICE_PORT', '5001'))
     debug = os.getenv('BIAS_SERVICE_DEBUG', 'false').lower() == 'true'
     
-    print(f"Service initialized successfully!")
+    print("Service initialized successfully!")
     print(f"Starting Flask server on {host}:{port}")
     print(f"Debug mode: {debug}")
     print("\nAvailable endpoints:")
@@ -321,6 +384,7 @@ def main():
     print("  GET  /dashboard - Get dashboard data")
     print("  GET  /session/<id> - Get session analysis")
     print("  GET  /metrics - Get bias detection metrics")
+    print("  GET  /metrics/prometheus - Prometheus metrics")
     print("\nPress Ctrl+C to stop the service")
     
     try: